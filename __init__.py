@@ -1,4 +1,28 @@
 from .units import Unit
+from .units import prewarm
+from .units import convertMany
+from .units import defineUnit
+from .units import defineCompoundUnit
+from .units import definePrefix
+from .accumulators import UnitAccumulator
+from .arrays import UnitArray
+from .binary import convertBinaryFile
+from . import codec
+from .database import loadDatabase
+from .database import useDatabase
+from . import instrument
+from .deferred import lazy
+from .deferred import LazyUnit
+from .formula import compileFormula
+from .parallel import convertBatches
+from .parallel import convertParallel
+from .parallel import convertFileParallel
+from .stream import convertFile
+from .stream import convertStream
+from .table import formatTable
+from .table import writeTable
+from .database import _useEnvironmentDatabase
+_useEnvironmentDatabase()
 from .units import runTests as _runTests
 if  __name__=='__main__':
     _runTests()
\ No newline at end of file
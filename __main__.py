@@ -0,0 +1,61 @@
+__doc__="""__main__.py
+
+Command line interface for pyunits.
+
+Call from command line as: python -m pyunits convert input.csv output.csv --column "speed=m/s"
+"""
+import argparse
+import sys
+from .stream import convertFile
+from .units import UnitError
+def _columnUnits(values):
+    """_columnUnits(values)
+    Parse a list of COLUMN=UNITS strings into a dictionary, treating numeric columns as 0 based indices.
+    """
+    result={}
+    for value in values or []:
+        column,separator,units=value.partition('=')
+        if not separator or not units:
+            raise argparse.ArgumentTypeError('Expected COLUMN=UNITS, got '+value)
+        if column.isdigit():
+            column=int(column)
+        result[column]=units
+    return result
+def _convert(args):
+    delimiter=args.delimiter
+    if args.whitespace:
+        delimiter=None
+    result=convertFile(args.input,args.output,_columnUnits(args.column),_columnUnits(args.units),delimiter,not args.no_header,args.chunk_size)
+    sys.stderr.write('Converted {rows} rows in {seconds:.3f}s ({rowsPerSecond:.0f} rows/s)\n'.format(**result))
+def _test(args):
+    from .tests import runTests
+    runTests()
+def main(argv=None):
+    """main(argv=None)
+    Run the pyunits command line interface.
+    """
+    parser=argparse.ArgumentParser(prog='pyunits')
+    commands=parser.add_subparsers(dest='command')
+    convert=commands.add_parser('convert',help='convert columns of a CSV or whitespace delimited file')
+    convert.add_argument('input',help="input file, or - for stdin")
+    convert.add_argument('output',help="output file, or - for stdout")
+    convert.add_argument('-c','--column',action='append',required=True,metavar='COLUMN=UNITS',help='column name or 0 based index and the units to convert it to')
+    convert.add_argument('-u','--units',action='append',metavar='COLUMN=UNITS',help='units of a column, overriding any [units] in the header')
+    convert.add_argument('-d','--delimiter',default=',',help='field delimiter (default ,)')
+    convert.add_argument('-w','--whitespace',action='store_true',help='split fields on whitespace')
+    convert.add_argument('--no-header',action='store_true',help='the file has no header row')
+    convert.add_argument('--chunk-size',type=int,default=10000,help='rows converted per chunk (default 10000)')
+    convert.set_defaults(function=_convert)
+    test=commands.add_parser('test',help='run the tests of every module')
+    test.set_defaults(function=_test)
+    args=parser.parse_args(argv)
+    if not hasattr(args,'function'):
+        parser.print_help()
+        return 2
+    try:
+        args.function(args)
+    except (UnitError,argparse.ArgumentTypeError) as e:
+        parser.exit(1,'pyunits: error: '+str(e)+'\n')
+    return 0
+if  __name__=='__main__':
+    sys.exit(main())
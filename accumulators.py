@@ -0,0 +1,178 @@
+__doc__="""accumulators.py
+
+Streaming statistics of Unit readings in a fixed target unit, kept as raw floats.
+"""
+import math
+from .units import Unit,UnitError,_differenceUnits,_isAbsolute
+class UnitAccumulator(object):
+    __doc__="""Running count, sum, mean, variance, minimum and maximum of readings converted to one target unit.
+
+    Each reading is converted with a (factor,offset) transform looked up once per source unit, and the statistics are
+    kept as floats: a compensated (Neumaier) sum, Welford's mean and sum of squared deviations, and the minimum and
+    maximum. Unit results are only created when a statistic is read. Accumulators of the same quantity can be merged,
+    e.g. after splitting a stream across workers, and are picklable.
+
+    Readings may be Unit values, plain numbers in the units passed to add or extend, or plain numbers in the target
+    units. If no target units are given, the units of the first reading with units are used, and readings of other
+    dimensions raise a DimensionError. Absolute temperatures in an affine unit such as 'degC' are converted with their offset, and their sum is a
+    UnitError as it is for Unit addition."""
+    def __init__(self,units=False):
+        self.units=units
+        self.count=0
+        self._total=0.0
+        self._compensation=0.0
+        self._mean=0.0
+        self._squares=0.0
+        self._min=float('inf')
+        self._max=float('-inf')
+        self._transforms={}
+    def _transform(self,units):
+        """_transform(units)
+        Return the (factor,offset) converting readings in units to the target units, resolving it once per units.
+        Without target units, the units of the first reading that has them become the target units.
+        """
+        transform=self._transforms.get(units)
+        if transform is None:
+            if units and not self.units:
+                self.units=units
+            if units and self.units:
+                transform=Unit(1).conversionTransform(units,self.units)
+            else:
+                transform=(1.0,0.0)
+            self._transforms[units]=transform
+        return transform
+    def add(self,value,units=None):
+        """add(value,units=None)
+        Add one reading, in units if they are given, otherwise in the units of a Unit value or the target units.
+        """
+        self.extend((value,),units)
+        return self
+    def extend(self,values,units=None):
+        """extend(values,units=None)
+        Add an iterable of readings, which may mix units. If units is given every reading is a number in those units.
+        """
+        count,total,compensation=self.count,self._total,self._compensation
+        mean,squares,minimum,maximum=self._mean,self._squares,self._min,self._max
+        lastDescriptor=None
+        factor,offset=1.0,0.0
+        if units is not None:
+            factor,offset=self._transform(units)
+        try:
+            for value in values:
+                if units is None:
+                    #Unit values share one descriptor per units string, so the transform only changes with the units
+                    descriptor=getattr(value,'_descriptor',None)
+                    if descriptor is not lastDescriptor:
+                        factor,offset=self._transform(descriptor.units if descriptor is not None else False)
+                        lastDescriptor=descriptor
+                value=float(value)*factor+offset
+                #Neumaier compensated sum
+                newTotal=total+value
+                if abs(total)>=abs(value):
+                    compensation+=(total-newTotal)+value
+                else:
+                    compensation+=(value-newTotal)+total
+                total=newTotal
+                #Welford update of the mean and sum of squared deviations
+                count+=1
+                delta=value-mean
+                mean+=delta/count
+                squares+=delta*(value-mean)
+                if value<minimum:
+                    minimum=value
+                if value>maximum:
+                    maximum=value
+        finally:
+            self.count,self._total,self._compensation=count,total,compensation
+            self._mean,self._squares,self._min,self._max=mean,squares,minimum,maximum
+        return self
+    def merge(self,other):
+        """merge(other)
+        Combine the statistics of another accumulator into this one, converting them if its target units differ.
+        """
+        if not other.count:
+            return self
+        factor,offset=self._transform(other.units)
+        total=other._total*factor+other.count*offset
+        compensation=other._compensation*factor
+        mean=other._mean*factor+offset
+        squares=other._squares*factor*factor
+        minimum=other._min*factor+offset
+        maximum=other._max*factor+offset
+        if not self.count:
+            self.count,self._total,self._compensation=other.count,total,compensation
+            self._mean,self._squares,self._min,self._max=mean,squares,minimum,maximum
+            return self
+        #Combine the means and squared deviations of the two parts (Chan et al.)
+        count=self.count+other.count
+        delta=mean-self._mean
+        self._squares+=squares+delta*delta*self.count*other.count/count
+        self._mean+=delta*other.count/count
+        self.count=count
+        newTotal=self._total+total
+        if abs(self._total)>=abs(total):
+            self._compensation+=(self._total-newTotal)+total
+        else:
+            self._compensation+=(total-newTotal)+self._total
+        self._total=newTotal
+        self._compensation+=compensation
+        self._min=min(self._min,minimum)
+        self._max=max(self._max,maximum)
+        return self
+    def _check(self):
+        if not self.count:
+            raise UnitError('No readings have been accumulated')
+    def sum(self):
+        """sum()
+        Return the compensated sum of the readings as a Unit in the target units.
+        """
+        if _isAbsolute(self.units):
+            raise UnitError('Cannot add absolute temperatures in '+self.units)
+        return Unit(self._total+self._compensation,self.units)
+    def mean(self):
+        """mean()
+        Return the mean of the readings as a Unit in the target units.
+        """
+        self._check()
+        return Unit(self._mean,self.units)
+    def min(self):
+        """min()
+        Return the smallest reading as a Unit in the target units.
+        """
+        self._check()
+        return Unit(self._min,self.units)
+    def max(self):
+        """max()
+        Return the largest reading as a Unit in the target units.
+        """
+        self._check()
+        return Unit(self._max,self.units)
+    def variance(self,ddof=0):
+        """variance(ddof=0)
+        Return the variance of the readings, dividing by count-ddof, as a Unit in the square of the target units.
+        """
+        self._check()
+        if self.count<=ddof:
+            raise UnitError('Not enough readings for the variance with ddof='+str(ddof))
+        units=_differenceUnits(self.units)
+        factor=1.0
+        if units:
+            units,factor=Unit(1).productUnits(units,units)
+        return Unit(self._squares/(self.count-ddof)*factor,units)
+    def std(self,ddof=0):
+        """std(ddof=0)
+        Return the standard deviation of the readings, dividing by count-ddof, as a Unit in the target units.
+        """
+        self._check()
+        if self.count<=ddof:
+            raise UnitError('Not enough readings for the standard deviation with ddof='+str(ddof))
+        return Unit(math.sqrt(self._squares/(self.count-ddof)),_differenceUnits(self.units))
+    def __len__(self):
+        return self.count
+    def __repr__(self):
+        return 'UnitAccumulator('+repr(self.units)+', count='+str(self.count)+')'
+def runTests():
+    from .tests.testAccumulators import runTests
+    runTests()
+if  __name__=='__main__':
+    runTests()
@@ -0,0 +1,208 @@
+__doc__="""aio.py
+
+Conversion of asynchronous streams of readings to a target unit, for asyncio applications. Requires python 3.5 or later.
+
+    from pyunits.aio import convertAsync
+
+    async with convertAsync(readings,'m/s') as converted:
+        while True:
+            try:
+                value=await converted.__anext__()
+            except UnitError as error:
+                log(error)
+                continue
+            except StopAsyncIteration:
+                break
+            ...
+
+or, when bad readings should be passed to a callback and skipped,
+
+    async for value in convertAsync(readings,'m/s',onError=log):
+        ...
+"""
+import asyncio
+from collections import deque
+from .units import Unit,UnitError,unitsFromDescriptors
+_end=object()
+class _Buffer(deque):
+    __doc__="""Readings waiting to be converted, and the future of whichever side is waiting for the other.
+
+    Only one side waits at a time: the consumer when the buffer is empty, the producer when it is full. The producer task
+    holds the buffer rather than the AsyncConverter, so a converter that is no longer referenced can be finalised."""
+    waiter=None
+    async def wait(self):
+        self.waiter=asyncio.get_event_loop().create_future()
+        await self.waiter
+    def wake(self):
+        waiter=self.waiter
+        if waiter is not None:
+            self.waiter=None
+            if not waiter.done():
+                waiter.set_result(None)
+async def _produce(readings,buffer,queueSize):
+    try:
+        async for reading in readings:
+            buffer.append(reading)
+            if buffer.waiter is not None:
+                buffer.wake()
+            if len(buffer)>=queueSize:
+                await buffer.wait()
+    except Exception as error:
+        buffer.append((_end,error))
+    else:
+        buffer.append((_end,None))
+    buffer.wake()
+class AsyncConverter(object):
+    __doc__="""Asynchronous iterator of the readings of an async iterable converted to one target unit.
+
+    A reading is a (value,units) pair, a Unit value, or a plain number in fromUnits (or unitless if fromUnits is not
+    given). Readings are read by a separate task into a buffer holding at most queueSize readings, so a slow consumer
+    stops the source being read rather than letting readings pile up in memory. Each batch takes every reading already
+    waiting in the buffer, up to batchSize, so batches grow under load without delaying readings that arrive slowly.
+    Within a batch each units string is resolved to a (factor,offset) transform once, and values are converted
+    sliceSize at a time, returning control to the event loop between slices.
+
+    Conversion follows Unit.convert, including affine units such as 'degC'. A reading which cannot be converted, e.g.
+    because its dimensions do not match, raises its UnitError from __anext__, and iteration can continue with the next
+    reading. If onError is given it is called with the reading and the UnitError instead, and the reading is skipped.
+    Results are Unit values, or floats if asUnits is False. If toUnits is empty the values are passed through unconverted.
+
+    The source is read until it ends or the converter is closed with aclose or async with. A converter which is dropped
+    before then cancels the reading task when it is finalised."""
+    def __init__(self,readings,toUnits,fromUnits=None,asUnits=True,batchSize=1024,queueSize=None,sliceSize=256,
+                 onError=None):
+        self.toUnits=toUnits
+        self.fromUnits=fromUnits
+        self.asUnits=asUnits
+        self.batchSize=batchSize
+        self.sliceSize=sliceSize
+        self.onError=onError
+        self._readings=readings
+        self._queueSize=queueSize if queueSize is not None else 4*batchSize
+        self._buffer=_Buffer()
+        self._task=None
+        self._results=deque()
+        self._finished=False
+        self._descriptor=Unit(1,toUnits)._descriptor if toUnits else Unit._noUnits
+    def __aiter__(self):
+        return self
+    async def __aenter__(self):
+        return self
+    async def __aexit__(self,*exception):
+        await self.aclose()
+    def __del__(self):
+        #A consumer which stops without aclose or async with would otherwise leave the source being read
+        task=self._task
+        if task is not None and not task.done():
+            try:
+                task.cancel()
+            except RuntimeError:
+                #The event loop has already been closed
+                pass
+    def _start(self):
+        self._task=asyncio.ensure_future(_produce(self._readings,self._buffer,self._queueSize))
+    async def _nextBatch(self):
+        """_nextBatch()
+        Wait for at least one reading and return every reading waiting in the buffer, up to batchSize.
+        """
+        buffer=self._buffer
+        while not buffer:
+            await buffer.wait()
+        popleft=buffer.popleft
+        batch=[popleft() for i in range(min(len(buffer),self.batchSize))]
+        buffer.wake()
+        return batch
+    def _split(self,reading):
+        if isinstance(reading,tuple):
+            return reading
+        descriptor=getattr(reading,'_descriptor',None)
+        if descriptor is not None:
+            return reading,descriptor.units
+        return reading,self.fromUnits
+    def _convert(self,batch,transforms):
+        """_convert(batch,transforms)
+        Convert a slice of readings, appending (value,None) or (reading,UnitError) to the results. transforms maps each
+        units string seen in the batch to its (factor,offset) or UnitError.
+        """
+        values=[]
+        errors=[]
+        for reading in batch:
+            try:
+                value,units=self._split(reading)
+                transform=transforms.get(units)
+                if transform is None:
+                    try:
+                        transform=Unit(1).conversionTransform(units,self.toUnits) if units and self.toUnits else (1.0,0.0)
+                    except UnitError as error:
+                        transform=error
+                    transforms[units]=transform
+                if isinstance(transform,UnitError):
+                    raise transform
+                factor,offset=transform
+                values.append(float(value)*factor+offset)
+            except (TypeError,ValueError):
+                errors.append((len(values)+len(errors),reading,UnitError('Cannot convert reading '+repr(reading))))
+            except UnitError as error:
+                errors.append((len(values)+len(errors),reading,error))
+        if self.asUnits:
+            values=unitsFromDescriptors(values,[self._descriptor]*len(values))
+        results=[(value,None) for value in values]
+        for index,reading,error in errors:
+            results.insert(index,(reading,error))
+        self._results.extend(results)
+    async def _fill(self):
+        batch=await self._nextBatch()
+        error=None
+        if isinstance(batch[-1],tuple) and batch[-1] and batch[-1][0] is _end:
+            self._finished=True
+            error=batch.pop()[1]
+        transforms={}
+        for start in range(0,len(batch),self.sliceSize):
+            if start:
+                await asyncio.sleep(0)
+            self._convert(batch[start:start+self.sliceSize],transforms)
+        if error is not None:
+            self._results.append((_end,error))
+    async def __anext__(self):
+        while True:
+            if not self._results:
+                if self._finished:
+                    raise StopAsyncIteration
+                if self._task is None:
+                    self._start()
+                await self._fill()
+                continue
+            value,error=self._results.popleft()
+            if error is None:
+                return value
+            if value is _end:
+                #The source itself failed, so the stream ends with its exception
+                self._finished=True
+                self._results.clear()
+                raise error
+            if self.onError is None:
+                raise error
+            self.onError(value,error)
+    async def aclose(self):
+        """aclose()
+        Stop reading the source and discard any readings not yet converted.
+        """
+        self._finished=True
+        self._results.clear()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+def convertAsync(readings,toUnits,fromUnits=None,asUnits=True,batchSize=1024,queueSize=None,sliceSize=256,onError=None):
+    """convertAsync(readings,toUnits,fromUnits=None,asUnits=True,batchSize=1024,queueSize=None,sliceSize=256,onError=None)
+    Return an AsyncConverter of an async iterable of readings, which are (value,units) pairs, Unit values or numbers in
+    fromUnits, yielding Unit values in toUnits, or floats if asUnits is False. queueSize defaults to 4*batchSize.
+    """
+    return AsyncConverter(readings,toUnits,fromUnits,asUnits,batchSize,queueSize,sliceSize,onError)
+def runTests():
+    from .tests.testAio import runTests
+    runTests()
+if  __name__=='__main__':
+    runTests()
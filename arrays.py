@@ -0,0 +1,203 @@
+from .units import DimensionError,Unit,UnitError,_differenceUnits,_isAbsolute
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('UnitArray requires numpy')
+    return numpy
+class UnitArray(object):
+    __doc__="""Array of values sharing a single unit, backed by a numpy ndarray.
+
+    Arithmetic follows the same rules as Unit, with one dimension check and one vectorized operation per call.
+    numpy is imported when the first UnitArray is created."""
+    _unit=Unit(1)
+    def __init__(self,values,units=False):
+        self.values=_numpy().asarray(values,dtype=float)
+        self.units=units
+        self.dimensions=False
+        if units:
+            self.dimensions=self._unit.parseUnits(units)[0]
+    def __len__(self):
+        return len(self.values)
+    def __iter__(self):
+        for value in self.values:
+            yield Unit(value,self.units)
+    def __array__(self,dtype=None):
+        if dtype is None:
+            return self.values
+        return self.values.astype(dtype)
+    def __getitem__(self,index):
+        values=self.values[index]
+        if _numpy().ndim(values):
+            return UnitArray(values,self.units)
+        return Unit(values,self.units)
+    def __repr__(self):
+        if self.units:
+            return 'UnitArray('+repr(self.values.tolist())+', '+repr(self.units)+')'
+        return 'UnitArray('+repr(self.values.tolist())+')'
+    @property
+    def shape(self):
+        return self.values.shape
+    def _otherValues(self,other):
+        """_otherValues(other)
+        Return the values of a Unit or UnitArray converted to the units of this array, checking dimensions once.
+        Absolute temperatures are converted with their offsets, as in Unit.convertValue.
+        """
+        if not other.dimensions or other.dimensions==self.dimensions:
+            values=_numpy().asarray(other,dtype=float)
+            if other.units and self.units:
+                factor,offset=self._unit.conversionTransform(other.units,self.units)
+                if offset:
+                    return values*factor+offset
+                return values*factor
+            return values
+        raise DimensionError('Dimensionality of units does not match')
+    def _affineSum(self,other,subtract):
+        """_affineSum(other,subtract)
+        Add or subtract a Unit or UnitArray where at least one side is an absolute temperature in an affine unit such as
+        'degC'. The units of the result, and any UnitError, come from Unit._affineSum of unit valued operands.
+        """
+        left=Unit(0.0,self.units)
+        right=Unit(0.0,other.units)
+        units=left._affineSum(right,subtract).units
+        otherValues=_numpy().asarray(other,dtype=float)
+        if left._descriptor.offset and right._descriptor.offset:
+            return UnitArray(self.values-self._otherValues(other),units)
+        if left._descriptor.offset:
+            if right._descriptor.dimensions:
+                #The difference is scaled without the offset
+                otherValues=otherValues*self._unit.conversionFactor(other.units,self.units)
+            if subtract:
+                return UnitArray(self.values-otherValues,units)
+            return UnitArray(self.values+otherValues,units)
+        values=self.values
+        if left._descriptor.dimensions:
+            values=values*self._unit.conversionFactor(self.units,other.units)
+        return UnitArray(values+otherValues,units)
+    def _ratio(self,other,operator):
+        """_ratio(other,operator)
+        Apply a Unit operator to unit valued ones, returning the scale factor and units of the result.
+        """
+        result=operator(Unit(1.0,self.units),Unit(1.0,other.units))
+        return float(result),result.units
+    def __add__(self,other):
+        if isinstance(other,(Unit,UnitArray)):
+            if _isAbsolute(self.units) or _isAbsolute(other.units):
+                return self._affineSum(other,False)
+            if not self.dimensions:
+                return UnitArray(self.values+_numpy().asarray(other,dtype=float),other.units)
+            return UnitArray(self.values+self._otherValues(other),self.units)
+        return UnitArray(self.values+other,self.units)
+    def __radd__(self,other):
+        return UnitArray(other+self.values,self.units)
+    def __sub__(self,other):
+        if isinstance(other,(Unit,UnitArray)):
+            if _isAbsolute(self.units) or _isAbsolute(other.units):
+                return self._affineSum(other,True)
+            if not self.dimensions:
+                return UnitArray(self.values-_numpy().asarray(other,dtype=float),other.units)
+            return UnitArray(self.values-self._otherValues(other),self.units)
+        return UnitArray(self.values-other,self.units)
+    def __rsub__(self,other):
+        return UnitArray(other-self.values,self.units)
+    def __mul__(self,other):
+        if isinstance(other,(Unit,UnitArray)):
+            factor,units=self._ratio(other,Unit.__mul__)
+            return UnitArray(self.values*_numpy().asarray(other,dtype=float)*factor,units)
+        return UnitArray(self.values*other,self.units)
+    def __rmul__(self,other):
+        return UnitArray(other*self.values,self.units)
+    def __truediv__(self,other):
+        if isinstance(other,(Unit,UnitArray)):
+            factor,units=self._ratio(other,Unit.__truediv__)
+            return UnitArray(self.values/_numpy().asarray(other,dtype=float)*factor,units)
+        return UnitArray(self.values/other,self.units)
+    def __rtruediv__(self,other):
+        return UnitArray(other/self.values,Unit(1.0,self.units).invert().units)
+    __div__=__truediv__
+    __rdiv__=__rtruediv__
+    def __neg__(self):
+        return UnitArray(-self.values,self.units)
+    def __abs__(self):
+        return UnitArray(abs(self.values),self.units)
+    def _compare(self,other,operator):
+        if isinstance(other,(Unit,UnitArray)):
+            return operator(self.values,self._otherValues(other))
+        return operator(self.values,other)
+    def __eq__(self,other):
+        try:
+            return self._compare(other,_numpy().equal)
+        except UnitError:
+            return _numpy().zeros(self.values.shape,dtype=bool)
+    def __ne__(self,other):
+        return ~self.__eq__(other)
+    def __ge__(self,other):
+        return self._compare(other,_numpy().greater_equal)
+    def __gt__(self,other):
+        return self._compare(other,_numpy().greater)
+    def __le__(self,other):
+        return self._compare(other,_numpy().less_equal)
+    def __lt__(self,other):
+        return self._compare(other,_numpy().less)
+    __hash__=None
+    def convert(self,unit):
+        """convert(unit)
+        Return a new UnitArray with the values converted to unit.
+        """
+        if unit and self.units:
+            factor,offset=self._unit.conversionTransform(self.units,unit)
+            if offset:
+                return UnitArray(self.values*factor+offset,unit)
+            return UnitArray(self.values*factor,unit)
+        return self
+    def invert(self):
+        """invert()
+        Return a new UnitArray of the reciprocal values with inverted units.
+        """
+        return UnitArray(1.0/self.values,Unit(1.0,self.units).invert().units)
+    def _reduce(self,values):
+        if _numpy().ndim(values):
+            return UnitArray(values,self.units)
+        return Unit(values,self.units)
+    def sum(self,axis=None):
+        if _isAbsolute(self.units):
+            raise UnitError('Cannot add absolute temperatures in '+self.units)
+        return self._reduce(self.values.sum(axis))
+    def mean(self,axis=None):
+        return self._reduce(self.values.mean(axis))
+    def min(self,axis=None):
+        return self._reduce(self.values.min(axis))
+    def max(self,axis=None):
+        return self._reduce(self.values.max(axis))
+    def variance(self,axis=None,ddof=0):
+        """variance(axis=None,ddof=0)
+        Return the variance of the values, dividing by count-ddof, in the square of the units.
+        """
+        values=self.values.var(axis,ddof=ddof)
+        units=_differenceUnits(self.units)
+        if units:
+            units,factor=self._unit.productUnits(units,units)
+            values=values*factor
+        if _numpy().ndim(values):
+            return UnitArray(values,units)
+        return Unit(values,units)
+    def std(self,axis=None,ddof=0):
+        """std(axis=None,ddof=0)
+        Return the standard deviation of the values, dividing by count-ddof, in the units, or in the 'delta_' units of
+        absolute temperatures.
+        """
+        values=self.values.std(axis,ddof=ddof)
+        if _numpy().ndim(values):
+            return UnitArray(values,_differenceUnits(self.units))
+        return Unit(values,_differenceUnits(self.units))
+def _hasNumpy():
+    try:
+        _numpy()
+    except ImportError:
+        return False
+    return True
+def runTests():
+    from .tests.testArrays import runTests
+    runTests()
+if  __name__=='__main__':
+    runTests()
@@ -0,0 +1,471 @@
+__doc__="""benchmark.py
+
+Benchmarks for pyunits.
+
+Call from command line as: python -m pyunits.benchmark -o results.json
+
+Results are written as JSON so runs from different releases can be compared with --compare baseline.json.
+"""
+import argparse
+import json
+import operator
+import platform
+import sys
+import time
+import timeit
+from re import compile
+from .deferred import lazy
+from .units import Unit,UnitError
+class _DictUnit(float):
+    __doc__="""Unit layout prior to __slots__: a per-instance __dict__ holding the units string and order dict."""
+    def __new__(cls,value,units,order):
+        self=float.__new__(cls,value)
+        self.units=units
+        self.order=order
+        return self
+    def __reduce__(self):
+        return (_DictUnit,(float(self),self.units,self.order))
+def _layoutSize(objects):
+    """_layoutSize(objects)
+    Return the total bytes used by a list of unit values, counting the list, each instance, its __dict__ and any
+    per-instance order dict. Objects shared between instances are only counted once.
+    """
+    seen=set()
+    total=sys.getsizeof(objects)
+    for item in objects:
+        parts=[item]
+        if hasattr(item,'__dict__'):
+            parts.extend([item.__dict__,item.__dict__['order']])
+        else:
+            parts.extend([item._descriptor,item._descriptor.dimensions])
+        for part in parts:
+            if id(part) not in seen:
+                seen.add(id(part))
+                total+=sys.getsizeof(part)
+    return total
+def memoryBenchmark(count=1000000,units='kg*m/s**2'):
+    """memoryBenchmark(count=1000000,units='kg*m/s**2')
+    Compare the memory used by count unit values in the old __dict__ layout and the slotted descriptor layout.
+    Returns a dictionary of total and per-instance bytes for each layout.
+    """
+    order=Unit(1,units).order
+    old=[_DictUnit(i,units,dict(order)) for i in range(count)]
+    oldBytes=_layoutSize(old)
+    del old
+    new=[Unit(i,units) for i in range(count)]
+    newBytes=_layoutSize(new)
+    del new
+    return {'count':count,'units':units,'dictBytes':oldBytes,'slotsBytes':newBytes,
+            'dictBytesPerInstance':float(oldBytes)/count,'slotsBytesPerInstance':float(newBytes)/count,
+            'ratio':float(oldBytes)/newBytes}
+_typicalUnits=['m','km','ft','s','kg','kg/m**3','m/s','m/s**2','km/hr','miles/hr','kg*m/s**2','kg*m**2/s**2','N*m','kJ','C/s','lb/ft**3','kN/m**2','g/cm**3']
+class _LegacyParser(object):
+    __doc__="""The regex split parsing path used by Unit.setUnits before the expression parser, kept for benchmarking."""
+    def __init__(self):
+        self.unit=Unit(1)
+    def parse(self,units):
+        multiply=compile(Unit._separators['MULTIPLY'])
+        divide=compile(Unit._separators['DIVIDE'])
+        actUnit=dict(zip(['Numerator','Denominator'],[multiply.split('*'.join(divide.split(units)[::2])),multiply.split('*'.join(divide.split(units)[1::2]))]))
+        return self.unit.combine(self.unitParse(actUnit['Numerator']),self.unitParse(actUnit['Denominator']))
+    def unitParse(self,unitList):
+        scaling=1
+        order={}
+        for i in range(len(unitList)):
+            unit=unitList[i]
+            if unit=='':
+                continue
+            try:
+                unit=float(unit)
+                if i==0:
+                    raise ValueError('Cannot Parse unit incorrect format, number found before unit')
+                else:
+                    o,s=self.unitParse([unitList[i-1]])
+                    for key in o.keys():
+                        order[key]+=(unit-1)*o[key]
+                        scaling*=s**(unit-1)
+                continue
+            except:
+                pass
+            if self.unit.isCompound(unit):
+                order,scaling=self.getCompoundUnit(order,scaling,unit)
+                continue
+            UnitParams=self.unit.getUnit(unit)
+            try:
+                order[UnitParams[0]['TYPE']]+=1
+            except KeyError:
+                order[UnitParams[0]['TYPE']]=1
+            scaling*=UnitParams[0]['SIVAL']*UnitParams[1]
+        return order,scaling
+    def getCompoundUnit(self,order,scaling,unit):
+        multiply=compile(Unit._separators['MULTIPLY'])
+        divide=compile(Unit._separators['DIVIDE'])
+        if unit[1:] in Unit._compoundUnits and unit[0] in Unit._prefixes.keys():
+            scaling*=Unit._prefixes[unit[0]]
+            unit=unit[1:]
+        scaling*=Unit._compoundUnits[unit]['SIVAL']
+        units=dict(zip(['Numerator','Denominator'],[multiply.split('*'.join(divide.split(Unit._compoundUnits[unit]['UNITS'])[::2])),multiply.split('*'.join(divide.split(Unit._compoundUnits[unit]['UNITS'])[1::2]))]))
+        newOrderNum,newScaling=self.unitParse(units['Numerator'])
+        scaling*=newScaling
+        newOrderDen,newScaling=self.unitParse(units['Denominator'])
+        scaling/=newScaling
+        for type in set(newOrderNum)|set(newOrderDen):
+            order[type]=order.get(type,0)+newOrderNum.get(type,0)-newOrderDen.get(type,0)
+        return order,scaling
+def _legacyFormat(unit,formatSpec):
+    """_legacyFormat(unit,formatSpec)
+    The Unit.__format__ implementation prior to the format plan cache, compiling its regex on every call, kept for benchmarking.
+    """
+    import re
+    r=re.compile("\.?([<>=\^]?)([\d\.]*)([FfgGeEn]?)([ _]?)(.*)")
+    m=r.match(formatSpec)
+    formatSpec=m.group(1)+m.group(2)+m.group(3)
+    if formatSpec=='.':
+        formatSpec=''
+    showUnits=True
+    if len(m.group(5)):
+        showUnits=m.group(5)[-1]!='A'
+    newUnits=m.group(5).rstrip('a')
+    newUnits=newUnits.rstrip('A')
+    space=''
+    if len(m.group(4)):
+        space=' '
+    newUnits=newUnits.strip()
+    if newUnits!='':
+        if not showUnits:
+            formatSpec+='A'
+        else:
+            formatSpec+=space+'a'
+        return _legacyFormat(unit.convert(newUnits),formatSpec)
+    if unit.units and showUnits:
+        return float.__format__(float(unit),formatSpec)+space+unit.units
+    return float.__format__(float(unit),formatSpec)
+_formatSpecs=['>10.3f','>10.3f a','>5.3f km/sa','>5.3f km/sA','.2e ft/mina','>8.1f lb*ft/s**2A']
+def _bestOf(function,number,repeat=5):
+    return min(timeit.repeat(function,number=number,repeat=repeat))/number
+def parserBenchmark(units=_typicalUnits,number=200):
+    """parserBenchmark(units=_typicalUnits,number=200)
+    Time parsing each of a list of typical unit strings with the legacy regex split path and with the expression
+    parser, bypassing the parse cache. Returns a dictionary of seconds per pass over the list and the speedup.
+    """
+    unit=Unit(1)
+    legacyParser=_LegacyParser()
+    def legacy():
+        for item in units:
+            legacyParser.parse(item)
+    def parser():
+        for item in units:
+            unit.compileUnits(item)
+    legacySeconds=_bestOf(legacy,number)
+    parserSeconds=_bestOf(parser,number)
+    return {'units':len(units),'legacySeconds':legacySeconds,'parserSeconds':parserSeconds,'speedup':legacySeconds/parserSeconds}
+_operators=[('add',operator.add),('sub',operator.sub),('mul',operator.mul),('truediv',operator.truediv),('mod',operator.mod),
+            ('eq',operator.eq),('ne',operator.ne),('lt',operator.lt),('le',operator.le),('gt',operator.gt),('ge',operator.ge)]
+_operands=[('same',Unit(2.5,'m'),Unit(1.5,'m')),('converted',Unit(2.5,'m'),Unit(1.5,'km')),('mismatched',Unit(2.5,'m'),Unit(1.5,'s')),
+           ('unitless',Unit(2.5,'m'),Unit(1.5)),('scalar',Unit(2.5,'m'),1.5)]
+def _operation(function,first,second):
+    def call():
+        try:
+            function(first,second)
+        except UnitError:
+            pass
+    return call
+def _cases():
+    """_cases()
+    Return a list of (name,callable) pairs covering construction, conversion, the binary operators, invert and formatting.
+    """
+    simple=Unit(1.5,'km')
+    compound=Unit(1.5,'kg*m/s**2')
+    chain=[Unit(1.5,'m'),Unit(2.5,'ft'),Unit(0.5,'km'),Unit(3.5,'miles')]
+    cases=[('construct.unitless',lambda:Unit(1.5)),
+           ('construct.simple',lambda:Unit(1.5,'m')),
+           ('construct.compound',lambda:Unit(1.5,'kg*m/s**2')),
+           ('convert.simple',lambda:simple.convert('ft')),
+           ('convert.compound',lambda:compound.convert('lb*ft/min**2')),
+           ('convert.named',lambda:Unit(1.5,'kN').convert('N')),
+           ('invert.simple',lambda:simple.invert()),
+           ('invert.compound',lambda:compound.invert()),
+           ('format.plain',lambda:'{0:.3f}'.format(simple)),
+           ('format.units',lambda:'{0:>10.3f a}'.format(simple)),
+           ('format.convert',lambda:'{0:>10.3f m a}'.format(simple)),
+           ('format.convertCompound',lambda:'{0:.3f lb*ft/min**2A}'.format(compound)),
+           ('chain.eager',lambda:(chain[0]+chain[1]+chain[2]+chain[3]).convert('km')),
+           ('chain.lazy',lambda:(lazy(chain[0])+chain[1]+chain[2]+chain[3]).convert('km'))]
+    for name,function in _operators:
+        for case,first,second in _operands:
+            cases.append(('operator.'+name+'.'+case,_operation(function,first,second)))
+    return cases
+def formatBenchmark(specs=_formatSpecs,cells=10000,repeat=5):
+    """formatBenchmark(specs=_formatSpecs,cells=10000,repeat=5)
+    Time formatting a table of cells values, one column per format spec, with the legacy __format__ that compiled its
+    regex and converted on every call and with the format plan cache. Returns seconds per table and the speedup.
+    """
+    columns=[[Unit(float(i),'m/s') for i in range(cells//len(specs))] for spec in specs]
+    columns[-1]=[Unit(float(i),'kg*m/s**2') for i in range(cells//len(specs))]
+    def legacy():
+        for spec,column in zip(specs,columns):
+            for value in column:
+                _legacyFormat(value,spec)
+    def planned():
+        for spec,column in zip(specs,columns):
+            for value in column:
+                format(value,spec)
+    legacySeconds=_bestOf(legacy,1,repeat)
+    plannedSeconds=_bestOf(planned,1,repeat)
+    return {'cells':len(specs)*len(columns[0]),'legacySeconds':legacySeconds,'plannedSeconds':plannedSeconds,
+            'speedup':legacySeconds/plannedSeconds}
+def tableBenchmark(cells=1000000,repeat=3):
+    """tableBenchmark(cells=1000000,repeat=3)
+    Compare writing a table of cells values, one column per format spec, by calling format on every cell and joining
+    the rows, and with writeTable. Returns seconds per table for each and the speedup.
+    """
+    from .table import _Output,writeTable
+    rows=cells//len(_formatSpecs)
+    names=[str(i) for i in range(len(_formatSpecs))]
+    columns=[[Unit(float(i),'m/s') for i in range(rows)] for spec in _formatSpecs]
+    columns[-1]=[Unit(float(i),'kg*m/s**2') for i in range(rows)]
+    specs=dict(zip(names,_formatSpecs))
+    def perCell():
+        output=_Output()
+        for row in zip(*columns):
+            output.write(' '.join([format(value,spec) for value,spec in zip(row,_formatSpecs)])+'\n')
+    def table():
+        writeTable(_Output(),list(zip(names,columns)),specs,header=False)
+    perCellSeconds=_bestOf(perCell,1,repeat)
+    tableSeconds=_bestOf(table,1,repeat)
+    return {'cells':rows*len(_formatSpecs),'perCellSeconds':perCellSeconds,'tableSeconds':tableSeconds,
+            'speedup':perCellSeconds/tableSeconds}
+def _legacyArithmetic(function,result):
+    """_legacyArithmetic(function,result)
+    Build the Unit operators prior to the same unit fast path, which checked dimensions and converted every Unit operand.
+    result is True for operators returning a Unit in the units of the first operand.
+    """
+    def operator(self,other):
+        if type(other)==type(self):
+            if not self.dimensions and result:
+                return Unit(function(float(self),float(other)),other.units)
+            if not other.dimensions or other.dimensions==self.dimensions:
+                if result:
+                    return Unit(function(float(self),other.convertValue(self.units)),self.units)
+                return function(float(self),other.convertValue(self.units))
+            raise UnitError('Dimensionality of units does not match')
+        if result:
+            return Unit(function(float(self),other),self.units)
+        return function(float(self),other)
+    return operator
+def arithmeticBenchmark(number=20000,repeat=5):
+    """arithmeticBenchmark(number=20000,repeat=5)
+    Time add, sub, eq and lt on operands in identical units and on unitless operands, with the operators prior to the
+    same unit fast path and with the current operators. Returns a dictionary of legacy and current seconds per operation
+    and the speedup for each case.
+    """
+    results={}
+    for case,first,second in [('same',Unit(2.5,'m/s'),Unit(1.5,'m/s')),('unitless',Unit(2.5,'m/s'),Unit(1.5))]:
+        for name,result in [('add',True),('sub',True),('eq',False),('lt',False)]:
+            function=getattr(operator,name)
+            legacy=_legacyArithmetic(function,result)
+            legacySeconds=_bestOf(lambda:legacy(first,second),number,repeat)
+            seconds=_bestOf(lambda:function(first,second),number,repeat)
+            results[name+'.'+case]={'legacySeconds':legacySeconds,'seconds':seconds,'speedup':legacySeconds/seconds}
+    return results
+def formulaBenchmark(number=100000,repeat=5):
+    """formulaBenchmark(number=100000,repeat=5)
+    Compare evaluating the kinetic energy 0.5*m*v**2 in kJ of m in lb and v in miles/hr with Unit arithmetic, with a
+    formula from compileFormula and with a hand written float function. Returns a dictionary of seconds for each and the
+    speedup of the compiled formula over Unit arithmetic.
+    """
+    from .formula import compileFormula
+    compiled=compileFormula('0.5*m*v**2',{'m':'lb','v':'miles/hr'},'kJ')
+    factor=0.5*0.45359237*(1609.344/3600)**2/1000
+    handWritten=lambda m,v:factor*m*v**2
+    def units():
+        for i in range(number):
+            v=Unit(60.0,'miles/hr')
+            (0.5*Unit(150.0,'lb')*v*v).convert('kJ')
+    def formula():
+        for i in range(number):
+            compiled(150.0,60.0)
+    def plain():
+        for i in range(number):
+            handWritten(150.0,60.0)
+    results={'number':number,'unitSeconds':_bestOf(units,1,repeat),'formulaSeconds':_bestOf(formula,1,repeat),
+             'plainSeconds':_bestOf(plain,1,repeat)}
+    results['speedup']=results['unitSeconds']/results['formulaSeconds']
+    return results
+def parallelBenchmark(count=4000000,processes=None,chunkSize=250000):
+    """parallelBenchmark(count=4000000,processes=None,chunkSize=250000)
+    Time convertParallel on count values with 1, 2, 4, ... up to processes worker processes (default the number of CPUs).
+    Returns a dictionary of seconds, values per second and speedup over one process for each pool size.
+    """
+    from array import array
+    from multiprocessing import cpu_count
+    from .parallel import convertParallel
+    values=array('d',range(count))
+    if processes is None:
+        processes=cpu_count()
+    sizes=[1]
+    while sizes[-1]*2<=processes:
+        sizes.append(sizes[-1]*2)
+    if sizes[-1]!=processes:
+        sizes.append(processes)
+    results={'count':count,'cpus':cpu_count()}
+    for size in sizes:
+        seconds=_bestOf(lambda:convertParallel(values,'ft','m',size,chunkSize),1,3)
+        results[str(size)]={'seconds':seconds,'valuesPerSecond':count/seconds,'speedup':results.get('1',{'seconds':seconds})['seconds']/seconds}
+    return results
+def codecBenchmark(count=1000000,units='kg*m/s**2',repeat=3):
+    """codecBenchmark(count=1000000,units='kg*m/s**2',repeat=3)
+    Compare the size and the dumps and loads seconds of count unit values pickled in the old __dict__ layout, pickled as
+    slotted Units and encoded with the binary codec. Returns a dictionary of bytes and seconds for each, and the ratios of
+    the old pickle to the codec.
+    """
+    try:
+        import cPickle as pickle
+    except ImportError:
+        import pickle
+    from . import codec
+    order=Unit(1,units).order
+    old=[_DictUnit(i,units,dict(order)) for i in range(count)]
+    new=[Unit(i,units) for i in range(count)]
+    results={'count':count,'units':units}
+    for name,values,module in [('dictPickle',old,pickle),('slotsPickle',new,pickle),('codec',new,codec)]:
+        if module is pickle:
+            dumps=lambda:pickle.dumps(values,pickle.HIGHEST_PROTOCOL)
+        else:
+            dumps=lambda:codec.dumps(values)
+        data=dumps()
+        results[name]={'bytes':len(data),'dumpsSeconds':_bestOf(dumps,1,repeat),
+                       'loadsSeconds':_bestOf(lambda:module.loads(data),1,repeat)}
+    for key in ['bytes','dumpsSeconds','loadsSeconds']:
+        results[key+'Ratio']=results['dictPickle'][key]/float(results['codec'][key])
+    return results
+def _importSeconds(environment,repeat):
+    """_importSeconds(environment,repeat)
+    Return the best of repeat times to import pyunits in a new python process with extra environment variables.
+    """
+    import os
+    import subprocess
+    #__name__ is '__main__' when run as python -m pyunits.benchmark
+    package=__package__
+    directory=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code='import time\nstart=time.time()\nimport '+package+'\nprint(repr(time.time()-start))'
+    environment=dict(os.environ,**environment)
+    environment['PYTHONPATH']=directory+os.pathsep+environment.get('PYTHONPATH','')
+    return min(float(subprocess.check_output([sys.executable,'-c',code],env=environment).decode().strip())
+               for i in range(repeat))
+def databaseBenchmark(units=1000,repeat=5,budget=0.25):
+    """databaseBenchmark(units=1000,repeat=5,budget=0.25)
+    Time importing pyunits with no unit database, with a database of units chained definitions loaded through
+    PYUNITS_DATABASE without a cache, and with its cache. Returns a dictionary of seconds for each, the cost of the
+    database over the plain import with the cache, and whether that is within budget seconds.
+    """
+    import os
+    import shutil
+    import tempfile
+    directory=tempfile.mkdtemp()
+    try:
+        path=os.path.join(directory,'units.ini')
+        with open(path,'w') as output:
+            output.write('[dimensions]\nLength = m\nMass = kg\nTime = s\nCharge = C\nTemperature = K\n\n'
+                         '[prefixes]\nk = 1000\nm = 1/1000\nM = 1000000\n\n[units]\nu0 = 1.5 m\n')
+            for i in range(1,units):
+                #Every other unit is compound, and each refers to an earlier one so resolving them recurses
+                if i%2:
+                    output.write('u{0} = 1.001 u{1}*kg/s**2\n'.format(i,i-1))
+                else:
+                    output.write('u{0} = 1/1000 ku{1}\n'.format(i,i-2))
+        results={'units':units,'budget':budget,'plain':_importSeconds({},repeat),
+                 'uncached':_importSeconds({'PYUNITS_DATABASE':path,'PYUNITS_DATABASE_CACHE':''},repeat)}
+        _importSeconds({'PYUNITS_DATABASE':path},1)
+        results['cached']=_importSeconds({'PYUNITS_DATABASE':path},repeat)
+    finally:
+        shutil.rmtree(directory)
+    results['databaseSeconds']=results['cached']-results['plain']
+    results['withinBudget']=results['databaseSeconds']<=budget
+    return results
+def suiteBenchmark(number=10000,repeat=5,match=None):
+    """suiteBenchmark(number=10000,repeat=5,match=None)
+    Time each benchmark case, optionally only those whose name contains match.
+    Returns a dictionary of case name to seconds and operations per second, taking the best of repeat runs of number calls.
+    """
+    results={}
+    for name,function in _cases():
+        if match and match not in name:
+            continue
+        seconds=_bestOf(function,number,repeat)
+        results[name]={'seconds':seconds,'opsPerSecond':1.0/seconds}
+    return results
+def compareResults(baseline,current,threshold=0.1):
+    """compareResults(baseline,current,threshold=0.1)
+    Compare two suiteBenchmark result dictionaries, returning a sorted list of (name,ratio) for each case that is more than
+    threshold slower in current than in baseline. ratio is the current time divided by the baseline time.
+    """
+    regressions=[]
+    for name in sorted(set(baseline)&set(current)):
+        ratio=current[name]['seconds']/baseline[name]['seconds']
+        if ratio>1+threshold:
+            regressions.append((name,ratio))
+    return regressions
+def runBenchmarks(number=10000,repeat=5,match=None,memory=False,parallel=False,codec=False,database=False,table=False):
+    """runBenchmarks(number=10000,repeat=5,match=None,memory=False,parallel=False,codec=False,database=False,table=False)
+    Run the benchmark suite, parser, format, arithmetic and formula benchmarks, the memory benchmark if memory is True, the
+    process pool benchmark if parallel is True, the binary codec benchmark if codec is True, the unit database import
+    benchmark if database is True and the table benchmark on 10**6 cells if table is True.
+    Returns a JSON serializable dictionary of the results and the python that produced them.
+    """
+    results={'python':platform.python_implementation()+' '+platform.python_version(),'platform':platform.platform(),
+             'time':time.strftime('%Y-%m-%dT%H:%M:%S'),'number':number,'repeat':repeat,
+             'operations':suiteBenchmark(number,repeat,match),'parser':parserBenchmark(),'format':formatBenchmark(),
+             'arithmetic':arithmeticBenchmark(),'formula':formulaBenchmark()}
+    if memory:
+        results['memory']=memoryBenchmark()
+    if parallel:
+        results['parallel']=parallelBenchmark()
+    if codec:
+        results['codec']=codecBenchmark()
+    if database:
+        results['database']=databaseBenchmark()
+    if table:
+        results['table']=tableBenchmark()
+    return results
+def main(argv=None):
+    """main(argv=None)
+    Run the benchmarks from the command line, writing JSON results to stdout or a file.
+    Returns 1 if --compare finds a regression or --database exceeds its budget, otherwise 0.
+    """
+    parser=argparse.ArgumentParser(prog='pyunits.benchmark')
+    parser.add_argument('-o','--output',default='-',help='JSON results file, or - for stdout (default -)')
+    parser.add_argument('-n','--number',type=int,default=10000,help='calls per timing run (default 10000)')
+    parser.add_argument('-r','--repeat',type=int,default=5,help='timing runs per case, the best is kept (default 5)')
+    parser.add_argument('-k','--match',help='only run cases whose name contains MATCH')
+    parser.add_argument('--memory',action='store_true',help='also compare the memory used by 10**6 instances')
+    parser.add_argument('--parallel',action='store_true',help='also time process pool conversion of 4*10**6 values on 1 to all CPUs')
+    parser.add_argument('--codec',action='store_true',help='also compare pickle and the binary codec on 10**6 values')
+    parser.add_argument('--database',action='store_true',help='also time importing pyunits with a database of 1000 units')
+    parser.add_argument('--table',action='store_true',help='also compare writeTable and per cell format on 10**6 cells')
+    parser.add_argument('--compare',metavar='BASELINE',help='report cases more than --threshold slower than a previous JSON results file')
+    parser.add_argument('--threshold',type=float,default=0.1,help='fractional slowdown reported by --compare (default 0.1)')
+    args=parser.parse_args(argv)
+    status=0
+    results=runBenchmarks(args.number,args.repeat,args.match,args.memory,args.parallel,args.codec,args.database,args.table)
+    text=json.dumps(results,indent=2,separators=(',',': '),sort_keys=True)
+    if args.output=='-':
+        sys.stdout.write(text+'\n')
+    else:
+        with open(args.output,'w') as output:
+            output.write(text+'\n')
+    if args.compare:
+        with open(args.compare) as input:
+            baseline=json.load(input)
+        regressions=compareResults(baseline['operations'],results['operations'],args.threshold)
+        for name,ratio in regressions:
+            sys.stderr.write('{0}: {1:.2f}x slower\n'.format(name,ratio))
+        if regressions:
+            status=1
+    if args.database and not results['database']['withinBudget']:
+        sys.stderr.write('database: {0:.3f} seconds over the {1:.3f} second budget\n'.format(
+            results['database']['databaseSeconds']-results['database']['budget'],results['database']['budget']))
+        status=1
+    return status
+if  __name__=='__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+__doc__="""binary.py
+
+Unit conversion of raw little endian float64 files through memory mapped windows, with the units recorded in a sidecar.
+"""
+import mmap
+import os
+import sys
+from array import array
+from .units import Unit,UnitError
+_itemSize=8
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+def sidecarPath(path):
+    """sidecarPath(path)
+    Return the path of the sidecar recording the units of a binary file, e.g. 'speed.bin.units'.
+    """
+    return path+'.units'
+def readSidecar(path):
+    """readSidecar(path)
+    Return the units recorded in the sidecar of a binary file, raising a UnitError if there is none.
+    """
+    try:
+        with open(sidecarPath(path)) as input:
+            units=input.readline().strip()
+    except IOError:
+        raise UnitError('No units sidecar found for '+path)
+    if not units:
+        raise UnitError('Units sidecar for '+path+' is empty')
+    return units
+def writeSidecar(path,units):
+    """writeSidecar(path,units)
+    Record the units of a binary file in its sidecar.
+    """
+    with open(sidecarPath(path),'w') as output:
+        output.write(units+'\n')
+def _windowBytes(windowSize):
+    #Windows start at multiples of the allocation granularity, which is a multiple of the item size
+    granularity=mmap.ALLOCATIONGRANULARITY
+    return max(granularity,(windowSize*_itemSize+granularity-1)//granularity*granularity)
+def _convertWindow(source,target,factor,offset,numpy):
+    """_convertWindow(source,target,factor,offset,numpy)
+    Multiply the little endian float64 values of the source window by factor and add offset into the target window,
+    which may be the same mapping. With numpy the values are converted in place in the mapping without a copy.
+    """
+    if numpy is not None:
+        values=numpy.frombuffer(source,dtype='<f8')
+        if source is not target:
+            values=numpy.multiply(values,factor,out=numpy.frombuffer(target,dtype='<f8'))
+        else:
+            values*=factor
+        if offset:
+            values+=offset
+        return
+    values=array('d')
+    if hasattr(values,'frombytes'):
+        values.frombytes(source[:])
+    else:
+        values.fromstring(source[:])
+    if sys.byteorder=='big':
+        values.byteswap()
+    if offset:
+        values=array('d',[value*factor+offset for value in values])
+    else:
+        values=array('d',map(factor.__mul__,values))
+    if sys.byteorder=='big':
+        values.byteswap()
+    if hasattr(values,'tobytes'):
+        target[:]=values.tobytes()
+    else:
+        target[:]=values.tostring()
+def convertBinaryFile(inputPath,toUnits,fromUnits=None,outputPath=None,sidecar=False,windowSize=1048576):
+    """convertBinaryFile(inputPath,toUnits,fromUnits=None,outputPath=None,sidecar=False,windowSize=1048576)
+    Convert a raw little endian float64 file to toUnits, in place or into a new file at outputPath.
+    fromUnits defaults to the units recorded in the sidecar of the input. The file is memory mapped windowSize values at
+    a time, so memory use is bounded whatever the size of the file. If sidecar is True a sidecar recording toUnits is
+    written next to the converted file, and an existing sidecar of a file converted in place is always rewritten.
+    Returns the number of values converted.
+    """
+    if fromUnits is None:
+        fromUnits=readSidecar(inputPath)
+    factor,shift=Unit(1).conversionTransform(fromUnits,toUnits)
+    size=os.path.getsize(inputPath)
+    if size%_itemSize:
+        raise UnitError('Size of '+inputPath+' is not a multiple of '+str(_itemSize)+' bytes')
+    numpy=_numpy()
+    windowBytes=_windowBytes(windowSize)
+    inPlace=outputPath is None or os.path.abspath(outputPath)==os.path.abspath(inputPath)
+    input=open(inputPath,'r+b' if inPlace else 'rb')
+    try:
+        output=input
+        if not inPlace:
+            output=open(outputPath,'w+b')
+            output.truncate(size)
+        try:
+            for offset in range(0,size,windowBytes):
+                length=min(windowBytes,size-offset)
+                if inPlace:
+                    window=mmap.mmap(input.fileno(),length,access=mmap.ACCESS_WRITE,offset=offset)
+                    try:
+                        _convertWindow(window,window,factor,shift,numpy)
+                        window.flush()
+                    finally:
+                        window.close()
+                else:
+                    source=mmap.mmap(input.fileno(),length,access=mmap.ACCESS_READ,offset=offset)
+                    try:
+                        target=mmap.mmap(output.fileno(),length,access=mmap.ACCESS_WRITE,offset=offset)
+                        try:
+                            _convertWindow(source,target,factor,shift,numpy)
+                            target.flush()
+                        finally:
+                            target.close()
+                    finally:
+                        source.close()
+        finally:
+            if output is not input:
+                output.close()
+    finally:
+        input.close()
+    #The sidecar of a file converted in place would otherwise record the units it had before
+    if sidecar or (inPlace and os.path.exists(sidecarPath(inputPath))):
+        writeSidecar(inputPath if inPlace else outputPath,toUnits)
+    return size//_itemSize
+def runTests():
+    from .tests.testBinary import runTests
+    runTests()
+if  __name__=='__main__':
+    runTests()
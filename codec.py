@@ -0,0 +1,195 @@
+__doc__="""codec.py
+
+Compact binary serialization of Unit values, lists of Unit values and UnitArrays.
+
+A message is the magic bytes b'PYU', a version byte and a kind byte ('u' a Unit, 'l' a list, 'a' a UnitArray followed by
+its shape), then a sequence of records, each starting with a one byte tag:
+
+    'U'  defines the next unit index: the units string and its dimension vector
+    'S'  a block of values sharing one unit: the unit index, the count and the packed values
+    'I'  a block of values with mixed units: the count, the index width, one index per value and the packed values
+    'E'  the end of the message
+
+Integers are little endian and values are little endian float64. Units are defined the first time a block uses them,
+so a message can be written in one pass.
+"""
+import struct
+import sys
+from array import array
+from io import BytesIO
+from itertools import repeat
+from operator import attrgetter
+from .units import DimensionError,Unit,UnitError,unitsFromDescriptors
+_magic=b'PYU'
+_version=1
+_unitHeader=struct.Struct('<H')
+_blockHeader=struct.Struct('<II')
+_indexHeader=struct.Struct('<IB')
+_dimensionsHeader=struct.Struct('<B')
+_indexTypes={1:'B',2:'H',4:'I'}
+_descriptor=attrgetter('_descriptor')
+def _pack(values):
+    """_pack(values)
+    Return an iterable of floats as packed little endian float64 bytes.
+    """
+    values=array('d',values)
+    if sys.byteorder=='big':
+        values.byteswap()
+    if hasattr(values,'tobytes'):
+        return values.tobytes()
+    return values.tostring()
+def _unpack(data,typecode='d'):
+    values=array(typecode)
+    if hasattr(values,'frombytes'):
+        values.frombytes(data)
+    else:
+        values.fromstring(data)
+    if sys.byteorder=='big':
+        values.byteswap()
+    return values
+def _readExact(stream,size):
+    data=stream.read(size)
+    if len(data)!=size:
+        raise UnitError('Unexpected end of pyunits binary data')
+    return data
+class _Writer(object):
+    __doc__="""Writes the records of one message, defining each unit the first time it is used."""
+    def __init__(self,stream):
+        self.stream=stream
+        self.indices={}
+    def index(self,descriptor):
+        units=descriptor.units or ''
+        index=self.indices.get(units)
+        if index is None:
+            index=self.indices[units]=len(self.indices)
+            encoded=units.encode('utf-8')
+            dimensions=descriptor.dimensions or ()
+            self.stream.write(b'U'+_unitHeader.pack(len(encoded))+encoded+_dimensionsHeader.pack(len(dimensions))+_pack(dimensions))
+        return index
+    def block(self,values,descriptors):
+        """block(values,descriptors)
+        Write a block of values with one descriptor per value, as a single unit block if they share one.
+        """
+        if len(set(descriptors))==1:
+            self.single(values,descriptors[0])
+            return
+        indices=[self.index(descriptor) for descriptor in descriptors]
+        width=1 if len(self.indices)<=256 else 2 if len(self.indices)<=65536 else 4
+        self.stream.write(b'I'+_indexHeader.pack(len(values),width))
+        indices=array(_indexTypes[width],indices)
+        if sys.byteorder=='big':
+            indices.byteswap()
+        self.stream.write(indices.tobytes() if hasattr(indices,'tobytes') else indices.tostring())
+        self.stream.write(_pack(values))
+    def single(self,values,descriptor):
+        index=self.index(descriptor)
+        self.stream.write(b'S'+_blockHeader.pack(index,len(values))+_pack(values))
+def write(stream,values,blockSize=65536):
+    """write(stream,values,blockSize=65536)
+    Write a Unit, a list of Unit values or a UnitArray to a binary stream as one message, blockSize values at a time.
+    Plain numbers in a list are written as unitless values.
+    """
+    writer=_Writer(stream)
+    if isinstance(values,Unit):
+        stream.write(_magic+struct.pack('<Bc',_version,b'u'))
+        writer.single([values],values._descriptor)
+    elif hasattr(values,'values') and hasattr(values,'dimensions') and hasattr(values,'shape'):
+        #UnitArray, written as single unit blocks of the flattened values
+        shape=values.shape
+        stream.write(_magic+struct.pack('<Bc',_version,b'a')+_dimensionsHeader.pack(len(shape))+struct.pack('<'+'Q'*len(shape),*shape))
+        index=writer.index(Unit(1,values.units)._descriptor)
+        flat=values.values.ravel()
+        for start in range(0,len(flat),blockSize):
+            chunk=flat[start:start+blockSize].astype('<f8')
+            stream.write(b'S'+_blockHeader.pack(index,len(chunk))+chunk.tobytes())
+    else:
+        stream.write(_magic+struct.pack('<Bc',_version,b'l'))
+        values=list(values)
+        for start in range(0,len(values),blockSize):
+            block=values[start:start+blockSize]
+            try:
+                descriptors=list(map(_descriptor,block))
+            except AttributeError:
+                descriptors=[getattr(value,'_descriptor',Unit._noUnits) for value in block]
+            writer.block(block,descriptors)
+    stream.write(b'E')
+def dumps(values,blockSize=65536):
+    """dumps(values,blockSize=65536)
+    Return a Unit, a list of Unit values or a UnitArray encoded as bytes.
+    """
+    stream=BytesIO()
+    write(stream,values,blockSize)
+    return stream.getvalue()
+def _descriptorFor(units,dimensions):
+    """_descriptorFor(units,dimensions)
+    Return the descriptor of a units string read from a message, checking its dimensions match this registry.
+    """
+    if not units:
+        return Unit._noUnits
+    descriptor=Unit(1,units)._descriptor
+    if tuple(descriptor.dimensions)!=tuple(dimensions):
+        raise DimensionError('Dimensions of '+units+' do not match those it was written with')
+    return descriptor
+def read(stream):
+    """read(stream)
+    Read one message written by write from a binary stream, returning a Unit, a list of Unit values or a UnitArray.
+    """
+    header=_readExact(stream,5)
+    if header[:3]!=_magic:
+        raise UnitError('Not pyunits binary data')
+    version,kind=struct.unpack('<Bc',header[3:])
+    if version!=_version:
+        raise UnitError('Unsupported pyunits binary version '+str(version))
+    shape=None
+    if kind==b'a':
+        ndim=_dimensionsHeader.unpack(_readExact(stream,1))[0]
+        shape=struct.unpack('<'+'Q'*ndim,_readExact(stream,8*ndim))
+    descriptors=[]
+    blocks=[]
+    while True:
+        tag=_readExact(stream,1)
+        if tag==b'E':
+            break
+        elif tag==b'U':
+            length=_unitHeader.unpack(_readExact(stream,2))[0]
+            units=_readExact(stream,length).decode('utf-8')
+            ndim=_dimensionsHeader.unpack(_readExact(stream,1))[0]
+            descriptors.append(_descriptorFor(units,_unpack(_readExact(stream,8*ndim)).tolist()))
+        elif tag==b'S':
+            index,count=_blockHeader.unpack(_readExact(stream,8))
+            data=_readExact(stream,8*count)
+            descriptor=descriptors[index]
+            if shape is not None:
+                blocks.append((data,descriptor))
+            else:
+                blocks.append(unitsFromDescriptors(_unpack(data),repeat(descriptor,count)))
+        elif tag==b'I':
+            count,width=_indexHeader.unpack(_readExact(stream,5))
+            indices=_unpack(_readExact(stream,width*count),_indexTypes[width])
+            values=_unpack(_readExact(stream,8*count))
+            blocks.append(unitsFromDescriptors(values,map(descriptors.__getitem__,indices)))
+        else:
+            raise UnitError('Unknown pyunits binary record '+repr(tag))
+    if kind==b'u':
+        return blocks[0][0]
+    if kind==b'a':
+        from .arrays import UnitArray,_numpy
+        numpy=_numpy()
+        #An empty array has no blocks, but its units are still defined
+        units=descriptors[0].units if descriptors else False
+        values=numpy.frombuffer(b''.join(data for data,descriptor in blocks),dtype='<f8').astype(float)
+        return UnitArray(values.reshape(shape),units)
+    result=[]
+    for block in blocks:
+        result.extend(block)
+    return result
+def loads(data):
+    """loads(data)
+    Decode bytes returned by dumps.
+    """
+    return read(BytesIO(data))
+def runTests():
+    from .tests.testCodec import runTests
+    runTests()
+if  __name__=='__main__':
+    runTests()
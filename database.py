@@ -0,0 +1,275 @@
+__doc__="""database.py
+
+Unit definitions loaded from a JSON or INI file, flattened to SI scalings and dimension vectors and cached on disk.
+
+An INI database has a section naming the base unit of each dimension, a section of prefixes and a section of units:
+
+    [dimensions]
+    Length = m
+    Mass = kg
+    Time = s
+    Temperature = K
+
+    [prefixes]
+    k = 1000
+    m = 1/1000
+
+    [units]
+    ft = 0.3048 m
+    mile = 5280 ft
+    N = kg*m/s**2
+    Hz = 1/s
+    degC = K + 273.15
+    degF = 5/9 degC - 17.777777777777778
+
+and a JSON database has the same sections as objects, e.g. {"dimensions": {"Length": "m"}, "units": {"ft": "0.3048 m"}}.
+A definition 'name = [factor] [units] [+ offset]' means that a value v in name is (v*factor+offset) in units. Units may
+use any name defined in the database, with or without a prefix, in any order; definitions are resolved recursively and
+a definition which depends on itself raises a UnitError. An offset makes an affine unit such as degC, and is only
+allowed for units of a single dimension.
+
+The flattened definitions are saved next to the database in a versioned cache, e.g. 'units.ini.cache', which later
+processes load instead of resolving the definitions again. The cache is a binary header holding a hash of the database
+it was built from, followed by the definitions as JSON, so loading it never runs code, and it is rebuilt when the
+database changes. Setting the PYUNITS_DATABASE environment variable to the path of a
+database loads it when pyunits is imported.
+"""
+import os
+import struct
+from re import compile
+from .units import UnitError,UnitRegistry,_unitName,formatExpression,parseExpression,useRegistry
+_cacheMagic=b'PYUNITSDB'
+_cacheVersion=2
+_cacheHeader=struct.Struct('<H20s')
+_number=r'(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+_definition=compile(r'\s*([-+]?'+_number+r'(?:\s*/\s*'+_number+r')?)?\s*(.*?)(?:\s+([-+])\s*('+_number+r'))?\s*$')
+def _parseNumber(text):
+    """_parseNumber(text)
+    Parse a number or a fraction, e.g. '1000', '1e-3' or '5/9'.
+    """
+    if isinstance(text,(int,float)):
+        return float(text)
+    numerator,separator,denominator=str(text).partition('/')
+    try:
+        if separator:
+            return float(numerator)/float(denominator)
+        return float(numerator)
+    except ValueError:
+        raise UnitError('Cannot parse number '+str(text))
+def parseDefinition(name,definition):
+    """parseDefinition(name,definition)
+    Parse a definition of the form '[factor] [units] [+ offset]' into (factor,units,offset), e.g. '5/9 K + 255.37' gives
+    (0.5555555555555556,'K',255.37).
+    """
+    if isinstance(definition,(int,float)):
+        return float(definition),'',0.0
+    match=_definition.match(definition)
+    if match is None:
+        raise UnitError('Cannot parse definition of '+name+': '+definition)
+    factor,units,sign,offset=match.groups()
+    factor=_parseNumber(factor) if factor else 1.0
+    if units.startswith('/'):
+        units='1'+units
+    if offset is None:
+        return factor,units,0.0
+    offset=float(offset)
+    if sign=='-':
+        offset=-offset
+    return factor,units,offset
+def readDefinitions(path):
+    """readDefinitions(path)
+    Read a JSON (.json) or INI database, returning its dimensions, prefixes and units as lists of (name,value) pairs
+    in the order they are written.
+    """
+    sections={}
+    if path.lower().endswith('.json'):
+        import json
+        from collections import OrderedDict
+        with open(path) as input:
+            data=json.load(input,object_pairs_hook=OrderedDict)
+        for section in ['dimensions','prefixes','units']:
+            sections[section]=list(data.get(section,{}).items())
+    else:
+        try:
+            from configparser import RawConfigParser
+        except ImportError:
+            from ConfigParser import RawConfigParser
+        parser=RawConfigParser()
+        #Unit names are case sensitive
+        parser.optionxform=str
+        with open(path) as input:
+            if hasattr(parser,'read_file'):
+                parser.read_file(input)
+            else:
+                parser.readfp(input)
+        for section in ['dimensions','prefixes','units']:
+            sections[section]=parser.items(section) if parser.has_section(section) else []
+    if not sections['dimensions']:
+        raise UnitError('Unit database '+path+' does not define any dimensions')
+    return sections['dimensions'],sections['prefixes'],sections['units']
+class _Resolver(object):
+    __doc__="""Resolves unit names of a database to (dimension vector,scaling,offset), detecting cyclic definitions."""
+    def __init__(self,dimensions,prefixes,units):
+        self.size=len(dimensions)
+        self.prefixes=prefixes
+        self.byLength=sorted(prefixes,key=len,reverse=True)
+        self.definitions={}
+        for name,definition in units:
+            if not _unitName.match(name):
+                raise UnitError('Unit name '+name+' must be a letter or _ followed by letters, digits or _')
+            self.definitions[name]=parseDefinition(name,definition)
+        self.resolved={}
+        for index,(dimension,name) in enumerate(dimensions):
+            self.resolved[name]=(tuple(int(i==index) for i in range(self.size)),1.0,0.0)
+        self.resolving=set()
+    def name(self,name):
+        """name(name)
+        Return the (dimensions,scaling,offset) of a defined or prefixed unit name.
+        """
+        resolved=self.resolved.get(name)
+        if resolved is not None:
+            return resolved
+        if name in self.definitions:
+            if name in self.resolving:
+                raise UnitError('Unit '+name+' is defined in terms of itself')
+            self.resolving.add(name)
+            factor,units,offset=self.definitions[name]
+            dimensions,scaling,unitsOffset=self.expression(units)
+            self.resolving.discard(name)
+            if offset:
+                unitsOffset+=offset*scaling
+            resolved=self.resolved[name]=(dimensions,factor*scaling,unitsOffset)
+            return resolved
+        for prefix in self.byLength:
+            unit=name[len(prefix):]
+            if name.startswith(prefix) and (unit in self.resolved or unit in self.definitions):
+                dimensions,scaling,offset=self.name(unit)
+                if offset:
+                    raise UnitError('Affine unit '+unit+' cannot be prefixed')
+                return dimensions,scaling*self.prefixes[prefix],0.0
+        raise UnitError('Unit '+name+' not found')
+    def expression(self,units):
+        """expression(units)
+        Return the (dimensions,scaling,offset) of a unit expression. Only a single affine name keeps its offset, in a
+        product it is a difference.
+        """
+        terms=parseExpression(units) if units else ()
+        if len(terms)==1 and terms[0][1]==1:
+            return self.name(terms[0][0])
+        dimensions=[0]*self.size
+        scaling=1.0
+        for name,power in terms:
+            unitDimensions,unitScaling,offset=self.name(name)
+            for index,dimension in enumerate(unitDimensions):
+                dimensions[index]+=power*dimension
+            scaling*=unitScaling**power
+        return tuple(dimensions),scaling,0.0
+def flattenDefinitions(dimensions,prefixes,units):
+    """flattenDefinitions(dimensions,prefixes,units)
+    Resolve lists of (name,value) pairs of dimensions, prefixes and unit definitions into a dictionary of the
+    'dimensions' tuple and the 'units', 'compoundUnits' and 'prefixes' dictionaries a UnitRegistry is built from.
+    Units of a single dimension become base units and the rest compound units written in the base units.
+    """
+    dimensions=list(dimensions)
+    prefixes=dict((prefix,_parseNumber(factor)) for prefix,factor in prefixes)
+    for prefix in prefixes:
+        if not prefix.isalpha():
+            raise UnitError('Prefix '+prefix+' must be letters only')
+    resolver=_Resolver(dimensions,prefixes,units)
+    names=[dimension for dimension,name in dimensions]
+    baseNames=[name for dimension,name in dimensions]
+    result={'dimensions':tuple(names),'units':{},'compoundUnits':{},'prefixes':prefixes}
+    for dimension,name in dimensions:
+        result['units'][name]={'SIVAL':1.0,'TYPE':dimension}
+    for name,definition in units:
+        unitDimensions,scaling,offset=resolver.name(name)
+        powers=[(index,power) for index,power in enumerate(unitDimensions) if power]
+        if len(powers)==1 and powers[0][1]==1:
+            unit={'SIVAL':scaling,'TYPE':names[powers[0][0]]}
+            if offset:
+                unit['OFFSET']=offset
+            result['units'][name]=unit
+        elif offset:
+            raise UnitError('Unit '+name+' has an offset but is not a unit of a single dimension')
+        else:
+            expression=formatExpression(tuple((baseNames[index],power) for index,power in powers)) or '1'
+            result['compoundUnits'][name]={'SIVAL':scaling,'UNITS':expression}
+    return result
+def _digest(path):
+    #hashlib and json are only imported when a database is loaded, so a plain import of pyunits stays fast
+    import hashlib
+    with open(path,'rb') as input:
+        return hashlib.sha1(input.read()).digest()
+def _readCache(cachePath,digest):
+    """_readCache(cachePath,digest)
+    Return the flattened definitions in a cache file, or None if it is missing, of another version, built from a
+    database with another digest or not valid JSON of the flattened definitions.
+    """
+    try:
+        with open(cachePath,'rb') as input:
+            data=input.read()
+    except (IOError,OSError):
+        return None
+    size=len(_cacheMagic)+_cacheHeader.size
+    if len(data)<size or data[:len(_cacheMagic)]!=_cacheMagic:
+        return None
+    version,cacheDigest=_cacheHeader.unpack(data[len(_cacheMagic):size])
+    if version!=_cacheVersion or cacheDigest!=digest:
+        return None
+    import json
+    try:
+        flattened=json.loads(data[size:].decode('utf-8'))
+    except ValueError:
+        return None
+    if not isinstance(flattened,dict) or not isinstance(flattened.get('dimensions'),list):
+        return None
+    for key in ('units','compoundUnits','prefixes'):
+        if not isinstance(flattened.get(key),dict):
+            return None
+    flattened['dimensions']=tuple(flattened['dimensions'])
+    return flattened
+def _writeCache(cachePath,digest,flattened):
+    #Write to a temporary file and rename it so other processes never read a partly written cache
+    import json
+    temporaryPath=cachePath+'.'+str(os.getpid())
+    payload=json.dumps(flattened,sort_keys=True,separators=(',',':')).encode('utf-8')
+    try:
+        with open(temporaryPath,'wb') as output:
+            output.write(_cacheMagic+_cacheHeader.pack(_cacheVersion,digest)+payload)
+        if hasattr(os,'replace'):
+            os.replace(temporaryPath,cachePath)
+        else:
+            os.rename(temporaryPath,cachePath)
+    except (IOError,OSError):
+        #A read only location just means the definitions are resolved again next time
+        if os.path.exists(temporaryPath):
+            os.remove(temporaryPath)
+def loadDatabase(path,cachePath=None):
+    """loadDatabase(path,cachePath=None)
+    Return a UnitRegistry of the units defined in a JSON or INI database, loading the flattened definitions from the
+    cache at cachePath (default path+'.cache') if it was built from the current database and otherwise resolving them
+    and writing the cache. A cachePath of False disables the cache.
+    """
+    digest=_digest(path)
+    if cachePath is None:
+        cachePath=path+'.cache'
+    flattened=None
+    if cachePath:
+        flattened=_readCache(cachePath,digest)
+    if flattened is None:
+        flattened=flattenDefinitions(*readDefinitions(path))
+        if cachePath:
+            _writeCache(cachePath,digest,flattened)
+    return UnitRegistry(flattened['dimensions'],flattened['units'],flattened['compoundUnits'],flattened['prefixes'])
+def useDatabase(path,cachePath=None):
+    """useDatabase(path,cachePath=None)
+    Load a unit database with loadDatabase and use it as the registry of every Unit in place of the built in units.
+    Returns the registry.
+    """
+    registry=loadDatabase(path,cachePath)
+    useRegistry(registry)
+    return registry
+def _useEnvironmentDatabase():
+    path=os.environ.get('PYUNITS_DATABASE')
+    if path:
+        useDatabase(path,os.environ.get('PYUNITS_DATABASE_CACHE'))
@@ -0,0 +1,149 @@
+__doc__="""deferred.py
+
+Deferred conversion of chains of Unit arithmetic.
+"""
+from .units import Unit,UnitError,_isAbsolute
+def lazy(value,units=False):
+    """lazy(value,units=False)
+    Start a lazy calculation from a Unit, or a value and units. Arithmetic on the result builds a LazyUnit expression
+    graph instead of converting and allocating a Unit at each step, e.g. (lazy(a)+b+c).convert('km').
+    """
+    if isinstance(value,LazyUnit):
+        return value
+    if isinstance(value,Unit):
+        return LazyUnit('leaf',float(value),value.units)
+    return LazyUnit('leaf',float(value),units)
+class LazyUnit(object):
+    __doc__="""Node of a deferred Unit calculation.
+
+    Nodes are leaves holding a value, sums of signed terms, or products and quotients of two nodes. The units of each node
+    follow the Unit operator rules and are known when it is built, but no values are converted until evaluate, convert or
+    float is called. Evaluation passes one scale factor down the graph, so each leaf is converted with a single multiply and
+    the dimensions of each sum term are checked once, when its conversion is looked up.
+
+    Sums of absolute temperatures follow Unit addition: the difference of two absolute temperatures is in the 'delta_'
+    unit of the first, an absolute temperature plus or minus a difference stays absolute, and adding two absolute
+    temperatures raises a UnitError. Absolute temperatures are converted with their offset."""
+    __slots__=('kind','operands','units')
+    _unit=Unit(1)
+    def __init__(self,kind,operands,units):
+        self.kind=kind
+        self.operands=operands
+        self.units=units
+    @property
+    def dimensions(self):
+        """Dimension vector of the result, or False without units."""
+        if not self.units:
+            return False
+        return self._unit.parseUnits(self.units)[0]
+    def _terms(self):
+        """_terms()
+        Return the (sign,node,toUnits,absolute) terms of the node, flattening a sum whose terms are all differences
+        converted to its own units.
+        """
+        if self.kind=='sum' and all(toUnits==self.units and not absolute for sign,term,toUnits,absolute in self.operands):
+            return self.operands
+        return ((1,self,self.units,_isAbsolute(self.units)),)
+    def _sum(self,other,sign):
+        other=lazy(other)
+        absolute=_isAbsolute(self.units)
+        otherAbsolute=_isAbsolute(other.units)
+        if absolute and otherAbsolute:
+            if sign>0:
+                raise UnitError('Cannot add absolute temperatures in '+self.units+' and '+other.units)
+            #The difference of two absolute temperatures, each converted with its offset to the units of the first
+            return LazyUnit('sum',((1,self,self.units,True),(-1,other,self.units,True)),'delta_'+self.units)
+        if otherAbsolute:
+            if sign<0:
+                raise UnitError('Cannot subtract an absolute temperature in '+other.units+' from a difference')
+            units=other.units
+            return LazyUnit('sum',((1,self,units,False),(1,other,units,True)),units)
+        units=self.units or other.units
+        if absolute:
+            return LazyUnit('sum',((1,self,units,True),(sign,other,units,False)),units)
+        terms=tuple((termSign,term,units,False) for termSign,term,toUnits,termAbsolute in self._terms())
+        return LazyUnit('sum',terms+((sign,other,units,False),),units)
+    def _product(self,other,operator,divide):
+        other=lazy(other)
+        #Apply the Unit operator to unit valued ones to find the units and scale factor of the result
+        result=operator(Unit(1.0,self.units),Unit(1.0,other.units))
+        return LazyUnit('product',(self,other,divide,float(result)),result.units)
+    def __add__(self,other):
+        return self._sum(other,1)
+    def __radd__(self,other):
+        return lazy(other)._sum(self,1)
+    def __sub__(self,other):
+        return self._sum(other,-1)
+    def __rsub__(self,other):
+        return lazy(other)._sum(self,-1)
+    def __neg__(self):
+        return LazyUnit('sum',((-1,self,self.units,False),),self.units)
+    def __mul__(self,other):
+        return self._product(other,Unit.__mul__,False)
+    def __rmul__(self,other):
+        return lazy(other)._product(self,Unit.__mul__,False)
+    def __truediv__(self,other):
+        return self._product(other,Unit.__truediv__,True)
+    def __rtruediv__(self,other):
+        return lazy(other)._product(self,Unit.__truediv__,True)
+    __div__=__truediv__
+    __rdiv__=__rtruediv__
+    def _evaluate(self,scale):
+        """_evaluate(scale)
+        Return the value of the node in its own units multiplied by scale.
+        """
+        if self.kind=='leaf':
+            return self.operands*scale
+        if self.kind=='sum':
+            total=0.0
+            for sign,term,toUnits,absolute in self.operands:
+                factor=sign*scale
+                if toUnits and term.units:
+                    if absolute:
+                        #An absolute temperature is converted with its offset, v*factor+offset
+                        termFactor,offset=self._unit.conversionTransform(term.units,toUnits)
+                        total+=factor*offset
+                        factor*=termFactor
+                    else:
+                        factor*=self._unit.conversionFactor(term.units,toUnits)
+                total+=term._evaluate(factor)
+            return total
+        left,right,divide,factor=self.operands
+        if divide:
+            return left._evaluate(scale*factor)/right._evaluate(1.0)
+        return left._evaluate(scale*factor)*right._evaluate(1.0)
+    def evaluate(self):
+        """evaluate()
+        Evaluate the graph, returning a Unit in the units of the result.
+        """
+        return Unit(self._evaluate(1.0),self.units)
+    def convert(self,unit):
+        """convert(unit)
+        Evaluate the graph, returning a Unit in unit. The conversion is folded into the scale factor of each leaf, and the
+        offset of an absolute temperature is added once.
+        """
+        if unit and self.units:
+            factor,offset=self._unit.conversionTransform(self.units,unit)
+            return Unit(self._evaluate(factor)+offset,unit)
+        return self.evaluate()
+    def __float__(self):
+        return self._evaluate(1.0)
+    def __format__(self,formatSpec):
+        return self.evaluate().__format__(formatSpec)
+    def __repr__(self):
+        if self.kind=='leaf':
+            return 'lazy('+repr(self.operands)+', '+repr(self.units)+')'
+        if self.kind=='sum':
+            text=''
+            for sign,term,toUnits,absolute in self.operands:
+                if text or sign<0:
+                    text+=(' + ' if sign>0 else ' - ')
+                text+=repr(term)
+            return '('+text+')'
+        left,right,divide,factor=self.operands
+        return '('+repr(left)+(' / ' if divide else ' * ')+repr(right)+')'
+def runTests():
+    from .tests.testDeferred import runTests
+    runTests()
+if  __name__=='__main__':
+    runTests()
@@ -0,0 +1,209 @@
+__doc__="""formula.py
+
+Compilation of formulas over values in given units into plain float functions.
+
+    kineticEnergy=compileFormula('0.5*m*v**2',{'m':'lb','v':'miles/hr'},'kJ')
+    kineticEnergy(150.0,60.0)
+
+The dimensions of the formula are checked once when it is compiled, and the scaling of every input and of the output,
+along with the numeric literals, are folded into constants, so the compiled function does the same float arithmetic as
+a hand written one, e.g. 'return 0.0244...*(m*(v**2))'. With vectorized=True the functions in the formula are numpy
+ufuncs and the compiled function works on arrays as well as floats.
+"""
+import __future__
+import math
+from .units import DimensionError,Unit,UnitError,divideDimensions,multiplyDimensions
+_dimensionless=(math.exp,math.log,math.log10,math.sin,math.cos,math.tan,math.asin,math.acos,math.atan,math.sinh,
+                math.cosh,math.tanh)
+_functions=dict((function.__name__,function) for function in _dimensionless)
+_functions.update({'sqrt':math.sqrt,'abs':abs})
+def _powerDimensions(dimensions,power):
+    return tuple(dimension*power for dimension in dimensions)
+def _number(node):
+    """_number(node)
+    Return the value of a numeric literal node, or None if it is not one.
+    """
+    if type(node).__name__ not in ('Num','Constant'):
+        return None
+    value=getattr(node,'value',None)
+    if value is None:
+        value=getattr(node,'n',None)
+    if isinstance(value,bool) or not isinstance(value,(int,float)) and type(value).__name__!='long':
+        return None
+    return float(value)
+class _Compiler(object):
+    __doc__="""Walks the syntax tree of a formula, returning (source,dimensions,scaling) for each node, where the SI value
+    of the node is scaling*source. A source of None is the constant scaling, so literals and unit scalings multiply into a
+    single constant until they meet an addition or a function. ast is the ast module, which is only imported when a
+    formula is compiled."""
+    def __init__(self,expression,inputs,ast):
+        self.expression=expression
+        self.inputs=inputs
+        self.ast=ast
+        self.operators={ast.Add:'+',ast.Sub:'-',ast.Mult:'*',ast.Div:'/',ast.Pow:'**'}
+        self.names=[]
+        self.noDimensions=(0,)*len(Unit._dimensions)
+    def error(self,message,errorType=UnitError):
+        return errorType('Cannot compile formula '+self.expression+': '+message)
+    def node(self,node):
+        ast=self.ast
+        value=_number(node)
+        if value is not None:
+            return None,self.noDimensions,value
+        if isinstance(node,ast.Name):
+            return self.name(node.id)
+        if isinstance(node,ast.UnaryOp) and isinstance(node.op,(ast.USub,ast.UAdd)):
+            source,dimensions,scaling=self.node(node.operand)
+            return source,dimensions,-scaling if isinstance(node.op,ast.USub) else scaling
+        if isinstance(node,ast.BinOp) and type(node.op) in self.operators:
+            if isinstance(node.op,ast.Pow):
+                return self.power(node.left,node.right)
+            left=self.node(node.left)
+            right=self.node(node.right)
+            if isinstance(node.op,(ast.Add,ast.Sub)):
+                return self.sum(left,right,self.operators[type(node.op)])
+            return self.product(left,right,isinstance(node.op,ast.Div))
+        if isinstance(node,ast.Call):
+            return self.call(node)
+        raise self.error('unsupported expression '+type(node).__name__)
+    def name(self,name):
+        if name not in self.inputs:
+            raise self.error('no units given for '+name)
+        if name not in self.names:
+            self.names.append(name)
+        descriptor=Unit(1,self.inputs[name])._descriptor if self.inputs[name] else Unit._noUnits
+        dimensions=tuple(descriptor.dimensions) if descriptor.dimensions else self.noDimensions
+        if descriptor.offset:
+            #Absolute temperatures are converted to their SI value, v*scaling+offset=scaling*(v+offset/scaling)
+            return '('+name+'+'+repr(descriptor.offset/descriptor.scaling)+')',dimensions,descriptor.scaling
+        return name,dimensions,descriptor.scaling
+    def product(self,left,right,divide):
+        leftSource,leftDimensions,leftScaling=left
+        rightSource,rightDimensions,rightScaling=right
+        if divide:
+            dimensions=divideDimensions(leftDimensions,rightDimensions)
+            scaling=leftScaling/rightScaling
+            if rightSource is None:
+                return leftSource,dimensions,scaling
+            return '('+(leftSource or '1.0')+'/'+rightSource+')',dimensions,scaling
+        dimensions=multiplyDimensions(leftDimensions,rightDimensions)
+        scaling=leftScaling*rightScaling
+        if leftSource is None or rightSource is None:
+            return leftSource or rightSource,dimensions,scaling
+        return '('+leftSource+'*'+rightSource+')',dimensions,scaling
+    def sum(self,left,right,operator):
+        leftSource,leftDimensions,leftScaling=left
+        rightSource,rightDimensions,rightScaling=right
+        if leftDimensions!=rightDimensions:
+            raise self.error('dimensionality of units does not match',DimensionError)
+        #A term multiplied by zero drops out, and keeps the other side from being rescaled by zero
+        if not leftScaling:
+            return rightSource,rightDimensions,rightScaling if operator=='+' else -rightScaling
+        if not rightScaling:
+            return left
+        if leftSource is None and rightSource is None:
+            return None,leftDimensions,leftScaling+rightScaling if operator=='+' else leftScaling-rightScaling
+        #Keep the scaling of one side and rescale the other to it
+        if leftSource is None:
+            return '('+repr(leftScaling/rightScaling)+operator+rightSource+')',leftDimensions,rightScaling
+        if rightSource is None:
+            return '('+leftSource+operator+repr(rightScaling/leftScaling)+')',leftDimensions,leftScaling
+        ratio=rightScaling/leftScaling
+        if ratio!=1.0:
+            rightSource=repr(ratio)+'*'+rightSource
+        return '('+leftSource+operator+rightSource+')',leftDimensions,leftScaling
+    def power(self,base,exponent):
+        source,dimensions,scaling=self.node(base)
+        exponentSource,exponentDimensions,exponentScaling=self.node(exponent)
+        if exponentDimensions!=self.noDimensions:
+            raise self.error('cannot raise to the power of a value with units')
+        if exponentSource is not None:
+            #A variable power is only meaningful for a dimensionless base, so both sides are taken at their SI values
+            if dimensions!=self.noDimensions:
+                raise self.error('cannot raise a value with units to a variable power')
+            return '('+self.value(source,scaling)+'**'+self.value(exponentSource,exponentScaling)+')',dimensions,1.0
+        power=exponentScaling
+        if power==int(power):
+            power=int(power)
+        if source is None:
+            return None,dimensions,scaling**power
+        return '('+source+'**'+repr(power)+')',_powerDimensions(dimensions,power),scaling**power
+    def call(self,node):
+        name=getattr(node.func,'id',None)
+        if name not in _functions or len(node.args)!=1 or node.keywords or getattr(node,'starargs',None) or \
+           getattr(node,'kwargs',None):
+            raise self.error('unsupported function call')
+        source,dimensions,scaling=self.node(node.args[0])
+        if name=='sqrt':
+            if source is None:
+                return None,_powerDimensions(dimensions,0.5),math.sqrt(scaling)
+            return 'sqrt('+source+')',_powerDimensions(dimensions,0.5),math.sqrt(scaling)
+        if name=='abs':
+            return source and 'abs('+source+')',dimensions,abs(scaling)
+        if dimensions!=self.noDimensions:
+            raise self.error(name+' of a value with units')
+        if source is None:
+            return None,dimensions,_functions[name](scaling)
+        return name+'('+self.value(source,scaling)+')',dimensions,1.0
+    def value(self,source,scaling):
+        """value(source,scaling)
+        Return the source of scaling*source, leaving out a scaling of 1.
+        """
+        if source is None:
+            return repr(scaling)
+        if scaling==1.0:
+            return source
+        return repr(scaling)+'*'+source
+def compileFormula(expression,inputs,output=False,arguments=None,vectorized=False):
+    """compileFormula(expression,inputs,output=False,arguments=None,vectorized=False)
+    Compile a formula into a function of floats. inputs maps each name in the formula to its units, and the function
+    returns the value of the formula in output units, e.g. compileFormula('0.5*m*v**2',{'m':'lb','v':'miles/hr'},'kJ').
+    The formula may use + - * / **, numbers and the functions sqrt, abs, exp, log, log10, sin, cos, tan, asin, acos, atan,
+    sinh, cosh and tanh. A UnitError is raised when it is compiled if its dimensions are not consistent or do not match
+    output. The arguments of the function are in the order of arguments, by default their order of first use in the
+    formula. If vectorized is True the functions are numpy ufuncs, so the function also works on numpy arrays.
+    The function has the generated code as its source attribute.
+    """
+    #ast is imported here rather than with pyunits, so importing pyunits does not pay for it
+    import ast
+    try:
+        tree=ast.parse(expression.strip(),mode='eval')
+    except SyntaxError:
+        raise UnitError('Cannot compile formula '+expression+': invalid syntax')
+    for name in inputs:
+        if name in _functions:
+            raise UnitError('Cannot compile formula '+expression+': '+name+' is the name of a function')
+    compiler=_Compiler(expression,inputs,ast)
+    source,dimensions,scaling=compiler.node(tree.body)
+    descriptor=Unit(1,output)._descriptor if output else Unit._noUnits
+    outputDimensions=tuple(descriptor.dimensions) if descriptor.dimensions else compiler.noDimensions
+    if tuple(dimensions)!=outputDimensions:
+        raise compiler.error('dimensionality of the result does not match '+str(output),DimensionError)
+    body=compiler.value(source,scaling/descriptor.scaling)
+    if descriptor.offset:
+        body=body+'-'+repr(descriptor.offset/descriptor.scaling)
+    if arguments is None:
+        arguments=compiler.names
+    else:
+        arguments=list(arguments)
+        for name in compiler.names:
+            if name not in arguments:
+                raise compiler.error(name+' is not one of the arguments')
+    code='def formula('+','.join(arguments)+'):\n    return '+body+'\n'
+    if vectorized:
+        from .arrays import _numpy
+        numpy=_numpy()
+        namespace=dict((name,getattr(numpy,name.replace('asin','arcsin').replace('acos','arccos').replace('atan','arctan')))
+                       for name in _functions)
+    else:
+        namespace=dict(_functions)
+    exec(compile(code,'<formula '+expression+'>','exec',__future__.division.compiler_flag,True),namespace)
+    formula=namespace['formula']
+    formula.source=code
+    formula.__doc__=expression+' in '+str(output)
+    return formula
+def runTests():
+    from .tests.testFormula import runTests
+    runTests()
+if  __name__=='__main__':
+    runTests()
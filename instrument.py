@@ -0,0 +1,140 @@
+__doc__="""instrument.py
+
+Optional counters and timers on Unit parsing, conversion and arithmetic.
+
+Instrumentation is off by default and then costs nothing: enable() replaces the instrumented Unit methods with
+wrappers that count and time each call, and disable() puts the original methods back.
+
+    from pyunits import instrument
+    instrument.enable()
+    ...
+    metrics.push(instrument.stats())
+
+or to profile one block:
+
+    with instrument.profile() as result:
+        ...
+    print(result['calls'])
+"""
+import functools
+import time
+from contextlib import contextmanager
+from .units import DimensionError,Unit,UnitError
+_clock=getattr(time,'perf_counter',time.time)
+_methods=('setUnits','getDescriptor','compileUnits','_new','unitCompare','conversionFactor','conversionTransform','convertValue','convert','invert')
+_operators=('__add__','__sub__','__mul__','__div__','__truediv__','__mod__','__pow__','__divmod__','__radd__','__rsub__',
+            '__rmul__','__rdiv__','__rtruediv__','__rmod__','__rpow__','__rdivmod__','__eq__','__ne__','__ge__','__gt__',
+            '__le__','__lt__','__abs__')
+_originals={}
+_calls={}
+_seconds={}
+_errors={}
+_units={}
+_dimensionMismatches=[0]
+def _recordError(name,error):
+    _errors[name]=_errors.get(name,0)+1
+    #An error passing up through several instrumented calls is only counted as one mismatch
+    if not getattr(error,'_instrumented',False):
+        error._instrumented=True
+        if isinstance(error,DimensionError):
+            _dimensionMismatches[0]+=1
+def _wrap(name,function):
+    """_wrap(name,function)
+    Return a wrapper of a Unit method which counts and times each call under name and counts the UnitErrors it raises.
+    The wrappers of setUnits, which new values are given their units through, and of _new, which builds the results of
+    arithmetic on an existing descriptor, also count the units of each value.
+    """
+    countUnits=name=='setUnits'
+    countDescriptors=name=='_new'
+    @functools.wraps(function)
+    def wrapper(self,*args,**kwargs):
+        _calls[name]=_calls.get(name,0)+1
+        if countUnits and args:
+            _units[args[0]]=_units.get(args[0],0)+1
+        elif countDescriptors and len(args)>1 and args[1].units:
+            _units[args[1].units]=_units.get(args[1].units,0)+1
+        start=_clock()
+        try:
+            return function(self,*args,**kwargs)
+        except UnitError as error:
+            _recordError(name,error)
+            raise
+        finally:
+            _seconds[name]=_seconds.get(name,0.0)+_clock()-start
+    return wrapper
+def isEnabled():
+    """isEnabled()
+    Return True if the Unit methods are instrumented.
+    """
+    return bool(_originals)
+def enable():
+    """enable()
+    Instrument setUnits, getDescriptor, compileUnits, _new, unitCompare, the conversion methods, invert and each operator
+    of Unit. Counters keep the values they had when instrumentation was last disabled.
+    """
+    if _originals:
+        return
+    for name in _methods+_operators:
+        function=Unit.__dict__.get(name)
+        if callable(function):
+            _originals[name]=function
+            setattr(Unit,name,_wrap(name,function))
+def disable():
+    """disable()
+    Restore the original Unit methods, so there is no overhead until instrumentation is enabled again.
+    """
+    for name,function in _originals.items():
+        setattr(Unit,name,function)
+    _originals.clear()
+def reset():
+    """reset()
+    Zero all counters and timers.
+    """
+    _calls.clear()
+    _seconds.clear()
+    _errors.clear()
+    _units.clear()
+    _dimensionMismatches[0]=0
+def _top(units,top):
+    return sorted(units.items(),key=lambda item:(-item[1],item[0]))[:top]
+def stats(top=10):
+    """stats(top=10)
+    Return a JSON serializable dictionary of the counters: the number of calls, total seconds and UnitErrors raised for
+    each instrumented method, the number of dimension mismatch errors, the number of values created with each units
+    string, by setUnits or from the descriptor of another value, and the top most frequent units strings as [units,count]
+    pairs. Calls to compileUnits count the parseCache misses of getDescriptor. Seconds include any instrumented calls
+    made inside.
+    """
+    return {'calls':dict(_calls),'seconds':dict(_seconds),'errors':dict(_errors),
+            'dimensionMismatches':_dimensionMismatches[0],'units':dict(_units),'topUnits':[list(item) for item in _top(_units,top)]}
+def _difference(after,before,top):
+    result={'dimensionMismatches':after['dimensionMismatches']-before['dimensionMismatches']}
+    for key in ['calls','seconds','errors','units']:
+        result[key]=dict((name,value-before[key].get(name,0)) for name,value in after[key].items()
+                         if value!=before[key].get(name,0))
+    result['topUnits']=[list(item) for item in _top(result['units'],top)]
+    return result
+@contextmanager
+def profile(callback=None,top=10):
+    """profile(callback=None,top=10)
+    Context manager which instruments the calls made in one block. It yields a dictionary that is filled with the stats
+    of the block when it exits, and passes it to callback if one is given. The instrumentation state and counters from
+    outside the block are left as they were.
+    """
+    enabled=isEnabled()
+    before=stats(None)
+    result={}
+    enable()
+    try:
+        yield result
+    finally:
+        if not enabled:
+            disable()
+        result.update(_difference(stats(None),before,top))
+        if callback is not None:
+            callback(result)
+def runTests():
+    from .tests.testInstrument import runTests
+    runTests()
+if  __name__=='__main__':
+    runTests()
@@ -0,0 +1,185 @@
+__doc__="""parallel.py
+
+Unit conversion of large batches of float64 values across a pool of worker processes.
+"""
+import sys
+from array import array
+from collections import deque
+from .units import Unit,UnitError,UnitRegistry,_arrayToBytes,_bytesToArray,useRegistry
+_itemSize=array('d').itemsize
+_workerTransforms=[]
+def _initWorker(dimensions,units,compoundUnits,prefixes,unitPairs):
+    """_initWorker(dimensions,units,compoundUnits,prefixes,unitPairs)
+    Load the registry of the parent process and resolve the conversion transform of each unit pair once per worker.
+    """
+    useRegistry(UnitRegistry(dimensions,units,compoundUnits,prefixes))
+    unit=Unit(1)
+    _workerTransforms[:]=[unit.conversionTransform(fromUnits,toUnits) for fromUnits,toUnits in unitPairs]
+def _convertBytes(data,factor,offset=0.0):
+    """_convertBytes(data,factor,offset=0.0)
+    Multiply packed native float64 values by factor and add offset, returning the packed results.
+    """
+    numpy=sys.modules.get('numpy')
+    if numpy is not None:
+        values=numpy.frombuffer(data,dtype=float)*factor
+        if offset:
+            values+=offset
+        return values.tobytes()
+    if offset:
+        return _arrayToBytes(array('d',[value*factor+offset for value in _bytesToArray(data)]))
+    return _arrayToBytes(array('d',map(factor.__mul__,_bytesToArray(data))))
+def _convertChunk(task):
+    pairIndex,data=task
+    factor,offset=_workerTransforms[pairIndex]
+    return _convertBytes(data,factor,offset)
+def _size(values):
+    """_size(values)
+    Return the number of float64 values in a sequence, a numpy ndarray of any shape or a buffer of packed values.
+    """
+    numpy=sys.modules.get('numpy')
+    if numpy is not None and isinstance(values,numpy.ndarray):
+        #_chunks ravels arrays, so every element is counted rather than the length of the first axis
+        return values.size
+    if isinstance(values,(bytes,bytearray)):
+        return len(values)//_itemSize
+    if isinstance(values,memoryview):
+        return getattr(values,'nbytes',len(values))//_itemSize
+    return len(values)
+def _chunks(values,chunkSize):
+    """_chunks(values,chunkSize)
+    Yield chunks of at most chunkSize values as packed native float64 bytes.
+    """
+    numpy=sys.modules.get('numpy')
+    if numpy is not None and isinstance(values,numpy.ndarray):
+        values=numpy.ascontiguousarray(values,dtype=float).ravel()
+        for start in range(0,len(values),chunkSize):
+            yield values[start:start+chunkSize].tobytes()
+    elif isinstance(values,(bytes,bytearray,memoryview)):
+        if isinstance(values,memoryview):
+            values=values.tobytes()
+        step=chunkSize*_itemSize
+        for start in range(0,len(values),step):
+            yield bytes(values[start:start+step])
+    else:
+        if not isinstance(values,array) or values.typecode!='d':
+            values=array('d',values)
+        for start in range(0,len(values),chunkSize):
+            yield _arrayToBytes(values[start:start+chunkSize])
+def _result(values,data):
+    """_result(values,data)
+    Return packed converted values in the container kind of the input values.
+    """
+    numpy=sys.modules.get('numpy')
+    if numpy is not None and isinstance(values,numpy.ndarray):
+        return numpy.frombuffer(data,dtype=float).reshape(values.shape).copy()
+    if isinstance(values,(bytes,bytearray)):
+        return type(values)(data)
+    if isinstance(values,memoryview):
+        return memoryview(bytearray(data))
+    return _bytesToArray(data)
+def _cpuCount():
+    #multiprocessing is only imported when a pool is needed, to keep it out of the import time of pyunits
+    from multiprocessing import cpu_count
+    return cpu_count()
+def _pool(unitPairs,processes):
+    unit=Unit(1)
+    for fromUnits,toUnits in unitPairs:
+        #Raise mismatched units in this process rather than in every worker
+        unit.conversionFactor(fromUnits,toUnits)
+    from multiprocessing import Pool
+    snapshot=Unit.registry.snapshot
+    registry=(Unit.registry.dimensions,dict(snapshot.units),dict(snapshot.compoundUnits),dict(snapshot.prefixes))
+    return Pool(processes,_initWorker,registry+(unitPairs,))
+def _ordered(pool,tasks,window):
+    """_ordered(pool,tasks,window)
+    Yield the converted data of each (pairIndex,data) task in input order, with at most window tasks in flight so a long
+    input is not read ahead of the workers.
+    """
+    pending=deque()
+    for task in tasks:
+        pending.append(pool.apply_async(_convertChunk,(task,)))
+        if len(pending)>=window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+def convertBatches(batches,processes=None,chunkSize=1000000):
+    """convertBatches(batches,processes=None,chunkSize=1000000)
+    Convert a list of (values,fromUnits,toUnits) batches across a pool of processes, returning a list of the converted
+    batches in the same order. Batches are split into chunks of chunkSize values which are sent to and from the workers
+    as packed float64 buffers. The registry is sent once to each worker, which resolves the conversion of every unit pair
+    once when it starts. processes defaults to the number of CPUs.
+
+    values may be a numpy ndarray, which returns an ndarray of the same shape, a bytes, bytearray or memoryview object of
+    packed native float64 values, which returns the same buffer type, or any other sequence of numbers, which returns an
+    array.array('d'). If there are at most chunkSize values in total they are converted in this process.
+    """
+    batches=list(batches)
+    if sum(_size(values) for values,fromUnits,toUnits in batches)<=chunkSize:
+        unit=Unit(1)
+        return [_result(values,_convertBytes(b''.join(_chunks(values,chunkSize)),*unit.conversionTransform(fromUnits,toUnits)))
+                for values,fromUnits,toUnits in batches]
+    unitPairs=[]
+    for values,fromUnits,toUnits in batches:
+        if (fromUnits,toUnits) not in unitPairs:
+            unitPairs.append((fromUnits,toUnits))
+    if processes is None:
+        processes=_cpuCount()
+    pool=_pool(unitPairs,processes)
+    try:
+        tasks=((unitPairs.index((fromUnits,toUnits)),chunk) for values,fromUnits,toUnits in batches for chunk in _chunks(values,chunkSize))
+        results=_ordered(pool,tasks,2*processes)
+        converted=[]
+        for values,fromUnits,toUnits in batches:
+            data=[]
+            remaining=_size(values)
+            while remaining>0:
+                data.append(next(results))
+                remaining-=len(data[-1])//_itemSize
+            converted.append(_result(values,b''.join(data)))
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return converted
+def convertParallel(values,fromUnits,toUnits,processes=None,chunkSize=1000000):
+    """convertParallel(values,fromUnits,toUnits,processes=None,chunkSize=1000000)
+    Convert a large batch of values from fromUnits to toUnits across a pool of processes using convertBatches.
+    """
+    return convertBatches([(values,fromUnits,toUnits)],processes,chunkSize)[0]
+def _readChunks(input,chunkSize):
+    while True:
+        data=input.read(chunkSize*_itemSize)
+        if not data:
+            break
+        if len(data)%_itemSize:
+            raise UnitError('File size is not a multiple of '+str(_itemSize)+' bytes')
+        yield 0,data
+def convertFileParallel(inputPath,outputPath,fromUnits,toUnits,processes=None,chunkSize=1000000):
+    """convertFileParallel(inputPath,outputPath,fromUnits,toUnits,processes=None,chunkSize=1000000)
+    Convert a binary file of packed native float64 values into a new file across a pool of processes, reading, converting
+    and writing chunkSize values at a time in order so memory use stays constant. Returns the number of values converted.
+    """
+    if processes is None:
+        processes=_cpuCount()
+    count=0
+    pool=_pool([(fromUnits,toUnits)],processes)
+    try:
+        with open(inputPath,'rb') as input:
+            with open(outputPath,'wb') as output:
+                for data in _ordered(pool,_readChunks(input,chunkSize),2*processes):
+                    output.write(data)
+                    count+=len(data)//_itemSize
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return count
+def runTests():
+    from .tests.testParallel import runTests
+    runTests()
+if  __name__=='__main__':
+    runTests()
@@ -16,6 +16,6 @@ def setupPackage(install=False):
     author='David Pugh',
     author_email='djpugh@gmail.com',
     package_dir={'pyunits':'.'},
-    packages=['pyunits'])
+    packages=['pyunits','pyunits.tests'])
 if __name__=="__main__":
     setupPackage()
\ No newline at end of file
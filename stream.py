@@ -0,0 +1,143 @@
+__doc__="""stream.py
+
+Streaming unit conversion of columns in CSV or whitespace delimited files.
+"""
+import csv
+import sys
+import time
+from itertools import chain,islice
+from re import compile
+from .units import Unit,UnitError
+_headerUnits=compile(r'^\s*(.*?)\s*\[(.*)\]\s*$')
+_whitespaceHeader=compile(r'[^\s\[]+(?:\s*\[[^\]]*\])?|\[[^\]]*\]')
+def parseHeader(name):
+    """parseHeader(name)
+    Split a column header of the form 'speed [ft/s]' into the column name and units.
+    Returns (name,False) if the header does not declare units.
+    """
+    match=_headerUnits.match(name)
+    if match:
+        return match.group(1),match.group(2).strip()
+    return name.strip(),False
+def _whitespaceReader(lines,header=False):
+    for line in lines:
+        if header:
+            #Bracketed units stay with their column name, so 'time speed [ft/s]' is two fields
+            header=False
+            yield _whitespaceHeader.findall(line)
+        else:
+            yield line.split()
+class _WhitespaceWriter(object):
+    def __init__(self,output):
+        self.output=output
+    def writerows(self,rows):
+        self.output.write(''.join(' '.join(row)+'\n' for row in rows))
+def convertStream(input,output,targets,sourceUnits=None,delimiter=',',header=True,chunkSize=10000):
+    """convertStream(input,output,targets,sourceUnits=None,delimiter=',',header=True,chunkSize=10000)
+    Convert columns of a delimited text stream, reading and writing chunkSize rows at a time so memory use stays constant.
+
+    targets maps a column name (or 0 based index) to the units to convert it to. The units of each column are taken from
+    sourceUnits, which has the same keys, or otherwise from a header of the form 'speed [ft/s]'. Converted headers are
+    rewritten with the target units. A delimiter of None splits on whitespace, keeping bracketed units in the header with
+    their column name, and rewrites converted headers as 'speed[m/s]'. A UnitError naming the row, counted from 1
+    at the first line including any header, and the column is raised if a cell cannot be converted or a row is too short.
+    Empty rows are copied as they are.
+    Returns a dictionary with the number of rows, elapsed seconds and rows per second.
+    """
+    start=time.time()
+    sourceUnits=dict(sourceUnits or {})
+    if delimiter is None:
+        reader=_whitespaceReader(input,header)
+        writer=_WhitespaceWriter(output)
+    else:
+        reader=csv.reader(input,delimiter=delimiter)
+        writer=csv.writer(output,delimiter=delimiter,lineterminator='\n')
+    names=[]
+    if header:
+        headerRow=next(reader,None)
+        if headerRow is None:
+            return {'rows':0,'seconds':0.0,'rowsPerSecond':0.0}
+        for index,column in enumerate(headerRow):
+            name,units=parseHeader(column)
+            names.append(name)
+            if units and name not in sourceUnits and index not in sourceUnits:
+                sourceUnits[name]=units
+        width=len(headerRow)
+    else:
+        firstRow=next(reader,None)
+        width=len(firstRow or ())
+        if firstRow is not None:
+            reader=chain([firstRow],reader)
+    #Resolve each conversion once before streaming the rows
+    columns=[]
+    for key,toUnits in targets.items():
+        if key in names:
+            index=names.index(key)
+        elif isinstance(key,int):
+            index=key
+        else:
+            raise UnitError('Column '+str(key)+' not found')
+        if (header or width) and not -width<=index<width:
+            raise UnitError('Column '+str(key)+' is past the end of the '+('header' if header else 'first row'))
+        fromUnits=sourceUnits.get(key) or sourceUnits.get(index)
+        if not fromUnits and index<len(names):
+            fromUnits=sourceUnits.get(names[index])
+        if not fromUnits:
+            raise UnitError('Units of column '+str(key)+' are not declared')
+        factor,offset=Unit(1).conversionTransform(fromUnits,toUnits)
+        columns.append((index,factor,offset,key))
+        if header:
+            #A space would split the header into one more field than the rows in a whitespace delimited file
+            headerRow[index]=names[index]+('[' if delimiter is None else ' [')+toUnits+']'
+    if header:
+        writer.writerows([headerRow])
+    rows=0
+    while True:
+        chunk=list(islice(reader,chunkSize))
+        if not chunk:
+            break
+        for number,row in enumerate(chunk,rows+1+bool(header)):
+            if not row:
+                continue
+            for index,factor,offset,key in columns:
+                try:
+                    value=row[index]
+                    if value.strip():
+                        row[index]=repr(float(value)*factor+offset)
+                except IndexError:
+                    raise UnitError('Row '+str(number)+' has no column '+str(key))
+                except ValueError:
+                    raise UnitError('Cannot convert '+repr(value)+' in row '+str(number)+', column '+str(key))
+        writer.writerows(chunk)
+        rows+=len(chunk)
+    seconds=time.time()-start
+    rowsPerSecond=0.0
+    if seconds>0:
+        rowsPerSecond=rows/seconds
+    return {'rows':rows,'seconds':seconds,'rowsPerSecond':rowsPerSecond}
+def _open(path,mode):
+    if path=='-':
+        if 'r' in mode:
+            return sys.stdin
+        return sys.stdout
+    if sys.version_info[0]<3:
+        return open(path,mode+'b')
+    return open(path,mode,newline='')
+def convertFile(inputPath,outputPath,targets,sourceUnits=None,delimiter=',',header=True,chunkSize=10000):
+    """convertFile(inputPath,outputPath,targets,sourceUnits=None,delimiter=',',header=True,chunkSize=10000)
+    Convert columns of a delimited text file into a new file using convertStream. A path of '-' uses stdin or stdout.
+    """
+    input=_open(inputPath,'r')
+    output=_open(outputPath,'w')
+    try:
+        return convertStream(input,output,targets,sourceUnits,delimiter,header,chunkSize)
+    finally:
+        if input is not sys.stdin:
+            input.close()
+        if output is not sys.stdout:
+            output.close()
+def runTests():
+    from .tests.testStream import runTests
+    runTests()
+if  __name__=='__main__':
+    runTests()
@@ -0,0 +1,161 @@
+__doc__="""table.py
+
+Bulk formatting of columns of Unit values or raw floats into text, CSV or Markdown tables.
+
+    writeTable(sys.stdout,[('time',times),('speed',speeds)],{'time':'>8.1f','speed':'>8.3f km/sA'},
+               sourceUnits={'time':'s'},style='markdown')
+
+Each column is formatted with the same format specs as Unit.__format__, '[align][width][.precision][type][ ][units][a|A]'.
+The spec is parsed and the conversion resolved once per column into a (factor,offset,numberSpec,suffix) plan, and then
+the values of each chunk of rows are converted and formatted with a few calls mapped over the whole column rather than a
+Unit.__format__ call per cell.
+"""
+import csv
+import time
+from itertools import chain,islice
+from operator import attrgetter
+from .units import Unit,UnitError,_formatSpec
+_styles=('text','csv','markdown')
+_descriptor=attrgetter('_descriptor')
+def _escapeMarkdown(text):
+    return text.replace('|','\\|')
+class _Column(object):
+    __doc__="""A column of a table with its format spec, the units of raw float values and the plans of its units."""
+    def __init__(self,name,values,spec,units):
+        self.name=name
+        self.values=iter(values)
+        self.spec=spec
+        self.units=units
+        self.plans={}
+    def plan(self,units):
+        """plan(units)
+        Return the (factor,offset,template,suffix) of values in units, where template formats a converted value.
+        """
+        plan=self.plans.get(units)
+        if plan is None:
+            factor,offset,numberSpec,suffix=Unit(1).formatPlan(units,self.spec)
+            template='{0:'+numberSpec+'}'+suffix.replace('{','{{').replace('}','}}')
+            plan=self.plans[units]=(factor,offset,template,suffix)
+        return plan
+    def header(self,units):
+        """header(units)
+        Return the header of the column, with the units in brackets, e.g. 'speed [km/s]', if the cells do not show them.
+        """
+        match=_formatSpec.match(self.spec)
+        target=match.group(5).rstrip('aA').strip() or units
+        if target and not self.plan(units)[3]:
+            return self.name+' ['+target+']'
+        return self.name
+    def width(self,units):
+        """width(units)
+        Return the alignment and the width of the cells of values in units, including the units they show.
+        """
+        match=_formatSpec.match(self.spec)
+        width=match.group(2).split('.')[0]
+        return match.group(1) or '>',(int(width) if width else 0)+len(self.plan(units)[3])
+    def format(self,values):
+        """format(values)
+        Return a list of the formatted cells of a chunk of values, resolving one plan for each units in the chunk.
+        """
+        if self.units is not None or not values:
+            units=self.units
+        else:
+            try:
+                descriptors=list(map(_descriptor,values))
+            except AttributeError:
+                descriptors=[getattr(value,'_descriptor',Unit._noUnits) for value in values]
+            unique=set(descriptors)
+            if len(unique)>1:
+                return [self._format([value],descriptor.units)[0] for value,descriptor in zip(values,descriptors)]
+            units=unique.pop().units
+        return self._format(values,units)
+    def _format(self,values,units):
+        factor,offset,template,suffix=self.plan(units)
+        #Bound float methods give plain floats without going through the Unit operators
+        values=map(float(factor).__mul__,values)
+        if offset:
+            values=map(float(offset).__add__,values)
+        return list(map(template.format,values))
+    def first(self):
+        """first()
+        Return the units of the first value of the column, for the header, without consuming it.
+        """
+        if self.units is not None:
+            return self.units
+        for value in self.values:
+            self.values=chain([value],self.values)
+            return getattr(value,'units',False)
+        return False
+def writeTable(output,columns,specs=None,sourceUnits=None,style='text',header=True,chunkSize=10000):
+    """writeTable(output,columns,specs=None,sourceUnits=None,style='text',header=True,chunkSize=10000)
+    Write a table to output, chunkSize rows at a time, so columns may be iterators of any length.
+
+    columns is a list of (name,values) pairs, or a dictionary, of columns of Unit values or raw floats. specs maps column
+    names to Unit format specs, which may convert to other units, e.g. '>8.3f km/sa', and sourceUnits maps the names of
+    columns of raw floats to their units. style is 'text', with cells separated by a space and headers aligned to the
+    width of each spec, 'csv' or 'markdown'. Headers show the units of columns whose cells do not, e.g. 'speed [km/s]'.
+    Returns a dictionary with the number of rows, elapsed seconds and rows per second.
+    """
+    start=time.time()
+    if style not in _styles:
+        raise UnitError('Table style '+str(style)+' is not one of '+', '.join(_styles))
+    if hasattr(columns,'items'):
+        columns=list(columns.items())
+    specs=specs or {}
+    sourceUnits=sourceUnits or {}
+    table=[_Column(name,values,specs.get(name,''),sourceUnits.get(name)) for name,values in columns]
+    if style=='csv':
+        writer=csv.writer(output,lineterminator='\n')
+        writeRows=writer.writerows
+    elif style=='markdown':
+        writeRows=lambda rows:output.write(''.join('| '+' | '.join(row)+' |\n' for row in rows))
+    else:
+        writeRows=lambda rows:output.write(''.join(' '.join(row)+'\n' for row in rows))
+    if header:
+        units=[column.first() for column in table]
+        names=[column.header(columnUnits) for column,columnUnits in zip(table,units)]
+        widths=[column.width(columnUnits) for column,columnUnits in zip(table,units)]
+        if style=='text':
+            names=[('{0:'+align+str(width)+'}').format(name) for name,(align,width) in zip(names,widths)]
+        if style=='markdown':
+            rules={'<':':---','>':'---:','^':':---:','=':'---:'}
+            writeRows([list(map(_escapeMarkdown,names))])
+            output.write('|'+'|'.join(rules[align] for align,width in widths)+'|\n')
+        else:
+            writeRows([names])
+    rows=0
+    while table:
+        chunks=[list(islice(column.values,chunkSize)) for column in table]
+        length=len(chunks[0])
+        for column,chunk in zip(table,chunks):
+            if len(chunk)!=length:
+                raise UnitError('Column '+str(column.name)+' does not have the same number of rows as '+str(table[0].name))
+        if not length:
+            break
+        writeRows(zip(*[column.format(chunk) for column,chunk in zip(table,chunks)]))
+        rows+=length
+    seconds=time.time()-start
+    rowsPerSecond=0.0
+    if seconds>0:
+        rowsPerSecond=rows/seconds
+    return {'rows':rows,'seconds':seconds,'rowsPerSecond':rowsPerSecond}
+class _Output(object):
+    __doc__="""Collects the text written to it, as str on both python 2 and 3."""
+    def __init__(self):
+        self.parts=[]
+    def write(self,text):
+        self.parts.append(text)
+    def getvalue(self):
+        return ''.join(self.parts)
+def formatTable(columns,specs=None,sourceUnits=None,style='text',header=True):
+    """formatTable(columns,specs=None,sourceUnits=None,style='text',header=True)
+    Return a table formatted with writeTable as a string.
+    """
+    output=_Output()
+    writeTable(output,columns,specs,sourceUnits,style,header)
+    return output.getvalue()
+def runTests():
+    from .tests.testTable import runTests
+    runTests()
+if  __name__=='__main__':
+    runTests()
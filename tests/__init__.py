@@ -0,0 +1,20 @@
+__doc__="""tests/__init__.py
+
+Tests of pyunits, kept out of the package so importing pyunits does not load unittest.
+
+Call from command line as: python -m pyunits test
+"""
+import sys
+import unittest
+def testSuite():
+    """testSuite()
+    Return a suite of the tests of every pyunits module.
+    """
+    from . import testUnits,testAccumulators,testArrays,testBinary,testCodec,testDatabase,testDeferred,testFormula,testInstrument,testParallel,testStream,testTable
+    modules=[testUnits,testAccumulators,testArrays,testBinary,testCodec,testDatabase,testDeferred,testFormula,testInstrument,testParallel,testStream,testTable]
+    if sys.version_info>=(3,6):
+        from . import testAio
+        modules.append(testAio)
+    return unittest.TestSuite([getattr(module,'__testSuite')() for module in modules])
+def runTests():
+    unittest.TextTestRunner(verbosity=4).run(testSuite())
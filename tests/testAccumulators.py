@@ -0,0 +1,71 @@
+__doc__="""testAccumulators.py
+
+Tests of accumulators.py.
+"""
+import math
+import unittest
+from ..accumulators import UnitAccumulator
+from ..units import DimensionError,Unit,UnitError
+class __UnitAccumulatorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__setattr__('values',[Unit(1,'m'),Unit(0.002,'km'),Unit(300,'cm'),Unit(4,'m')])
+    def tearDown(self):
+        self.__delattr__('values')
+    def test_extend(self):
+        accumulator=UnitAccumulator('m').extend(self.values)
+        self.assertEqual(accumulator.count,4,'extend error')
+        self.assertAlmostEqual(accumulator.sum(),10.0,12,'sum error')
+        self.assertEqual(accumulator.sum().units,'m','sum error')
+        self.assertAlmostEqual(accumulator.mean(),2.5,12,'mean error')
+        self.assertAlmostEqual(accumulator.min(),1.0,12,'min error')
+        self.assertAlmostEqual(accumulator.max(),4.0,12,'max error')
+        self.assertAlmostEqual(accumulator.variance(),1.25,12,'variance error')
+        self.assertEqual(accumulator.variance().units,'m**2','variance error')
+        self.assertAlmostEqual(accumulator.std(ddof=1),math.sqrt(5/3.0),12,'std error')
+        self.assertEqual(sorted(accumulator._transforms),['cm','km','m'],'extend error')
+    def test_add(self):
+        accumulator=UnitAccumulator('km')
+        accumulator.add(Unit(500,'m')).add(1500,'m').add(1.0)
+        self.assertAlmostEqual(accumulator.sum(),3.0,12,'add error')
+        self.assertAlmostEqual(accumulator.mean().convert('m'),1000.0,9,'add error')
+        self.assertRaises(UnitError,accumulator.add,Unit(1,'s'))
+        self.assertEqual(accumulator.count,3,'add error')
+    def test_defaultUnits(self):
+        accumulator=UnitAccumulator().add(2.0).add(Unit(1,'m')).add(Unit(50,'cm'))
+        self.assertEqual(accumulator.units,'m','default units error')
+        self.assertAlmostEqual(accumulator.sum(),3.5,12,'default units error')
+        self.assertEqual(accumulator.sum().units,'m','default units error')
+        self.assertRaises(DimensionError,accumulator.add,Unit(1,'s'))
+        self.assertRaises(DimensionError,UnitAccumulator().extend,[Unit(1,'m'),Unit(1,'s')])
+        self.assertRaises(DimensionError,UnitAccumulator().add(1,'m').merge,UnitAccumulator('s').add(1))
+        self.assertEqual(accumulator.count,3,'default units error')
+    def test_compensated(self):
+        accumulator=UnitAccumulator('m').extend([1e16,1.0,-1e16]*10,'m')
+        self.assertEqual(accumulator.sum(),10.0,'compensated sum error')
+    def test_merge(self):
+        whole=UnitAccumulator('m').extend(self.values)
+        first=UnitAccumulator('m').extend(self.values[:1])
+        second=UnitAccumulator('cm').extend(self.values[1:])
+        first.merge(second).merge(UnitAccumulator('m'))
+        for statistic in ['sum','mean','min','max','variance']:
+            self.assertAlmostEqual(getattr(first,statistic)(),getattr(whole,statistic)(),9,'merge error: '+statistic)
+        self.assertAlmostEqual(UnitAccumulator('m').merge(second).mean(),3.0,9,'merge error')
+        self.assertRaises(UnitError,UnitAccumulator('s').merge,second)
+    def test_temperature(self):
+        accumulator=UnitAccumulator('degC').extend([Unit(68,'degF'),Unit(30,'degC'),Unit(283.15,'K')])
+        self.assertAlmostEqual(accumulator.mean(),20.0,9,'temperature error')
+        self.assertEqual(accumulator.std().units,'delta_degC','temperature error')
+        self.assertRaises(UnitError,accumulator.sum)
+    def test_empty(self):
+        accumulator=UnitAccumulator('m')
+        self.assertEqual(accumulator.sum(),0.0,'empty error')
+        self.assertRaises(UnitError,accumulator.mean)
+        self.assertRaises(UnitError,UnitAccumulator('m').add(1).variance,1)
+def __testSuite():
+    accumulatorSuite = unittest.TestLoader().loadTestsFromTestCase(__UnitAccumulatorTestCase)
+    return unittest.TestSuite([accumulatorSuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+if  __name__=='__main__':
+    runTests()
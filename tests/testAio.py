@@ -0,0 +1,142 @@
+__doc__="""testAio.py
+
+Tests of aio.py.
+"""
+import asyncio
+import gc
+import unittest
+from ..aio import convertAsync
+from ..units import Unit,UnitError
+def _run(coroutine):
+    loop=asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+class _Readings(object):
+    __doc__="""Async iterable of readings, counting how many have been read and pausing every pause readings."""
+    def __init__(self,readings,pause=None,error=None):
+        self.readings=list(readings)
+        self.pause=pause
+        self.error=error
+        self.read=0
+    def __aiter__(self):
+        return self._iterate()
+    async def _iterate(self):
+        for reading in self.readings:
+            if self.pause and self.read%self.pause==0:
+                await asyncio.sleep(0)
+            self.read+=1
+            yield reading
+        if self.error is not None:
+            raise self.error
+async def _collect(converter):
+    results=[]
+    errors=[]
+    while True:
+        try:
+            results.append(await converter.__anext__())
+        except UnitError as error:
+            errors.append((len(results),str(error)))
+        except StopAsyncIteration:
+            return results,errors
+class __AioTestCase(unittest.TestCase):
+    def test_convertAsync(self):
+        readings=_Readings([(1,'km'),Unit(2,'ft'),(3,'miles'),4.0])
+        results,errors=_run(_collect(convertAsync(readings,'m',fromUnits='cm',batchSize=2)))
+        self.assertEqual(errors,[],'convertAsync error')
+        self.assertEqual([value.units for value in results],['m']*4,'convertAsync error')
+        for value,expected in zip(results,[1000.0,0.6096,4828.032,0.04]):
+            self.assertAlmostEqual(value,expected,9,'convertAsync error')
+    def test_floats(self):
+        readings=_Readings([(0,'degC'),(212,'degF'),(1,'delta_degC')])
+        results,errors=_run(_collect(convertAsync(readings,'K',asUnits=False)))
+        self.assertEqual(errors,[],'floats error')
+        self.assertEqual([type(value) for value in results],[float]*3,'floats error')
+        for value,expected in zip(results,[273.15,373.15,1.0]):
+            self.assertAlmostEqual(value,expected,9,'floats error')
+    def test_errors(self):
+        readings=_Readings([(1,'m'),(2,'s'),(3,'ft'),('x','m'),(4,'kg'),(5,'nonsense'),(6,'m')])
+        results,errors=_run(_collect(convertAsync(readings,'m',batchSize=3,sliceSize=2)))
+        self.assertEqual(len(results),3,'errors error')
+        for value,expected in zip(results,[1.0,0.9144,6.0]):
+            self.assertAlmostEqual(value,expected,9,'errors error')
+        self.assertEqual([index for index,error in errors],[1,2,2,2],'errors error')
+        skipped=[]
+        async def collect():
+            return [value async for value in convertAsync(_Readings(readings.readings),'m',onError=lambda reading,error:skipped.append(reading))]
+        self.assertEqual(len(_run(collect())),3,'onError error')
+        self.assertEqual(skipped,[(2,'s'),('x','m'),(4,'kg'),(5,'nonsense')],'onError error')
+    def test_sourceError(self):
+        readings=_Readings([(1,'m'),(2,'m')],error=KeyError('source'))
+        async def collect():
+            results=[]
+            try:
+                async for value in convertAsync(readings,'cm'):
+                    results.append(value)
+            except KeyError:
+                return results
+        self.assertEqual(_run(collect()),[100.0,200.0],'source error')
+    def test_backpressure(self):
+        readings=_Readings([(i,'ft') for i in range(10000)],pause=10)
+        async def consume():
+            converter=convertAsync(readings,'m',batchSize=100,queueSize=50)
+            seen=[]
+            async with converter:
+                async for value in converter:
+                    seen.append(readings.read-len(seen))
+                    if len(seen)==1000:
+                        break
+            return seen
+        seen=_run(consume())
+        #The source is never more than a queue and a batch ahead of the consumer, and stops when the consumer does
+        self.assertTrue(max(seen)<=50+100+1,'backpressure error')
+        self.assertTrue(readings.read<2000,'backpressure error')
+    def test_noUnits(self):
+        readings=_Readings([(1,'m'),2.0,Unit(3,'s')])
+        results,errors=_run(_collect(convertAsync(readings,False)))
+        self.assertEqual(errors,[],'no units error')
+        self.assertEqual(results,[1.0,2.0,3.0],'no units error')
+        self.assertEqual([value.units for value in results],[False]*3,'no units error')
+    def test_finalise(self):
+        readings=_Readings([(i,'ft') for i in range(10000)],pause=10)
+        async def consume():
+            converter=convertAsync(readings,'m',batchSize=100,queueSize=50)
+            await converter.__anext__()
+            task=converter._task
+            del converter
+            gc.collect()
+            for i in range(10):
+                await asyncio.sleep(0)
+            return task
+        task=_run(consume())
+        self.assertTrue(task.cancelled(),'finalise error')
+        self.assertTrue(readings.read<1000,'finalise error')
+    def test_yields(self):
+        ticks=[0]
+        async def ticker():
+            while True:
+                ticks[0]+=1
+                await asyncio.sleep(0)
+        readings=_Readings([(i,'ft') for i in range(4096)])
+        async def consume():
+            task=asyncio.ensure_future(ticker())
+            await asyncio.sleep(0)
+            converter=convertAsync(readings,'m',batchSize=4096,queueSize=4096,sliceSize=256)
+            before=ticks[0]
+            result=await converter.__anext__()
+            after=ticks[0]
+            await converter.aclose()
+            task.cancel()
+            return before,after,result
+        before,after,result=_run(consume())
+        self.assertEqual(result,0.0,'yields error')
+        self.assertTrue(after-before>=4096//256-1,'yields error')
+def __testSuite():
+    aioSuite = unittest.TestLoader().loadTestsFromTestCase(__AioTestCase)
+    return unittest.TestSuite([aioSuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+if  __name__=='__main__':
+    runTests()
@@ -0,0 +1,103 @@
+__doc__="""testArrays.py
+
+Tests of arrays.py.
+"""
+import unittest
+from ..arrays import UnitArray,_hasNumpy
+from ..units import Unit,UnitError
+@unittest.skipIf(not _hasNumpy(),'numpy is not installed')
+class __UnitArrayTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__setattr__('array',UnitArray([1.0,2.0,3.0],'m'))
+    def tearDown(self):
+        self.__delattr__('array')
+    def test___getitem__(self):
+        self.assertEqual(type(self.array[0]),Unit,'getitem error')
+        self.assertEqual(self.array[1],Unit(2,'m'),'getitem error')
+        self.assertEqual(type(self.array[1:]),UnitArray,'getitem error')
+        self.assertEqual(self.array[1:].values.tolist(),[2.0,3.0],'getitem error')
+    def test___add__(self):
+        self.assertEqual((self.array+1).values.tolist(),[2.0,3.0,4.0],'Add test error')
+        self.assertEqual((self.array+Unit(1,'km')).values.tolist(),[1001.0,1002.0,1003.0],'Add test error')
+        self.assertEqual((self.array+UnitArray([1,2,3],'km')).units,'m','Add test error')
+        self.assertEqual((UnitArray([1,2])+UnitArray([1,2],'m')).units,'m','Add test error')
+        self.assertRaises(UnitError,self.array.__add__,Unit(1,'s'))
+    def test___sub__(self):
+        self.assertEqual((self.array-UnitArray([1,2,3],'m')).values.tolist(),[0.0,0.0,0.0],'Sub test error')
+        self.assertRaises(UnitError,self.array.__sub__,UnitArray([1,2,3],'s'))
+    def test___mul__(self):
+        result=self.array*Unit(2,'s')
+        self.assertEqual(result.values.tolist(),[2.0,4.0,6.0],'Mul test error')
+        self.assertEqual(result.units,'m*s','Mul test error')
+        result=self.array*UnitArray([1,1,1],'km')
+        self.assertEqual(result.values.tolist(),[1000.0,2000.0,3000.0],'Mul test error')
+        self.assertEqual((2*self.array).values.tolist(),[2.0,4.0,6.0],'Mul test error')
+    def test___truediv__(self):
+        result=self.array/Unit(2,'s')
+        self.assertEqual(result.values.tolist(),[0.5,1.0,1.5],'truediv test error')
+        self.assertEqual(result.units,'m/s','truediv test error')
+        result=self.array/UnitArray([1,2,3],'km')
+        self.assertEqual(result.values.tolist(),[0.001,0.001,0.001],'truediv test error')
+    def test_compare(self):
+        self.assertEqual((self.array>Unit(2,'m')).tolist(),[False,False,True],'gt error')
+        self.assertEqual((self.array<=UnitArray([1,1,1],'km')).tolist(),[True,True,True],'le error')
+        self.assertEqual((self.array==Unit(0.002,'km')).tolist(),[False,True,False],'eq error')
+        self.assertEqual((self.array==Unit(2,'s')).tolist(),[False,False,False],'eq error')
+        self.assertRaises(UnitError,self.array.__lt__,Unit(2,'s'))
+    def test_convert(self):
+        result=self.array.convert('km')
+        self.assertEqual(result.values.tolist(),[0.001,0.002,0.003],'convert error')
+        self.assertEqual(result.units,'km','convert error')
+        self.assertRaises(UnitError,self.array.convert,'s')
+    def test_invert(self):
+        result=UnitArray([1.0,2.0],'m/s').invert()
+        self.assertEqual(result.values.tolist(),[1.0,0.5],'invert error')
+        self.assertEqual(result.units,'s/m','invert error')
+    def test_reductions(self):
+        self.assertEqual(self.array.sum(),Unit(6,'m'),'sum error')
+        self.assertEqual(type(self.array.mean()),Unit,'mean error')
+        self.assertEqual(self.array.max(),Unit(3,'m'),'max error')
+        self.assertEqual(type(UnitArray([[1,2],[3,4]],'m').sum(0)),UnitArray,'sum error')
+        self.assertEqual(UnitArray([1,3],'m').variance(),Unit(1.0,'m**2'),'variance error')
+    def test_temperature(self):
+        temperatures=UnitArray([0.0,30.0],'degC')
+        self.assertEqual((temperatures==Unit(273.15,'K')).tolist(),[True,False],'temperature error')
+        self.assertEqual((temperatures<Unit(50,'degF')).tolist(),[True,False],'temperature error')
+        self.assertEqual((temperatures>=UnitArray([31,80],'degF')).tolist(),[True,True],'temperature error')
+        self.assertAlmostEqual(temperatures.convert('degF')[1],86.0,12,'temperature error')
+        self.assertEqual(temperatures.std().units,'delta_degC','temperature error')
+        self.assertEqual(temperatures.std(),15.0,'temperature error')
+        self.assertEqual(temperatures.variance(),Unit(225.0,'K**2'),'temperature error')
+        self.assertEqual(temperatures.mean(),Unit(15,'degC'),'temperature error')
+        self.assertRaises(UnitError,temperatures.sum)
+    def test_temperature_arithmetic(self):
+        temperatures=UnitArray([0.0,30.0],'degC')
+        for other in (Unit(50,'degF'),Unit(9,'delta_degF'),Unit(5,'K'),Unit(1),UnitArray([50,50],'degF')):
+            for operator in ('__add__','__sub__'):
+                scalar=other[0] if isinstance(other,UnitArray) else other
+                try:
+                    expected=[getattr(Unit(value,'degC'),operator)(scalar) for value in (0.0,30.0)]
+                except UnitError:
+                    self.assertRaises(UnitError,getattr(temperatures,operator),other)
+                    continue
+                result=getattr(temperatures,operator)(other)
+                self.assertEqual(result.units,expected[0].units,'temperature arithmetic error')
+                for value,expectedValue in zip(result.values.tolist(),expected):
+                    self.assertAlmostEqual(value,expectedValue,12,'temperature arithmetic error')
+        difference=temperatures-Unit(50,'degF')
+        self.assertEqual(difference.units,'delta_degC','temperature arithmetic error')
+        self.assertAlmostEqual(difference[1],20.0,12,'temperature arithmetic error')
+        total=UnitArray([5.0,10.0],'K')+Unit(20,'degC')
+        self.assertEqual((total.values.tolist(),total.units),([25.0,30.0],'degC'),'temperature arithmetic error')
+        self.assertRaises(UnitError,temperatures.__add__,Unit(20,'degC'))
+        self.assertRaises(UnitError,UnitArray([5.0],'K').__sub__,Unit(20,'degC'))
+        self.assertRaises(UnitError,UnitArray([5.0]).__sub__,Unit(20,'degC'))
+        self.assertRaises(UnitError,temperatures.__add__,Unit(1,'m'))
+def __testSuite():
+    arraySuite = unittest.TestLoader().loadTestsFromTestCase(__UnitArrayTestCase)
+    return unittest.TestSuite([arraySuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+if  __name__=='__main__':
+    runTests()
@@ -0,0 +1,78 @@
+__doc__="""testBinary.py
+
+Tests of binary.py.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from array import array
+from ..binary import convertBinaryFile,readSidecar,sidecarPath,writeSidecar
+from ..units import UnitError
+class __BinaryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__setattr__('directory',tempfile.mkdtemp())
+        self.__setattr__('path',os.path.join(self.directory,'speed.bin'))
+        values=array('d',[float(i) for i in range(1000)])
+        if sys.byteorder=='big':
+            values.byteswap()
+        with open(self.path,'wb') as output:
+            output.write(values.tobytes() if hasattr(values,'tobytes') else values.tostring())
+        writeSidecar(self.path,'km')
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        self.__delattr__('directory')
+        self.__delattr__('path')
+    def _read(self,path):
+        values=array('d')
+        with open(path,'rb') as input:
+            data=input.read()
+        if hasattr(values,'frombytes'):
+            values.frombytes(data)
+        else:
+            values.fromstring(data)
+        if sys.byteorder=='big':
+            values.byteswap()
+        return values.tolist()
+    def test_sidecar(self):
+        self.assertEqual(readSidecar(self.path),'km','sidecar error')
+        self.assertRaises(UnitError,readSidecar,os.path.join(self.directory,'missing.bin'))
+    def test_convertBinaryFile(self):
+        self.assertEqual(convertBinaryFile(self.path,'m',windowSize=1),1000,'convertBinaryFile error')
+        self.assertEqual(self._read(self.path),[i*1000.0 for i in range(1000)],'convertBinaryFile error')
+        self.assertEqual(readSidecar(self.path),'m','convertBinaryFile error')
+    def test_convertBinaryFile_sidecar(self):
+        convertBinaryFile(self.path,'m',sidecar=False)
+        self.assertEqual(readSidecar(self.path),'m','convertBinaryFile error')
+        convertBinaryFile(self.path,'km')
+        self.assertEqual(self._read(self.path),[float(i) for i in range(1000)],'convertBinaryFile error')
+        os.remove(sidecarPath(self.path))
+        convertBinaryFile(self.path,'m','km')
+        self.assertRaises(UnitError,readSidecar,self.path)
+    def test_convertBinaryFile_output(self):
+        outputPath=os.path.join(self.directory,'speed_ft.bin')
+        convertBinaryFile(self.path,'ft',outputPath=outputPath,sidecar=True)
+        self.assertEqual(self._read(self.path),[float(i) for i in range(1000)],'convertBinaryFile error')
+        converted=self._read(outputPath)
+        for i in range(1000):
+            self.assertAlmostEqual(converted[i],i*1000/0.3048,6,'convertBinaryFile error')
+        self.assertEqual(readSidecar(outputPath),'ft','convertBinaryFile error')
+    def test_convertBinaryFile_temperature(self):
+        convertBinaryFile(self.path,'degF','degC',windowSize=100)
+        converted=self._read(self.path)
+        for i in range(1000):
+            self.assertAlmostEqual(converted[i],i*1.8+32,9,'convertBinaryFile error')
+    def test_convertBinaryFile_errors(self):
+        self.assertRaises(UnitError,convertBinaryFile,self.path,'s')
+        with open(self.path,'ab') as output:
+            output.write(b'1')
+        self.assertRaises(UnitError,convertBinaryFile,self.path,'m')
+def __testSuite():
+    binarySuite = unittest.TestLoader().loadTestsFromTestCase(__BinaryTestCase)
+    return unittest.TestSuite([binarySuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+if  __name__=='__main__':
+    runTests()
@@ -0,0 +1,61 @@
+__doc__="""testCodec.py
+
+Tests of codec.py.
+"""
+import unittest
+from io import BytesIO
+from ..codec import dumps,loads,read,write
+from ..units import Unit,UnitError
+class __CodecTestCase(unittest.TestCase):
+    def test_dumps(self):
+        value=Unit(1.5,'km/hr')
+        self.assertEqual(loads(dumps(value)),value,'dumps error')
+        self.assertEqual(loads(dumps(value)).units,'km/hr','dumps error')
+        self.assertEqual(loads(dumps(Unit(2))).units,False,'dumps error')
+        self.assertEqual(loads(dumps([])),[],'dumps error')
+    def test_dumps_single(self):
+        values=[Unit(float(i),'m/s') for i in range(100)]
+        data=dumps(values,blockSize=30)
+        self.assertTrue(len(data)<8*100+100,'dumps size error')
+        result=loads(data)
+        self.assertEqual([float(value) for value in result],[float(i) for i in range(100)],'dumps error')
+        self.assertEqual(set(value.units for value in result),set(['m/s']),'dumps error')
+        self.assertTrue(result[0]._descriptor is result[99]._descriptor,'dumps error')
+    def test_dumps_mixed(self):
+        values=[Unit(1,'m'),Unit(2,'s'),3.0,Unit(4,'m'),Unit(5,'kg*m/s**2')]
+        result=loads(dumps(values))
+        self.assertEqual([float(value) for value in result],[1.0,2.0,3.0,4.0,5.0],'dumps error')
+        self.assertEqual([value.units for value in result],['m','s',False,'m','kg*m/s**2'],'dumps error')
+    def test_write(self):
+        stream=BytesIO()
+        write(stream,[Unit(1,'m')])
+        write(stream,Unit(2,'s'))
+        stream.seek(0)
+        self.assertEqual(read(stream),[Unit(1,'m')],'write error')
+        self.assertEqual(read(stream),Unit(2,'s'),'write error')
+        self.assertRaises(UnitError,read,stream)
+    def test_errors(self):
+        self.assertRaises(UnitError,loads,b'XYZ\x01l')
+        data=dumps([Unit(1,'m')])
+        self.assertRaises(UnitError,loads,data[:-3])
+        self.assertRaises(UnitError,loads,data.replace(b'\x00\x00\xf0?',b'\x00\x00\x00@',1))
+    def test_UnitArray(self):
+        from ..arrays import UnitArray,_hasNumpy
+        if not _hasNumpy():
+            self.skipTest('numpy is not installed')
+        values=UnitArray([[1.0,2.0],[3.0,4.0]],'ft')
+        result=loads(dumps(values,blockSize=3))
+        self.assertEqual(result.units,'ft','UnitArray error')
+        self.assertEqual(result.values.tolist(),[[1.0,2.0],[3.0,4.0]],'UnitArray error')
+        result=loads(dumps(UnitArray([],'m')))
+        self.assertEqual((result.values.tolist(),result.units),([],'m'),'UnitArray error')
+        result=loads(dumps(UnitArray([])))
+        self.assertEqual((result.values.tolist(),bool(result.units)),([],False),'UnitArray error')
+def __testSuite():
+    codecSuite = unittest.TestLoader().loadTestsFromTestCase(__CodecTestCase)
+    return unittest.TestSuite([codecSuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+if  __name__=='__main__':
+    runTests()
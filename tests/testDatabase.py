@@ -0,0 +1,122 @@
+__doc__="""testDatabase.py
+
+Tests of database.py.
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from ..database import flattenDefinitions,loadDatabase,parseDefinition,readDefinitions,useDatabase
+from ..units import Unit,UnitError,useRegistry
+_ini="""[dimensions]
+Length = m
+Mass = kg
+Time = s
+Temperature = K
+
+[prefixes]
+k = 1000
+m = 1/1000
+
+[units]
+mile = 5280 ft
+ft = 0.3048 m
+N = kg*m/s**2
+lbf = 4.4482216152605 N
+Hz = 1/s
+rpm = 1/60 Hz
+degC = K + 273.15
+degF = 5/9 degC - 17.77777777777778
+"""
+class __DatabaseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__setattr__('directory',tempfile.mkdtemp())
+        self.__setattr__('path',os.path.join(self.directory,'units.ini'))
+        self.__setattr__('registry',Unit.registry)
+        with open(self.path,'w') as output:
+            output.write(_ini)
+    def tearDown(self):
+        useRegistry(self.registry)
+        shutil.rmtree(self.directory)
+        self.__delattr__('directory')
+        self.__delattr__('path')
+        self.__delattr__('registry')
+    def test_parseDefinition(self):
+        self.assertEqual(parseDefinition('ft','0.3048 m'),(0.3048,'m',0.0),'parseDefinition error')
+        self.assertEqual(parseDefinition('N','kg*m/s**2'),(1.0,'kg*m/s**2',0.0),'parseDefinition error')
+        self.assertEqual(parseDefinition('Hz','1/s'),(1.0,'1/s',0.0),'parseDefinition error')
+        self.assertEqual(parseDefinition('rpm','1/60 Hz'),(1.0/60,'Hz',0.0),'parseDefinition error')
+        self.assertEqual(parseDefinition('degC','K + 273.15'),(1.0,'K',273.15),'parseDefinition error')
+        self.assertEqual(parseDefinition('degF','5/9 degC - 32'),(5.0/9,'degC',-32.0),'parseDefinition error')
+        self.assertEqual(parseDefinition('dozen',12),(12.0,'',0.0),'parseDefinition error')
+    def test_flattenDefinitions(self):
+        flattened=flattenDefinitions(*readDefinitions(self.path))
+        self.assertEqual(flattened['dimensions'],('Length','Mass','Time','Temperature'),'flattenDefinitions error')
+        self.assertAlmostEqual(flattened['units']['mile']['SIVAL'],1609.344,9,'flattenDefinitions error')
+        self.assertEqual(flattened['units']['mile']['TYPE'],'Length','flattenDefinitions error')
+        self.assertEqual(flattened['compoundUnits']['N'],{'SIVAL':1.0,'UNITS':'m*kg/s**2'},'flattenDefinitions error')
+        self.assertEqual(flattened['compoundUnits']['rpm']['UNITS'],'s**-1','flattenDefinitions error')
+        self.assertEqual(flattened['units']['degC'],{'SIVAL':1.0,'TYPE':'Temperature','OFFSET':273.15},
+                         'flattenDefinitions error')
+        self.assertAlmostEqual(flattened['units']['degF']['OFFSET'],255.37222222222222,9,'flattenDefinitions error')
+        self.assertEqual(flattened['prefixes'],{'k':1000.0,'m':0.001},'flattenDefinitions error')
+    def test_flattenErrors(self):
+        dimensions=[('Length','m'),('Time','s')]
+        self.assertRaises(UnitError,flattenDefinitions,dimensions,[],[('a','2 b'),('b','3 a')])
+        self.assertRaises(UnitError,flattenDefinitions,dimensions,[],[('a','2 c')])
+        self.assertRaises(UnitError,flattenDefinitions,dimensions,[],[('a','m/s + 1')])
+        self.assertRaises(UnitError,flattenDefinitions,dimensions,[],[('a','m + 1'),('b','a/s + 2')])
+        self.assertRaises(UnitError,flattenDefinitions,dimensions,[('k','1000')],[('a','m + 1'),('b','ka')])
+    def test_loadDatabase(self):
+        registry=loadDatabase(self.path)
+        self.assertTrue(os.path.exists(self.path+'.cache'),'loadDatabase cache error')
+        useRegistry(registry)
+        self.assertAlmostEqual(Unit(1,'mile').convert('km'),1.609344,9,'loadDatabase error')
+        self.assertAlmostEqual(Unit(1,'lbf').convert('N'),4.4482216152605,9,'loadDatabase error')
+        self.assertAlmostEqual(Unit(60,'rpm').convert('Hz'),1.0,9,'loadDatabase error')
+        self.assertAlmostEqual(Unit(100,'degC').convert('degF'),212.0,9,'loadDatabase error')
+        self.assertAlmostEqual(Unit(1,'kN').convert('lbf'),224.80894309971,6,'loadDatabase error')
+        self.assertRaises(UnitError,Unit(1,'mile').convert,'s')
+    def test_cache(self):
+        loadDatabase(self.path)
+        with open(self.path+'.cache','rb') as input:
+            data=input.read()
+        self.assertTrue(data.startswith(b'PYUNITSDB'),'cache error')
+        #The definitions follow the magic and the 22 byte header as JSON rather than a pickle
+        flattened=json.loads(data[len(b'PYUNITSDB')+22:].decode('utf-8'))
+        self.assertEqual(flattened['units']['ft'],{'SIVAL':0.3048,'TYPE':'Length'},'cache error')
+        self.assertEqual(Unit(1,'ft').convert('m'),0.3048,'cache error')
+        #A cache which is corrupt, or built from another version of the database, is rebuilt
+        with open(self.path+'.cache','wb') as output:
+            output.write(data[:-10])
+        loadDatabase(self.path)
+        with open(self.path+'.cache','rb') as input:
+            self.assertEqual(input.read(),data,'cache error')
+        with open(self.path,'a') as output:
+            output.write('yd = 3 ft\n')
+        registry=loadDatabase(self.path)
+        self.assertTrue('yd' in registry,'cache error')
+        self.assertTrue('yd' in loadDatabase(self.path),'cache error')
+        cachePath=os.path.join(self.directory,'other.cache')
+        loadDatabase(self.path,cachePath)
+        self.assertTrue(os.path.exists(cachePath),'cache error')
+    def test_json(self):
+        path=os.path.join(self.directory,'units.json')
+        with open(path,'w') as output:
+            json.dump({'dimensions':{'Length':'m','Time':'s'},'prefixes':{'k':1000},
+                       'units':{'mph':'mile/hr','mile':'1609.344 m','hr':'3600 s','dozen':12}},output)
+        useDatabase(path,False)
+        self.assertFalse(os.path.exists(path+'.cache'),'json cache error')
+        self.assertAlmostEqual(Unit(60,'mph').convert('m/s'),26.8224,9,'json error')
+        self.assertEqual(Unit.registry.lookup('dozen'),((0,0),12.0),'json error')
+        self.assertEqual(Unit._dimensions,('Length','Time'),'json error')
+        self.assertRaises(UnitError,Unit,1,'kg')
+def __testSuite():
+    databaseSuite = unittest.TestLoader().loadTestsFromTestCase(__DatabaseTestCase)
+    return unittest.TestSuite([databaseSuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+if  __name__=='__main__':
+    runTests()
@@ -0,0 +1,77 @@
+__doc__="""testDeferred.py
+
+Tests of deferred.py.
+"""
+import unittest
+from ..deferred import lazy
+from ..units import Unit,UnitError
+class __LazyUnitTestCase(unittest.TestCase):
+    def test_lazy(self):
+        self.assertEqual(lazy(Unit(2,'m')).units,'m','lazy error')
+        self.assertEqual(float(lazy(2,'m')),2.0,'lazy error')
+        leaf=lazy(1)
+        self.assertTrue(lazy(leaf) is leaf,'lazy error')
+    def test_sum(self):
+        result=lazy(Unit(1,'m'))+Unit(1,'km')+Unit(100,'cm')-Unit(1,'m')
+        self.assertEqual(result.units,'m','sum error')
+        self.assertEqual(len(result.operands),4,'sum error')
+        self.assertAlmostEqual(float(result),1001.0,9,'sum error')
+        self.assertAlmostEqual(float(result.convert('km')),1.001,12,'sum error')
+        self.assertEqual(result.convert('km').units,'km','sum error')
+        self.assertEqual((lazy(1)+Unit(2,'m')).units,'m','sum error')
+        self.assertAlmostEqual(float(-lazy(2,'m')+Unit(1,'km')),998.0,9,'sum error')
+        self.assertAlmostEqual(float(1-lazy(2)),-1.0,12,'sum error')
+    def test_sum_dimensions(self):
+        result=lazy(Unit(1,'m'))+Unit(1,'s')
+        self.assertRaises(UnitError,result.evaluate)
+        self.assertRaises(UnitError,result.convert,'km')
+    def test_temperature(self):
+        self.assertAlmostEqual(float(lazy(Unit(20,'degC')).convert('K')),293.15,9,'temperature error')
+        self.assertAlmostEqual(float(lazy(Unit(212,'degF')).convert('degC')),100.0,9,'temperature error')
+        self.assertAlmostEqual(float(lazy(Unit(20,'degC')).convert('degF')),68.0,9,'temperature error')
+        self.assertRaises(UnitError,lambda:lazy(Unit(20,'degC'))+Unit(10,'degC'))
+        self.assertRaises(UnitError,lambda:lazy(Unit(5,'delta_degC'))-Unit(10,'degC'))
+        self.assertRaises(UnitError,lambda:lazy(Unit(300,'K'))-Unit(20,'degC'))
+        cases=[(Unit(30,'degC'),Unit(50,'degF'),'sub'),(Unit(30,'degC'),Unit(10,'K'),'add'),
+               (Unit(30,'degC'),Unit(9,'delta_degF'),'sub'),(Unit(10,'K'),Unit(30,'degC'),'add')]
+        for first,second,operation in cases:
+            if operation=='add':
+                eager,deferred=first+second,lazy(first)+second
+            else:
+                eager,deferred=first-second,lazy(first)-second
+            self.assertEqual(deferred.units,eager.units,'temperature error')
+            self.assertAlmostEqual(float(deferred),float(eager),9,'temperature error')
+            self.assertAlmostEqual(float(deferred.convert('K')),float(eager.convert('K')),9,'temperature error')
+        #A difference of absolute temperatures is a difference, and adding it to another stays absolute
+        difference=lazy(Unit(30,'degC'))-Unit(50,'degF')
+        self.assertEqual(difference.units,'delta_degC','temperature error')
+        self.assertAlmostEqual(float(difference.convert('delta_degF')),36.0,9,'temperature error')
+        result=Unit(0,'degC')+difference+Unit(1,'K')
+        self.assertEqual(result.units,'degC','temperature error')
+        self.assertAlmostEqual(float(result.convert('K')),294.15,9,'temperature error')
+    def test_product(self):
+        result=(lazy(Unit(3,'km'))+Unit(1000,'m'))/Unit(2,'hr')
+        self.assertEqual(result.units,'km/hr','product error')
+        self.assertAlmostEqual(float(result),2.0,12,'product error')
+        self.assertAlmostEqual(float(result.convert('m/s')),2000.0/3600,12,'product error')
+        result=lazy(Unit(2,'m'))*Unit(3,'s')*2
+        self.assertEqual(result.units,'m*s','product error')
+        self.assertAlmostEqual(float(result),12.0,12,'product error')
+        self.assertEqual((2/lazy(Unit(4,'s'))).units,'s**-1','product error')
+        self.assertAlmostEqual(float(2/lazy(Unit(4,'s'))),0.5,12,'product error')
+    def test_matches_eager(self):
+        a,b,c=Unit(1.5,'m'),Unit(2,'ft'),Unit(0.25,'km')
+        eager=((a+b+c)*Unit(2,'s')).convert('ft*min')
+        deferred=((lazy(a)+b+c)*Unit(2,'s')).convert('ft*min')
+        self.assertEqual(deferred.units,eager.units,'eager error')
+        self.assertAlmostEqual(float(deferred),float(eager),9,'eager error')
+    def test___format__(self):
+        self.assertEqual('{:>5.1f km}'.format(lazy(Unit(1,'m'))+Unit(1,'km')),'  1.0 km','format error')
+def __testSuite():
+    lazySuite = unittest.TestLoader().loadTestsFromTestCase(__LazyUnitTestCase)
+    return unittest.TestSuite([lazySuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+if  __name__=='__main__':
+    runTests()
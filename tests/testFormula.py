@@ -0,0 +1,76 @@
+__doc__="""testFormula.py
+
+Tests of formula.py.
+"""
+import math
+import os
+import subprocess
+import sys
+import unittest
+from ..formula import compileFormula
+from ..units import Unit,UnitError
+class __FormulaTestCase(unittest.TestCase):
+    def test_compileFormula(self):
+        kineticEnergy=compileFormula('0.5*m*v**2',{'m':'lb','v':'miles/hr'},'kJ')
+        expected=(0.5*Unit(150,'lb')*Unit(60,'miles/hr')*Unit(60,'miles/hr')).convert('kJ')
+        self.assertAlmostEqual(kineticEnergy(150,60),expected,12,'compileFormula error')
+        self.assertAlmostEqual(kineticEnergy(v=60,m=150),expected,12,'compileFormula error')
+        self.assertEqual(type(kineticEnergy(150,60)),float,'compileFormula error')
+        #The literal and every unit scaling fold into one constant
+        self.assertTrue(kineticEnergy.source.endswith('*(m*(v**2))\n'),'compileFormula fold error')
+        self.assertEqual(kineticEnergy.source.count('*'),4,'compileFormula fold error')
+        self.assertEqual(compileFormula('m*v',{'m':'kg','v':'m/s'},'kg*m/s').source,'def formula(m,v):\n    return (m*v)\n',
+                         'compileFormula fold error')
+    def test_sums(self):
+        length=compileFormula('a+b-2*c',{'a':'m','b':'ft','c':'km'},'cm')
+        self.assertAlmostEqual(length(1,1,1),100+30.48-200000,9,'sums error')
+        self.assertAlmostEqual(compileFormula('1+x/y',{'x':'m','y':'ft'})(1,1),1+1/0.3048,12,'sums error')
+        self.assertAlmostEqual(compileFormula('(x+y)**2',{'x':'m','y':'ft'},'m**2')(1,1),1.3048**2,12,'sums error')
+        self.assertEqual(compileFormula('0*x+y',{'x':'m','y':'m'},'m')(3,4),4.0,'sums error')
+    def test_functions(self):
+        period=compileFormula('2*3.141592653589793*sqrt(l/g)',{'l':'ft','g':'m/s**2'},'s')
+        self.assertAlmostEqual(period(10,9.81),2*math.pi*math.sqrt(3.048/9.81),12,'functions error')
+        self.assertAlmostEqual(compileFormula('exp(-t/tau)',{'t':'min','tau':'s'})(1,60),math.exp(-1),12,'functions error')
+        self.assertAlmostEqual(compileFormula('abs(x)',{'x':'ft'},'m')(-1),0.3048,12,'functions error')
+        self.assertAlmostEqual(compileFormula('x**(1/2)',{'x':'m**2'},'m')(4),2.0,12,'functions error')
+        self.assertAlmostEqual(compileFormula('x**y',{'x':False,'y':False})(2,3),8.0,12,'functions error')
+    def test_temperature(self):
+        self.assertAlmostEqual(compileFormula('t',{'t':'degC'},'degF')(100),212.0,9,'temperature error')
+        self.assertAlmostEqual(compileFormula('2*t',{'t':'degC'},'K')(0),546.3,9,'temperature error')
+    def test_errors(self):
+        self.assertRaises(UnitError,compileFormula,'m+v',{'m':'kg','v':'m/s'})
+        self.assertRaises(UnitError,compileFormula,'m*v',{'m':'kg','v':'m/s'},'J')
+        self.assertRaises(UnitError,compileFormula,'m*x',{'m':'kg'},'kg')
+        self.assertRaises(UnitError,compileFormula,'exp(m)',{'m':'kg'})
+        self.assertRaises(UnitError,compileFormula,'m**v',{'m':'kg','v':False})
+        self.assertRaises(UnitError,compileFormula,'2**m',{'m':'kg'})
+        self.assertRaises(UnitError,compileFormula,'m.real',{'m':'kg'},'kg')
+        self.assertRaises(UnitError,compileFormula,'__import__(m)',{'m':'kg'})
+        self.assertRaises(UnitError,compileFormula,'m +',{'m':'kg'})
+        self.assertRaises(UnitError,compileFormula,'m',{'m':'kg'},'kg',arguments=['x'])
+    def test_arguments(self):
+        formula=compileFormula('x-y',{'x':'m','y':'m','z':'m'},'m',arguments=['y','z','x'])
+        self.assertEqual(formula(1,2,3),2.0,'arguments error')
+    def test_vectorized(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('numpy is not installed')
+        formula=compileFormula('sqrt(x)*exp(y)',{'x':'ft**2','y':False},'m',vectorized=True)
+        values=formula(numpy.array([1.0,4.0]),numpy.array([0.0,0.0]))
+        self.assertEqual(values.tolist(),[0.3048,0.6096],'vectorized error')
+    def test_import(self):
+        #Importing the package does not import ast, which is only needed to compile a formula
+        package=__package__.rsplit('.',1)[0]
+        directory=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        output=subprocess.check_output([sys.executable,'-c','import sys,'+package+';print(\'ast\' in sys.modules)'],
+                                       cwd=directory)
+        self.assertEqual(output.strip(),b'False','import error')
+def __testSuite():
+    formulaSuite = unittest.TestLoader().loadTestsFromTestCase(__FormulaTestCase)
+    return unittest.TestSuite([formulaSuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+if  __name__=='__main__':
+    runTests()
@@ -0,0 +1,88 @@
+__doc__="""testInstrument.py
+
+Tests of instrument.py.
+"""
+import unittest
+from ..instrument import disable,enable,isEnabled,profile,reset,stats
+from ..units import DimensionError,Unit,UnitError
+class __InstrumentTestCase(unittest.TestCase):
+    def setUp(self):
+        reset()
+    def tearDown(self):
+        disable()
+        reset()
+    def test_enable(self):
+        add=Unit.__dict__['__add__']
+        enable()
+        self.assertTrue(isEnabled(),'enable error')
+        self.assertTrue(Unit.__dict__['__add__'] is not add,'enable error')
+        Unit(1,'m')+Unit(2,'km')
+        Unit(1,'m').convert('ft')
+        result=stats()
+        self.assertEqual(result['calls']['__add__'],1,'stats error')
+        self.assertEqual(result['calls']['convert'],1,'stats error')
+        self.assertTrue(result['seconds']['__add__']>=0,'stats error')
+        disable()
+        self.assertTrue(Unit.__dict__['__add__'] is add,'disable error')
+        Unit(1,'m')+Unit(2,'km')
+        self.assertEqual(stats()['calls']['__add__'],1,'disable error')
+    def test_errors(self):
+        enable()
+        self.assertRaises(UnitError,Unit(1,'m').__add__,Unit(1,'s'))
+        self.assertRaises(UnitError,Unit(1,'m').convert,'s')
+        self.assertRaises(UnitError,Unit,1,'xyz')
+        result=stats()
+        self.assertEqual(result['errors']['__add__'],1,'errors error')
+        self.assertEqual(result['errors']['setUnits'],1,'errors error')
+        self.assertEqual(result['dimensionMismatches'],2,'errors error')
+    def test_dimensionMismatches(self):
+        enable()
+        self.assertRaises(DimensionError,Unit(1,'m').__add__,Unit(1,'s'))
+        self.assertRaises(DimensionError,Unit(1,'m').convert,'s')
+        #Other UnitErrors are not dimension mismatches
+        self.assertRaises(UnitError,Unit(20,'degC').__add__,Unit(20,'degC'))
+        self.assertRaises(UnitError,Unit,1,'xyz')
+        result=stats()
+        self.assertEqual(result['errors']['__add__'],2,'dimensionMismatches error')
+        self.assertEqual(result['errors']['compileUnits'],1,'dimensionMismatches error')
+        self.assertEqual(result['dimensionMismatches'],2,'dimensionMismatches error')
+    def test_topUnits(self):
+        enable()
+        for units in ['m','m','m','s','kg','kg']:
+            Unit(1,units)
+        self.assertEqual(stats(2)['topUnits'],[['m',3],['kg',2]],'topUnits error')
+    def test_descriptors(self):
+        Unit(1,'ft/s')
+        enable()
+        #Values given units by name, including cached ones, and results of arithmetic sharing a descriptor are counted
+        speed=Unit(2,'ft/s')
+        speed+Unit(1,'ft/s')
+        speed*2
+        result=stats()
+        self.assertEqual(result['units']['ft/s'],4,'descriptors error')
+        self.assertEqual(result['calls']['getDescriptor'],2,'descriptors error')
+        self.assertFalse('compileUnits' in result['calls'],'descriptors error')
+        Unit(1,'ft*s/hr**3')
+        self.assertEqual(stats()['calls']['compileUnits'],1,'descriptors error')
+    def test_profile(self):
+        enable()
+        Unit(1,'m')
+        results=[]
+        with profile(results.append) as result:
+            Unit(1,'s')*Unit(2,'m')
+        self.assertEqual((result['units']['s'],result['units']['m']),(1,1),'profile error')
+        self.assertEqual(result['calls']['__mul__'],1,'profile error')
+        self.assertTrue(results[0] is result,'profile error')
+        self.assertTrue(isEnabled(),'profile error')
+        disable()
+        with profile():
+            pass
+        self.assertFalse(isEnabled(),'profile error')
+def __testSuite():
+    instrumentSuite = unittest.TestLoader().loadTestsFromTestCase(__InstrumentTestCase)
+    return unittest.TestSuite([instrumentSuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+if  __name__=='__main__':
+    runTests()
@@ -0,0 +1,64 @@
+__doc__="""testParallel.py
+
+Tests of parallel.py.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from array import array
+from ..parallel import convertBatches,convertFileParallel,convertParallel
+from ..units import UnitError,_arrayToBytes,_bytesToArray
+class __ParallelTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__setattr__('values',[float(i) for i in range(1000)])
+    def tearDown(self):
+        self.__delattr__('values')
+    def test_convertParallel(self):
+        result=convertParallel(self.values,'km','m',processes=2,chunkSize=64)
+        self.assertEqual(type(result),array,'convertParallel error')
+        self.assertEqual(result.tolist(),[value*1000.0 for value in self.values],'convertParallel error')
+        result=convertParallel(array('d',self.values),'m','km',chunkSize=2000)
+        self.assertEqual(result.tolist(),[value*0.001 for value in self.values],'convertParallel error')
+        result=convertParallel(self.values,'degC','degF',processes=2,chunkSize=64)
+        self.assertEqual([round(value,9) for value in result],[round(value*1.8+32,9) for value in self.values],'convertParallel error')
+        self.assertRaises(UnitError,convertParallel,self.values,'m','s',processes=2,chunkSize=64)
+    def test_ndarray(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest('numpy is not installed')
+        values=numpy.arange(30.0).reshape((10,3))
+        result=convertParallel(values,'km','m',2,chunkSize=4)
+        self.assertEqual(result.shape,(10,3),'ndarray error')
+        self.assertEqual(result.tolist(),(values*1000.0).tolist(),'ndarray error')
+        result=convertBatches([(values,'km','m'),(values[:,0],'min','s')],processes=2,chunkSize=7)
+        self.assertEqual(result[0].tolist(),(values*1000.0).tolist(),'ndarray error')
+        self.assertEqual(result[1].tolist(),(values[:,0]*60.0).tolist(),'ndarray error')
+    def test_convertBatches(self):
+        data=_arrayToBytes(array('d',self.values))
+        results=convertBatches([(self.values,'km','m'),(data,'min','s'),(bytearray(data),'km','m')],processes=2,chunkSize=300)
+        self.assertEqual(results[0].tolist(),[value*1000.0 for value in self.values],'convertBatches error')
+        self.assertEqual(type(results[1]),type(data),'convertBatches error')
+        self.assertEqual(_bytesToArray(results[1]).tolist(),[value*60.0 for value in self.values],'convertBatches error')
+        self.assertEqual(type(results[2]),bytearray,'convertBatches error')
+    def test_convertFileParallel(self):
+        directory=tempfile.mkdtemp()
+        try:
+            inputPath=os.path.join(directory,'input.bin')
+            outputPath=os.path.join(directory,'output.bin')
+            with open(inputPath,'wb') as output:
+                output.write(_arrayToBytes(array('d',self.values)))
+            self.assertEqual(convertFileParallel(inputPath,outputPath,'hr','min',processes=2,chunkSize=100),1000,'convertFileParallel error')
+            with open(outputPath,'rb') as input:
+                self.assertEqual(_bytesToArray(input.read()).tolist(),[value*60.0 for value in self.values],'convertFileParallel error')
+        finally:
+            shutil.rmtree(directory)
+def __testSuite():
+    parallelSuite = unittest.TestLoader().loadTestsFromTestCase(__ParallelTestCase)
+    return unittest.TestSuite([parallelSuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+if  __name__=='__main__':
+    runTests()
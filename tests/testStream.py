@@ -0,0 +1,76 @@
+__doc__="""testStream.py
+
+Tests of stream.py.
+"""
+import unittest
+from ..stream import convertStream,parseHeader
+from ..units import UnitError
+class __StreamTestCase(unittest.TestCase):
+    def setUp(self):
+        try:
+            from StringIO import StringIO
+        except ImportError:
+            from io import StringIO
+        self.__setattr__('StringIO',StringIO)
+    def tearDown(self):
+        self.__delattr__('StringIO')
+    def test_parseHeader(self):
+        self.assertEqual(parseHeader('speed [ft/s]'),('speed','ft/s'),'parseHeader error')
+        self.assertEqual(parseHeader(' time '),('time',False),'parseHeader error')
+    def test_convertStream(self):
+        output=self.StringIO()
+        result=convertStream(self.StringIO('time [s],speed [ft/s]\n1,10\n2,\n3,20\n'),output,{'speed':'m/s','time':'min'},chunkSize=2)
+        self.assertEqual(output.getvalue(),'time [min],speed [m/s]\n0.016666666666666666,3.048\n0.03333333333333333,\n0.05,6.096\n','convertStream error')
+        self.assertEqual(result['rows'],3,'convertStream error')
+    def test_convertStream_whitespace(self):
+        output=self.StringIO()
+        convertStream(self.StringIO('1 10\n2 20\n'),output,{1:'km'},sourceUnits={1:'m'},delimiter=None,header=False)
+        self.assertEqual(output.getvalue(),'1 0.01\n2 0.02\n','convertStream error')
+    def test_convertStream_whitespaceHeader(self):
+        output=self.StringIO()
+        convertStream(self.StringIO('time [s] speed [ft/s]\n1 10\n2 20\n'),output,{'speed':'m/s'},delimiter=None)
+        self.assertEqual(output.getvalue(),'time [s] speed[m/s]\n1 3.048\n2 6.096\n','convertStream error')
+        again=self.StringIO()
+        convertStream(self.StringIO(output.getvalue()),again,{'speed':'ft/s','time':'min'},delimiter=None)
+        lines=again.getvalue().splitlines()
+        self.assertEqual(lines[0],'time[min] speed[ft/s]','convertStream error')
+        self.assertEqual([len(line.split()) for line in lines],[2,2,2],'convertStream error')
+        output=self.StringIO()
+        convertStream(self.StringIO('time speed[ft/s]\n1 10\n'),output,{'speed':'m/s'},delimiter=None)
+        self.assertEqual(output.getvalue(),'time speed[m/s]\n1 3.048\n','convertStream error')
+    def test_convertStream_temperature(self):
+        output=self.StringIO()
+        convertStream(self.StringIO('t [degC]\n100\n'),output,{'t':'degF'})
+        header,value=output.getvalue().split()[-2:]
+        self.assertEqual(header,'[degF]','convertStream error')
+        self.assertAlmostEqual(float(value),212.0,12,'convertStream error')
+    def test_convertStream_errors(self):
+        self.assertRaises(UnitError,convertStream,self.StringIO('a,b\n1,2\n'),self.StringIO(),{'a':'m'})
+        self.assertRaises(UnitError,convertStream,self.StringIO('a [s],b\n1,2\n'),self.StringIO(),{'a':'m'})
+        self.assertRaises(UnitError,convertStream,self.StringIO('a [s],b\n1,2\n'),self.StringIO(),{'c':'m'})
+    def test_convertStream_rows(self):
+        #Bad cells and short rows raise a UnitError naming the row and column rather than a ValueError or a silent skip
+        try:
+            convertStream(self.StringIO('a [s],b\n1,2\n\n2,x\n'),self.StringIO(),{'a':'min','b':'m'},{'b':'ft'})
+        except UnitError as error:
+            self.assertEqual(str(error),"Cannot convert 'x' in row 4, column b",'convertStream rows error')
+        else:
+            self.fail('convertStream rows error')
+        try:
+            convertStream(self.StringIO('1 2\n3 4\n5\n'),self.StringIO(),{1:'km'},{1:'m'},delimiter=None,header=False)
+        except UnitError as error:
+            self.assertEqual(str(error),'Row 3 has no column 1','convertStream rows error')
+        else:
+            self.fail('convertStream rows error')
+        self.assertRaises(UnitError,convertStream,self.StringIO('a [s],b\n1,2\n'),self.StringIO(),{2:'min'},{2:'s'})
+        self.assertRaises(UnitError,convertStream,self.StringIO('1,2\n'),self.StringIO(),{2:'min'},{2:'s'},header=False)
+        output=self.StringIO()
+        self.assertEqual(convertStream(self.StringIO(''),output,{2:'min'},{2:'s'},header=False)['rows'],0,'convertStream rows error')
+def __testSuite():
+    streamSuite = unittest.TestLoader().loadTestsFromTestCase(__StreamTestCase)
+    return unittest.TestSuite([streamSuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+if  __name__=='__main__':
+    runTests()
@@ -0,0 +1,75 @@
+__doc__="""testTable.py
+
+Tests of table.py.
+"""
+import unittest
+from ..table import formatTable,writeTable
+from ..units import Unit,UnitError
+_specs={'time':'>6.1f','speed':'>8.3f km/hrA','temperature':'>7.2f degF','length':'>9.2f m a'}
+def _columns():
+    return [('time',[0.0,1.5,3.0]),('speed',[Unit(1,'m/s'),Unit(2,'m/s'),Unit(3.5,'m/s')]),
+            ('temperature',[Unit(0,'degC'),Unit(10,'degC'),Unit(100,'degC')]),
+            ('length',[Unit(1,'m'),Unit(1,'ft'),Unit(2,'km')])]
+class _Output(object):
+    def __init__(self):
+        self.parts=[]
+    def write(self,text):
+        self.parts.append(text)
+class __TableTestCase(unittest.TestCase):
+    def test_cells(self):
+        #Every cell matches Unit.__format__ of the same value and spec
+        columns=_columns()
+        lines=formatTable(columns,_specs,{'time':'s'},header=False).splitlines()
+        for row,line in enumerate(lines):
+            cells=[format(Unit(values[row],'s') if name=='time' else values[row],_specs[name]) for name,values in columns]
+            self.assertEqual(line,' '.join(cells),'cells error')
+        self.assertEqual(len(lines),3,'cells error')
+    def test_format(self):
+        #writeTable does the same arithmetic as Unit.__format__, including signed zeros and affine units
+        values=[Unit(-0.0,'m'),Unit(0.0,'m'),Unit(-1.5,'ft'),Unit(-0.0,'degC'),Unit(-17.5,'degC'),Unit(1e-300,'km')]
+        for spec in ['f','>10.3f','>8.2f ft','>8.2f degF','>1.1e KA','g']:
+            try:
+                cells=[format(value,spec) for value in values]
+            except UnitError:
+                continue
+            lines=formatTable([('x',values)],{'x':spec},header=False).splitlines()
+            self.assertEqual(lines,cells,'format error '+spec)
+        self.assertEqual(formatTable([('x',[Unit(-0.0,'m')])],{'x':'f'},header=False),'-0.000000m\n','format error')
+    def test_text(self):
+        lines=formatTable(_columns(),_specs,{'time':'s'}).splitlines()
+        self.assertEqual(lines[0],'   time speed [km/hr]  temperature      length','text error')
+        self.assertEqual(lines[1],'   0.0s    3.600   32.00 degF      1.00 m','text error')
+        self.assertEqual(lines[3],'   3.0s   12.600  212.00 degF   2000.00 m','text error')
+    def test_csv(self):
+        lines=formatTable(_columns(),{'speed':'>1.3f km/hrA','length':'g ftA'},{'time':'s'},style='csv').splitlines()
+        self.assertEqual(lines[0],'time,speed [km/hr],temperature,length [ft]','csv error')
+        self.assertEqual(lines[1],'0.0s,3.600,0.0degC,3.28084','csv error')
+    def test_markdown(self):
+        lines=formatTable([('a|b',[1.0,2.0]),('c',[Unit(1,'m'),Unit(2,'m')])],{'a|b':'<4.1f','c':'^6.1f cm A'},
+                          style='markdown').splitlines()
+        self.assertEqual(lines[0],'| a\\|b | c [cm] |','markdown error')
+        self.assertEqual(lines[1],'|:---|:---:|','markdown error')
+        self.assertEqual(lines[2],'| 1.0  | 100.0  |','markdown error')
+    def test_stream(self):
+        #Columns may be iterators, written chunkSize rows at a time
+        output=_Output()
+        result=writeTable(output,[('x',(Unit(i,'ft') for i in range(25))),('y',iter(range(25)))],{'x':'>1.1f mA'},
+                          {'y':'s'},chunkSize=10)
+        self.assertEqual(result['rows'],25,'stream error')
+        self.assertEqual(len(output.parts),4,'stream error')
+        self.assertEqual(''.join(output.parts).splitlines()[25],'7.3 24.0s','stream error')
+    def test_mixed(self):
+        lines=formatTable([('x',[Unit(1,'m'),Unit(1,'ft'),2.0])],{'x':'>1.2f cm a'},header=False).splitlines()
+        self.assertEqual(lines,['100.00 cm','30.48 cm','2.00'],'mixed error')
+    def test_errors(self):
+        self.assertRaises(UnitError,formatTable,_columns(),_specs,style='html')
+        self.assertRaises(UnitError,formatTable,[('x',[1.0,2.0]),('y',[1.0])])
+        self.assertRaises(UnitError,formatTable,[('x',[Unit(1,'m')])],{'x':'>1.1f s'})
+def __testSuite():
+    tableSuite = unittest.TestLoader().loadTestsFromTestCase(__TableTestCase)
+    return unittest.TestSuite([tableSuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+if  __name__=='__main__':
+    runTests()
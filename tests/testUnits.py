@@ -0,0 +1,794 @@
+__doc__="""testUnits.py
+
+Tests of units.py.
+"""
+import sys
+import threading
+import unittest
+from array import array
+from ..units import DimensionError,Unit,UnitCache,UnitError,UnitRegistry,_arrayToBytes,_bytesToArray,convertMany,defineCompoundUnit,definePrefix,defineUnit,divideDimensions,formatExpression,invertDimensions,invertExpression,multiplyDimensions,parseExpression,prewarm,unitsFromDescriptors,useRegistry
+def _copyRegistry(registry):
+    #Defining units never changes the dictionaries of a registry, so the copy can share them
+    return UnitRegistry(registry.dimensions,registry.units,registry.compoundUnits,registry.prefixes)
+class __UnitTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__setattr__('unit',Unit(1))
+    def tearDown(self):
+        self.__delattr__('unit')
+    def test_setunits(self):
+        self.unit.setUnits('kg/m**3')
+        self.assertEqual(self.unit.units,'kg/m**3')
+    def test_getUnit(self):
+        self.assertEqual(self.unit.getUnit('m'),({'SIVAL':1.0,'TYPE':'Length'},1.0),'getUnit error: '+str(self.unit.getUnit('m')))
+        self.assertEqual(self.unit.getUnit('km'),({'SIVAL':1.0,'TYPE':'Length'},1000.0),'getUnit error: '+str(self.unit.getUnit('km')))
+        self.assertEqual(self.unit.getUnit('g'),({'SIVAL':0.001,'TYPE':'Mass'},1.0),'getUnit error: '+str(self.unit.getUnit('g')))
+        self.assertEqual(self.unit.getUnit('kg'),({'SIVAL':1.0,'TYPE':'Mass'},1.0),'getUnit error: '+str(self.unit.getUnit('kg')))
+        self.assertEqual(self.unit.getUnit('s'),({'SIVAL':1.0,'TYPE':'Time'},1.0),'getUnit error: '+str(self.unit.getUnit('s')))
+        self.assertEqual(self.unit.getUnit('min'),({'SIVAL':60.0,'TYPE':'Time'},1.0),'getUnit error: '+str(self.unit.getUnit('min')))
+        self.assertEqual(self.unit.getUnit('hr'),({'SIVAL':3600.0,'TYPE':'Time'},1.0),'getUnit error: '+str(self.unit.getUnit('hr')))
+        self.assertEqual(self.unit.getUnit('miles'),({'SIVAL':1609.344,'TYPE':'Length'},1.0),'getUnit error: '+str(self.unit.getUnit('miles')))
+        self.assertEqual(self.unit.getUnit('lb'),({'SIVAL':2.2046226,'TYPE':'Mass'},1.0),'getUnit error: '+str(self.unit.getUnit('lb')))
+        self.assertEqual(self.unit.getUnit('Gs'),({'SIVAL':1.0,'TYPE':'Time'},1000000000.0),'getUnit error: '+str(self.unit.getUnit('Gs')))
+        self.assertEqual(self.unit.getUnit('ft'),({'SIVAL':0.3048,'TYPE':'Length'},1.0),'getUnit error: '+str(self.unit.getUnit('ft')))
+        self.assertEqual(self.unit.getUnit('MC'),({'SIVAL':1.0,'TYPE':'Charge'},1000000.0),'getUnit error: '+str(self.unit.getUnit('MC')))
+    def test_isCompound(self):
+        self.assertTrue(self.unit.isCompound('J'),'isCompound error: '+str(self.unit.isCompound('J')))
+        self.assertFalse(self.unit.isCompound('m'),'isCompound error: '+str(self.unit.isCompound('m')))
+        self.assertTrue(self.unit.isCompound('N'),'isCompound error: '+str(self.unit.isCompound('N')))
+        self.assertTrue(self.unit.isCompound('A'),'isCompound error: '+str(self.unit.isCompound('A')))
+        self.assertTrue(self.unit.isCompound('A'),'isCompound error: '+str(self.unit.isCompound('A')))
+        self.assertTrue(self.unit.isCompound('V'),'isCompound error: '+str(self.unit.isCompound('V')))
+        self.assertTrue(self.unit.isCompound('Ohm'),'isCompound error: '+str(self.unit.isCompound('Ohm')))
+        self.assertFalse(self.unit.isCompound('C'),'isCompound error: '+str(self.unit.isCompound('C')))
+        self.assertFalse(self.unit.isCompound('g'),'isCompound error: '+str(self.unit.isCompound('g')))
+        self.assertFalse(self.unit.isCompound('ft'),'isCompound error: '+str(self.unit.isCompound('ft')))
+        self.assertFalse(self.unit.isCompound('lb'),'isCompound error: '+str(self.unit.isCompound('lb')))
+        self.assertFalse(self.unit.isCompound('s'),'isCompound error: '+str(self.unit.isCompound('s')))
+        self.assertFalse(self.unit.isCompound('min'),'isCompound error: '+str(self.unit.isCompound('min')))
+        self.assertFalse(self.unit.isCompound('hr'),'isCompound error: '+str(self.unit.isCompound('hr')))
+        self.assertFalse(self.unit.isCompound('miles'),'isCompound error: '+str(self.unit.isCompound('miles')))
+    def test_resolveUnit(self):
+        self.assertEqual(self.unit.resolveUnit('km'),((1,0,0,0,0),1000.0),'resolveUnit error')
+        self.assertEqual(self.unit.resolveUnit('min'),((0,0,1,0,0),60.0),'resolveUnit error')
+        self.assertEqual(self.unit.resolveUnit('kN'),((1,1,-2,0,0),1000.0),'resolveUnit error')
+        self.assertRaises(UnitError,self.unit.resolveUnit,'xyz')
+    def test_defineUnit(self):
+        self.assertRaises(UnitError,Unit,1,'yd')
+        saved=Unit.registry
+        useRegistry(_copyRegistry(saved))
+        try:
+            defineUnit('yd',0.9144,'Length')
+            self.assertAlmostEqual(Unit(1,'kyd').convertValue('ft'),3000.0,9,'defineUnit error')
+        finally:
+            useRegistry(saved)
+        self.assertRaises(UnitError,Unit,1,'yd')
+    def test_defineCompoundUnit(self):
+        self.assertRaises(UnitError,Unit,1,'W')
+        saved=Unit.registry
+        useRegistry(_copyRegistry(saved))
+        try:
+            defineCompoundUnit('W',1,'J/s')
+            self.assertEqual(Unit(1,'kW').convertValue('J/s'),1000.0,'defineCompoundUnit error')
+            self.assertAlmostEqual(Unit(1,'kW*hr').convertValue('J'),3600000.0,6,'defineCompoundUnit error')
+            self.assertEqual(Unit(1,'W').dimensions,Unit(1,'N*m/s').dimensions,'defineCompoundUnit error')
+            self.assertRaises(UnitError,Unit(1,'W').convert,'J')
+        finally:
+            useRegistry(saved)
+        self.assertRaises(UnitError,Unit,1,'W')
+    def test_getCompoundUnit(self):
+        self.assertEqual(self.unit.getCompoundUnit({},1,'J'),({'Mass':1,'Length':2,'Time':-2},1),'getCompoundUnit error: '+str(self.unit.getCompoundUnit({},1,'J')))
+        self.assertEqual(self.unit.getCompoundUnit({},1,'A'),({'Charge':1,'Time':-1},1),'getCompoundUnit error: '+str(self.unit.getCompoundUnit({},1,'A')))
+        self.assertEqual(self.unit.getCompoundUnit({},1,'V'),({'Length': 2, 'Mass': 1, 'Charge': -1, 'Time': -2},1),'getCompoundUnit error: '+str(self.unit.getCompoundUnit({},1,'V')))
+        self.assertEqual(self.unit.getCompoundUnit({},1,'Ohm'),({'Length': 2, 'Mass': 1, 'Charge': -2, 'Time': -1},1),'getCompoundUnit error: '+str(self.unit.getCompoundUnit({},1,'Ohm')))
+        self.assertEqual(self.unit.getCompoundUnit({},1,'N'),({'Mass':1,'Length':1,'Time':-2},1),'getCompoundUnit error: '+str(self.unit.getCompoundUnit({},1,'N')))
+        self.assertEqual(self.unit.getCompoundUnit({},1,'kN'),({'Mass':1,'Length':1,'Time':-2},1000.0),'getCompoundUnit error: '+str(self.unit.getCompoundUnit({},1,'kN')))
+    def test_unitParse(self):
+        self.assertEqual(self.unit.unitParse(['kJ','km']),({'Mass':1,'Length':3,'Time':-2},1000000),'unitParse error: '+str(self.unit.unitParse(['kJ','km'])))
+        self.assertEqual(self.unit.unitParse(['kg','m']),({'Mass':1,'Length':1},1),'unitParse error: '+str(self.unit.unitParse(['kg','m'])))
+        self.assertEqual(self.unit.unitParse(['Gs','ft']),({'Length':1,'Time':1},304800000.0),'unitParse error: '+str(self.unit.unitParse(['Gs','ft'])))
+    def test_compileUnits(self):
+        for units in ['kg*m/s**2','(kg*m)/(s^2)','kg m s**-2','kg*m^2/s**2*m']:
+            descriptor=self.unit.compileUnits(units)
+            self.assertEqual(descriptor.dimensions,(1,1,-2,0,0),'compileUnits error: '+units)
+            self.assertEqual(descriptor.scaling,1,'compileUnits error: '+units)
+        self.assertAlmostEqual(self.unit.compileUnits('ft/min').scaling,0.3048/60,12,'compileUnits error')
+        self.assertAlmostEqual(self.unit.compileUnits('(ft/min)**2').scaling,(0.3048/60)**2,12,'compileUnits error')
+        self.assertEqual(self.unit.compileUnits('m**(1/2)').dimensions,(0.5,0,0,0,0),'compileUnits error')
+        for units in ['m*','xyz/s','m/(s']:
+            self.assertRaises(UnitError,self.unit.compileUnits,units)
+    def test_parseUnits(self):
+        Unit.parseCache.clear()
+        self.assertEqual(self.unit.parseUnits('kg/m**3'),((-3,1,0,0,0),1),'parseUnits error: '+str(self.unit.parseUnits('kg/m**3')))
+        self.assertEqual(Unit.parseCache.misses,1,'parseUnits cache error')
+        self.assertEqual(Unit.parseCache.hits,1,'parseUnits cache error')
+        self.assertEqual(self.unit.parseUnits('kJ'),((2,1,-2,0,0),1000.0),'parseUnits error: '+str(self.unit.parseUnits('kJ')))
+    def test_getDescriptor(self):
+        descriptor=self.unit.getDescriptor('kJ')
+        self.assertTrue(descriptor is self.unit.getDescriptor('kJ'),'getDescriptor error')
+        self.assertEqual((descriptor.units,descriptor.terms,descriptor.dimensions,descriptor.scaling),('kJ',(('kJ',1),),(2,1,-2,0,0),1000.0),'getDescriptor error')
+    def test___slots__(self):
+        self.assertFalse(hasattr(self.unit,'__dict__'),'slots error')
+        self.assertTrue(Unit(1,'m/s')._descriptor is Unit(2,'m/s')._descriptor,'slots error')
+    def test___reduce__(self):
+        import pickle
+        self.unit.setUnits('m/s')
+        for protocol in range(pickle.HIGHEST_PROTOCOL+1):
+            unit=pickle.loads(pickle.dumps(self.unit,protocol))
+            self.assertEqual((float(unit),unit.units),(1.0,'m/s'),'pickle error')
+    def test_parseExpression(self):
+        self.assertEqual(parseExpression('kg*m**2/s*C**2'),(('kg',1),('m',2),('s',-1),('C',-2)),'parseExpression error')
+        self.assertEqual(parseExpression('kg/m/s'),(('kg',1),('m',-1),('s',1)),'parseExpression error')
+        self.assertEqual(parseExpression('kg/(m/s)'),(('kg',1),('m',-1),('s',1)),'parseExpression error')
+        self.assertEqual(parseExpression('(kg*m)/(s^2)'),(('kg',1),('m',1),('s',-2)),'parseExpression error')
+        self.assertEqual(parseExpression('kg m s**-2'),(('kg',1),('m',1),('s',-2)),'parseExpression error')
+        self.assertEqual(parseExpression('(m/s)**2'),(('m',2),('s',-2)),'parseExpression error')
+        self.assertEqual(parseExpression('m**(1/2)*m^0.5'),(('m',1),),'parseExpression error')
+        self.assertEqual(parseExpression('m**(-3/2)'),(('m',-1.5),),'parseExpression error')
+        self.assertEqual(parseExpression('1/s'),(('s',-1),),'parseExpression error')
+        self.assertEqual(parseExpression('m*s/m'),(('s',1),),'parseExpression error')
+        self.assertEqual(parseExpression('m**0*s'),(('s',1),),'parseExpression error')
+        for units in ['','m/','(m','m**','m**s','2*m','m)','m$','*m','m**2**2']:
+            self.assertRaises(UnitError,parseExpression,units)
+    def test_formatExpression(self):
+        self.assertEqual(formatExpression((('kg',1),('m',1),('s',-2))),'kg*m/s**2','formatExpression error')
+        self.assertEqual(formatExpression((('m',-1),('s',-1))),'m**-1*s**-1','formatExpression error')
+        self.assertEqual(formatExpression(invertExpression((('m',1),('s',-1)))),'s/m','formatExpression error')
+    def test_combine(self):
+        self.assertEqual(self.unit.combine([{'Mass':1,'Length':4,'Time':-2},1000],[{'Mass':1,'Length':2},1000]),({'Mass':0,'Length':2,'Time':-2},1),'unitParse error: '+str(self.unit.combine([{'Mass':1,'Length':4,'Time':-2},1000],[{'Mass':1,'Length':2},1000])))
+        self.assertEqual(self.unit.combine([{'Mass':3,'Length':4,'Time':-2},1000],[{'Mass':1,'Length':2},1000]),({'Mass':2,'Length':2,'Time':-2},1),'unitParse error: '+str(self.unit.combine([{'Mass':3,'Length':4,'Time':-2},1000],[{'Mass':1,'Length':2},1000])))
+    def test_dimensionVector(self):
+        self.assertEqual(self.unit.dimensionVector({'Mass':1,'Length':2,'Time':-2}),(2,1,-2,0,0),'dimensionVector error')
+        self.assertEqual(self.unit.dimensionVector({}),(0,0,0,0,0),'dimensionVector error')
+        self.assertRaises(UnitError,self.unit.dimensionVector,{'Colour':1})
+    def test_dimensionOrder(self):
+        self.assertEqual(self.unit.dimensionOrder((2,1,-2,0,0)),{'Mass':1,'Length':2,'Time':-2},'dimensionOrder error')
+        self.assertEqual(self.unit.dimensionOrder((0,0,0,0,0)),{},'dimensionOrder error')
+    def test_order(self):
+        self.assertEqual(self.unit.order,False,'order error')
+        self.unit.setUnits('kg/m**3')
+        self.assertEqual(self.unit.order,{'Mass':1,'Length':-3},'order error')
+        self.assertEqual(self.unit.dimensions,(-3,1,0,0,0),'order error')
+    def test_multiplyDimensions(self):
+        self.assertEqual(multiplyDimensions((1,0,-1,0,0),(0,1,0,0,0)),(1,1,-1,0,0),'multiplyDimensions error')
+        self.assertEqual(divideDimensions((1,0,-1,0,0),(1,0,-1,0,0)),(0,0,0,0,0),'divideDimensions error')
+        self.assertEqual(invertDimensions((1,0,-1,0,0)),(-1,0,1,0,0),'invertDimensions error')
+    def test_compare(self):
+        self.assertFalse(self.unit.compare({'Mass':12,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2}),'compare error: '+str(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2})))
+        self.assertFalse(self.unit.compare({'Mass':12,'Length':4,'Time':-2},{'Mass':1,'Time':-2}),'compare error: '+str(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2})))
+        self.assertFalse(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':14,'Time':-2}),'compare error: '+str(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2})))
+        self.assertFalse(self.unit.compare({'Mass':1,'Length':4,'Time':2},{'Mass':1,'Length':4,'Time':-2}),'compare error: '+str(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2})))
+        self.assertTrue(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2}),'compare error: '+str(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2})))
+    def test_unitCompare(self):
+        self.unit.setUnits('m')
+        self.assertAlmostEqual(self.unit.unitCompare('ft'),3.28083989501,7,'unitCompare error: '+str(self.unit.unitCompare('ft')))
+        self.unit.setUnits('miles')
+        self.assertEqual(self.unit.unitCompare('m'),1609.344,'unitCompare error: '+str(self.unit.unitCompare('m')))
+        self.unit.setUnits('m')
+        self.assertEqual(self.unit.unitCompare('km'),0.001,'unitCompare error: '+str(self.unit.unitCompare('km')))
+    def test_convert(self):
+        self.unit=Unit(123)
+        self.unit.setUnits('miles')
+        self.assertEqual(self.unit.convert('m'),1609.344*123,'unitCompare error: '+str(self.unit.convert('m')))
+    def test_conversionFactor(self):
+        Unit.conversionCache.clear()
+        self.assertEqual(self.unit.conversionFactor('miles','m'),1609.344,'conversionFactor error')
+        self.assertEqual(self.unit.conversionFactor('miles','m'),1609.344,'conversionFactor error')
+        self.assertEqual((Unit.conversionCache.hits,Unit.conversionCache.misses),(1,1),'conversionFactor cache error')
+        for i in range(2):
+            try:
+                self.unit.conversionFactor('m','s')
+                self.assertTrue(False,'conversionFactor error')
+            except Exception as e:
+                self.assertTrue(isinstance(e,UnitError),'conversionFactor error')
+        self.assertTrue(('m','s') in Unit.conversionCache,'conversionFactor cache error')
+    def test_DimensionError(self):
+        #Dimension mismatches raise a DimensionError, which is a UnitError, from arithmetic, comparison and conversion
+        self.unit.setUnits('m')
+        for operator in ('__add__','__sub__','__mod__','__divmod__','__ge__','__gt__','__le__','__lt__'):
+            self.assertRaises(DimensionError,getattr(self.unit,operator),Unit(1,'s'))
+        self.assertRaises(DimensionError,self.unit.__rmod__,9)
+        self.assertRaises(DimensionError,self.unit.convert,'s')
+        for i in range(2):
+            #The second call re-raises the error cached by the first
+            self.assertRaises(DimensionError,self.unit.conversionFactor,'m','kg')
+        self.assertRaises(DimensionError,Unit(20,'degC').convert,'m')
+        #Other UnitErrors are not DimensionErrors
+        for function,args in ((Unit,(1,'xyz')),(Unit(20,'degC').__add__,(Unit(20,'degC'),))):
+            try:
+                function(*args)
+                self.assertTrue(False,'DimensionError error')
+            except UnitError as e:
+                self.assertFalse(isinstance(e,DimensionError),'DimensionError error')
+    def test_convertValue(self):
+        self.assertEqual(self.unit.convertValue('m'),1.0,'convertValue error')
+        self.unit.setUnits('km')
+        value=self.unit.convertValue('m')
+        self.assertEqual(value,1000.0,'convertValue error')
+        self.assertEqual(type(value),float,'convertValue error')
+    def test_prewarm(self):
+        Unit.conversionCache.clear()
+        prewarm([('ft','m'),('m','s')])
+        self.assertTrue(('ft','m') in Unit.conversionCache,'prewarm error')
+        self.assertTrue(('m','s') in Unit.conversionCache,'prewarm error')
+    def test_unitsFromDescriptors(self):
+        descriptor=self.unit.getDescriptor('km')
+        result=unitsFromDescriptors([1.0,2.5],[descriptor,Unit._noUnits])
+        self.assertEqual([type(value) for value in result],[Unit,Unit],'unitsFromDescriptors error')
+        self.assertEqual(result[0],Unit(1,'km'),'unitsFromDescriptors error')
+        self.assertTrue(result[0]._descriptor is descriptor,'unitsFromDescriptors error')
+        self.assertEqual((float(result[1]),result[1].units),(2.5,False),'unitsFromDescriptors error')
+    def test_convertMany(self):
+        self.assertEqual(convertMany([1,2.0],'ft','m'),[0.3048,0.6096],'convertMany error')
+        self.assertEqual(convertMany((1.0,),'km','m'),(1000.0,),'convertMany error')
+        self.assertEqual(convertMany(iter([1.0]),'km','m'),[1000.0],'convertMany error')
+        result=convertMany(array('d',[1.0,2.0]),'km','m')
+        self.assertEqual(result,array('d',[1000.0,2000.0]),'convertMany error')
+        result=convertMany(bytearray(_arrayToBytes(array('d',[1.0,2.0]))),'km','m')
+        self.assertEqual(type(result),bytearray,'convertMany error')
+        self.assertEqual(_bytesToArray(result),array('d',[1000.0,2000.0]),'convertMany error')
+        self.assertEqual(_bytesToArray(convertMany(memoryview(_arrayToBytes(array('d',[1.0]))),'km','m').tobytes()),array('d',[1000.0]),'convertMany error')
+        self.assertRaises(UnitError,convertMany,[1.0],'m','s')
+    def test_canonicalUnits(self):
+        self.assertEqual(self.unit.canonicalUnits('m*s*m*s'),'m**2*s**2','canonicalUnits error')
+        self.assertEqual(self.unit.canonicalUnits('N*m'),'kg*m**2/s**2','canonicalUnits error')
+        self.assertEqual(self.unit.canonicalUnits('N*m',True),'J','canonicalUnits error')
+        self.assertEqual(self.unit.canonicalUnits('kg*m/s**2',True),'N','canonicalUnits error')
+        self.assertEqual(self.unit.canonicalUnits('km*hr/km**2'),'hr/km','canonicalUnits error')
+        self.assertEqual(self.unit.canonicalUnits('m/m'),False,'canonicalUnits error')
+        self.assertEqual(self.unit.canonicalUnits(False),False,'canonicalUnits error')
+        self.assertTrue(self.unit.canonicalUnits('s*m*kg/s**4') is self.unit.canonicalUnits('N/s'),'canonicalUnits error')
+    def test_productUnits(self):
+        self.assertEqual(self.unit.productUnits('m','s'),('m*s',1.0),'productUnits error')
+        self.assertEqual(self.unit.productUnits('km','s',True),('km/s',1.0),'productUnits error')
+        self.assertEqual(self.unit.productUnits('m/s','s*m'),('m**2',1.0),'productUnits error')
+        result=Unit(2,'m')
+        for i in range(3):
+            result=result*Unit(3,'s')*Unit(1,'m')
+        self.assertEqual(result.units,'m**4*s**3','productUnits error')
+        self.assertEqual(Unit(6,'N')/Unit(2,'m/s**2'),Unit(3,'kg'),'productUnits error')
+        try:
+            Unit.canonicalNames=True
+            self.assertEqual((Unit(2,'N')*Unit(3,'m')).units,'J','productUnits error')
+        finally:
+            Unit.canonicalNames=False
+    def test__otherValue(self):
+        first=Unit(2,'m/s')
+        second=Unit(1,'m/s')
+        self.assertTrue(first._otherValue(second) is second,'otherValue error')
+        self.assertTrue(first._otherValue(Unit(1)) is not None,'otherValue error')
+        self.assertAlmostEqual(first._otherValue(Unit(1,'km/hr')),1/3.6,12,'otherValue error')
+        self.assertRaises(UnitError,first._otherValue,Unit(1,'s'))
+        self.assertTrue((first+second)._descriptor is first._descriptor,'otherValue error')
+        self.assertTrue((first*2)._descriptor is first._descriptor,'otherValue error')
+        self.assertTrue(first.__add__('m') is NotImplemented,'otherValue error')
+    def test___repr__(self):
+        self.assertEqual(repr(self.unit),'1.0','repr test error')
+        self.unit.setUnits('m')
+        self.assertEqual(repr(self.unit),'1.0 m','repr test error '+repr(self.unit))
+    def test___eq__(self):
+        self.assertTrue(self.unit==1,'Equality test error')
+        self.assertFalse(self.unit==2,'Equality test error')
+        self.unit.setUnits('m')
+        self.assertTrue(self.unit==Unit(1,'m'),'Equality test error')
+        self.assertFalse(self.unit==Unit(1,'km'),'Equality test error')
+        self.assertFalse(self.unit==Unit(1,'s'),'Equality test error')
+        self.assertTrue(self.unit==Unit(0.001,'km'),'Equality test error')
+    def test___ne_(self):
+        self.assertFalse(self.unit!=1,'Equality test error')
+        self.assertTrue(self.unit!=2,'Equality test error')
+        self.unit.setUnits('m')
+        self.assertFalse(self.unit!=Unit(1,'m'),'Equality test error')
+        self.assertTrue(self.unit!=Unit(1,'km'),'Equality test error')
+        self.assertTrue(self.unit!=Unit(1,'s'),'Equality test error')
+        self.assertFalse(self.unit!=Unit(0.001,'km'),'Equality test error')
+    def test___add__(self):
+        self.assertEqual(self.unit+1,2,'Add test error')
+        self.assertEqual(self.unit+Unit(2,'m'),Unit(3,'m'),'Add test error')
+        self.unit.setUnits('m')
+        try:
+            self.unit+Unit(1,'s')
+            self.assertTrue(False,'Add test error')
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'Add test error')
+        self.assertAlmostEqual(self.unit+Unit(1,'km'),1001,12,'Add test error '+str(self.unit+Unit(1,'km')))
+        self.assertAlmostEqual(self.unit+Unit(1,'km'),Unit(1.001,'km'),12,'Add test error'+ str(self.unit+Unit(1,'km')))
+    def test___sub__(self):
+        self.assertEqual(self.unit-2,-1,'Sub test error')
+        self.assertEqual(self.unit-Unit(2,'m'),Unit(-1,'m'),'Sub test error')
+        self.unit.setUnits('m')
+        try:
+            self.unit-Unit(1,'s')
+            self.assertTrue(False,'Sub test error')
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'Sub test error')
+        self.assertAlmostEqual(self.unit-Unit(+1,'km'),-999,12,'Sub test error '+str(self.unit-Unit(1,'km')))
+        self.assertAlmostEqual(self.unit-Unit(1,'km'),Unit(-0.999,'km'),12,'Sub test error'+ str(self.unit-Unit(1,'km')))
+    def test___mul__(self):
+        self.assertEqual(self.unit*2,2,'Mul test error')
+        self.assertEqual(self.unit*Unit(2,'m'),Unit(2,'m'),'Mul test error')
+        self.unit.setUnits('m')
+        self.assertEqual(self.unit*Unit(1,'s'),1,'Mul test error')
+        self.assertEqual(self.unit*Unit(1,'s'),Unit(1,'m*s'),'Mul test error')
+        self.assertAlmostEqual(self.unit*Unit(+1,'km'),1000,12,'Mul test error')
+        self.assertAlmostEqual(self.unit*Unit(1,'km'),Unit(1,'km'),12,'Mul test error')
+    def test___div__(self):
+        self.unit+=3
+        self.assertEqual(self.unit/2,2,'Div test error'+str(self.unit/2))
+        self.assertEqual(self.unit/Unit(2,'m'),Unit(2),'Div test error')
+        self.unit.setUnits('m')
+        self.assertEqual(self.unit/Unit(1,'s'),4,'Div test error')
+        self.assertEqual(self.unit/Unit(1,'s'),Unit(4,'m/s'),'Div test error')
+        self.assertAlmostEqual(self.unit/Unit(+4,'km'),0.001,12,'Div test error')
+        self.assertAlmostEqual(self.unit/Unit(4,'km'),Unit(0.000001,'km'),12,'Div test error')
+    def test___truediv__(self):
+        self.unit+=3
+        self.assertEqual(self.unit.__truediv__(2),2,'truediv test error'+str(self.unit.__truediv__(2)))
+        self.assertEqual(self.unit.__truediv__(Unit(2,'m')),Unit(2),'truediv test error')
+        self.unit.setUnits('m')
+        self.assertEqual(self.unit.__truediv__(Unit(1,'s')),4,'truediv test error')
+    def test___mod__(self):
+        self.unit+=4
+        self.assertEqual(self.unit%2,1,'Mod test error')
+        try:
+            self.unit%Unit(2,'m')
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'Mod test error')
+        self.unit.setUnits('m')
+        self.assertEqual(self.unit%(Unit(2,'m')),1,'Mod test error')
+        try:
+            self.unit%Unit(2,'s')
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'Mod test error')
+    def test___pow__(self):
+        self.unit+=3
+        self.assertEqual(self.unit**2,16,'Pow test error')
+        try:
+            self.unit**Unit(2,'m')
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertEqual(type(e),UnitError,'Pow test error')
+        self.unit.setUnits('m')
+        self.assertEqual(self.unit**(Unit(2)),16,'Pow test error')
+        try:
+            self.unit%Unit(2,'s')
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'Pow test error')
+    def test___divmod__(self):
+        self.unit+=4
+        self.assertEqual(divmod(self.unit,2),(2,1),'divmod test error')
+        try:
+            divmod(self.unit,Unit(2,'m'))
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'divmod test error')
+        self.unit.setUnits('m')
+        self.assertEqual(divmod(self.unit,Unit(2,'m')),(2,1),'divmod test error')
+        try:
+            divmod(self.unit,Unit(2,'s'))
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'divmod test error')
+    def test___radd__(self):
+        self.assertEqual(1+self.unit,2,'radd test error')
+        self.assertEqual(2+self.unit,Unit(3),'radd test error')
+        self.unit.setUnits('m')
+        self.assertEqual(2+self.unit,Unit(3,'m'),'radd test error')
+    def test___rsub__(self):
+        self.assertEqual(3-self.unit,2,'rsub test error')
+        self.assertEqual(4-self.unit,Unit(3),'rsub test error')
+        self.unit.setUnits('m')
+        self.assertEqual(4-self.unit,Unit(3,'m'),'rsub test error')
+    def test___rmul__(self):
+        self.assertEqual(3*self.unit,3,'rmul test error')
+        self.assertEqual(4*self.unit,Unit(4),'rmul test error')
+        self.unit.setUnits('m')
+        self.assertEqual(4*self.unit,Unit(4,'m'),'rmul test error')
+    def test___rdiv__(self):
+        self.assertEqual(3/self.unit,3,'rdiv test error')
+        self.assertEqual(4/self.unit,Unit(4),'rdiv test error')
+        self.unit.setUnits('m')
+        self.assertEqual(4/self.unit,Unit(4,'m**-1'),'rdiv test error')
+        self.unit+=3
+        self.assertEqual(4/self.unit,Unit(1,'m**-1'),'rdiv test error')
+    def test___rtruediv__(self):
+        self.assertEqual(self.unit.__rtruediv__(3),3,'rtruediv test error')
+        self.assertEqual(self.unit.__rtruediv__(4),Unit(4),'rtruediv test error')
+        self.unit.setUnits('m')
+        self.assertEqual(self.unit.__rtruediv__(4),Unit(4,'m**-1'),'rtruediv test error')
+        self.unit+=3
+        self.assertEqual(self.unit.__rtruediv__(4),Unit(1,'m**-1'),'rtruediv test error')
+    def test___rmod__(self):
+        self.unit+=4
+        self.assertEqual(9%self.unit,4,'rmod test error')
+        self.unit.setUnits('m')
+        try:
+            9%self.unit
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'rmod test error')
+    def test___rpow__(self):
+        self.unit+=1
+        self.assertEqual(4**self.unit,16,'rpow test error')
+        self.unit.setUnits('m')
+        try:
+            4**self.unit
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertEqual(type(e),UnitError,'rpow test error')
+    def test___rdivmod__(self):
+        self.unit+=4
+        self.assertEqual(divmod(9,self.unit),(1,4),'rdivmod test error')
+        self.unit.setUnits('m')
+        try:
+            divmod(9,self.unit)
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'rdivmod test error')
+    def test___ge__(self):
+        self.assertTrue(4>=self.unit,'ge error')
+        self.assertFalse(self.unit>=2,'ge error')
+        self.unit+=2
+        self.assertTrue(self.unit>=3,'ge error')
+        self.assertTrue(3>=self.unit,'ge error')
+        self.unit.setUnits('m')
+        self.assertTrue(self.unit>=3,'ge error')
+        self.assertTrue(3>=self.unit,'ge error')
+        self.assertTrue(self.unit>=Unit(3,'m'),'ge error')
+        try:
+            self.assertTrue(self.unit>=Unit(3,'s'),'ge error')
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'ge test error')
+    def test___gt__(self):
+        self.assertTrue(4>self.unit,'gt error')
+        self.assertFalse(self.unit>1,'gt error')
+        self.unit+=2
+        self.assertTrue(self.unit>2,'gt error')
+        self.assertTrue(4>self.unit,'gt error')
+        self.unit.setUnits('m')
+        self.assertTrue(self.unit>2,'gt error')
+        self.assertTrue(4>self.unit,'gt error')
+        self.assertTrue(self.unit>Unit(2,'m'),'gt error')
+        try:
+            self.assertTrue(self.unit>Unit(2,'s'),'gt error')
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'gt test error')
+    def test___le__(self):
+        self.assertTrue(1<=self.unit,'le error')
+        self.assertFalse(self.unit<=0,'le error')
+        self.unit+=2
+        self.assertTrue(self.unit<=3,'le error')
+        self.assertTrue(3<=self.unit,'le error')
+        self.unit.setUnits('m')
+        self.assertTrue(self.unit<=3,'le error')
+        self.assertTrue(2<self.unit,'le error')
+        self.assertTrue(self.unit<=Unit(4,'m'),'le error')
+        try:
+            self.assertTrue(self.unit<=Unit(4,'s'),'le error')
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'le test error')
+    def test___lt__(self):
+        self.assertTrue(0<self.unit,'lt error')
+        self.assertFalse(self.unit<0,'lt error')
+        self.unit+=2
+        self.assertTrue(self.unit<4,'lt error')
+        self.assertTrue(2<self.unit,'lt error')
+        self.unit.setUnits('m')
+        self.assertTrue(self.unit<4,'lt error')
+        self.assertTrue(2<self.unit,'lt error')
+        self.assertTrue(self.unit<Unit(4,'m'),'lt error')
+        try:
+            self.assertTrue(self.unit<Unit(4,'s'),'lt error')
+            self.assertTrue(False)
+        except Exception as e:
+            self.assertTrue(isinstance(e,UnitError),'lt test error')
+    def test___float__(self):
+        self.assertEqual(float(self.unit),1.0,'float error')
+        self.assertNotEqual(float(self.unit),2.0,'float error')
+    def test___abs__(self):
+        self.assertEqual(abs(self.unit),1.0,'abs error')
+        self.assertEqual(abs(-self.unit),1.0,'abs error')
+    def test_invert(self):
+        self.assertEqual(self.unit.invert(),Unit(1),'invert error')
+        self.unit+=1
+        self.assertEqual(self.unit.invert(),Unit(0.5),'invert error')
+        self.unit.setUnits('m')
+        self.assertEqual(self.unit.invert(),Unit(0.5,'m**-1'),'invert error')
+        self.unit.setUnits('m/s')
+        self.assertEqual(self.unit.invert(),Unit(0.5,'s/m'),'invert error')
+        self.unit.setUnits('m**2/s')
+        self.assertEqual(self.unit.invert().units,'s/m**2','invert error')
+    def test___format__(self):
+        self.assertEqual('{:>4.2f}'.format(self.unit),'1.00','format error')
+        self.unit.setUnits('m')
+        self.assertEqual('{:>4.2f}'.format(self.unit),'1.00m','format error')
+        self.unit.setUnits('m/s')
+        self.assertEqual('{:>4.2f}'.format(self.unit),'1.00m/s','format error')
+        self.assertEqual('{:>5.3f km/sa}'.format(self.unit),'0.001 km/s','format error')
+        self.assertEqual('{:>5.3f km/sA}'.format(self.unit),'0.001','format error')
+        self.assertEqual('{:>5.3f km/sA}'.format(Unit(2,'m/s')),'0.002','format error')
+        self.assertRaises(UnitError,'{:>5.3f kg}'.format,self.unit)
+    def test___format___signedZero(self):
+        self.assertEqual(format(Unit(-0.0,'m'),'>6.2f'),' -0.00m','format signed zero error')
+        self.assertEqual(format(Unit(-0.0,'m'),'>6.2f cm'),' -0.00 cm','format signed zero error')
+        self.assertEqual(format(Unit(-0.0,'m'),'>6.2f cmA'),' -0.00','format signed zero error')
+    def test_formatPlan(self):
+        self.assertEqual(self.unit.formatPlan('m','>4.2f'),(1.0,0.0,'>4.2f','m'),'formatPlan error')
+        self.assertEqual(self.unit.formatPlan('m','>4.2f_a'),(1.0,0.0,'>4.2f',' m'),'formatPlan error')
+        self.assertEqual(self.unit.formatPlan('m','>5.3f kmA'),(0.001,0.0,'>5.3f',''),'formatPlan error')
+        self.assertEqual(self.unit.formatPlan('m','>5.3f kma'),(0.001,0.0,'>5.3f',' km'),'formatPlan error')
+        self.assertEqual(self.unit.formatPlan(False,'>5.3f km'),(1.0,0.0,'>5.3f',''),'formatPlan error')
+        format(Unit(1,'ft'),'>4.1f m')
+        self.assertEqual(Unit.formatCache.get(('ft','>4.1f m')),(0.3048,0.0,'>4.1f',' m'),'formatPlan error')
+    def test_temperature(self):
+        self.assertAlmostEqual(Unit(20,'degC').convert('degF'),68.0,12,'temperature error')
+        self.assertEqual(Unit(20,'degC').convert('degF').units,'degF','temperature error')
+        self.assertAlmostEqual(Unit(68,'degF').convertValue('K'),293.15,12,'temperature error')
+        self.assertAlmostEqual(Unit(300,'K').convertValue('degC'),26.85,12,'temperature error')
+        self.assertAlmostEqual(Unit(491.67,'R').convertValue('degF'),32.0,12,'temperature error')
+        self.assertAlmostEqual(Unit(10,'delta_degC').convertValue('delta_degF'),18.0,12,'temperature error')
+        self.assertAlmostEqual(Unit(1000,'mK').convertValue('K'),1.0,12,'temperature error')
+        self.assertEqual(Unit(1,'Km').convertValue('m'),1000.0,'temperature error')
+        self.assertRaises(UnitError,Unit,1,'mdegC')
+        self.assertRaises(UnitError,Unit(20,'degC').convert,'m')
+        self.assertTrue(Unit(0,'degC')==Unit(273.15,'K'),'temperature error')
+        self.assertTrue(Unit(20,'degC')<Unit(300,'K'),'temperature error')
+        self.assertEqual('{:>5.1f degF}'.format(Unit(100,'degC')),'212.0 degF','temperature error')
+        self.assertEqual([round(value,12) for value in convertMany([0.0,100.0],'degC','degF')],[32.0,212.0],'temperature error')
+    def test_conversionTransform(self):
+        Unit.transformCache.clear()
+        factor,offset=self.unit.conversionTransform('degC','degF')
+        self.assertAlmostEqual(factor,1.8,12,'conversionTransform error')
+        self.assertAlmostEqual(offset,32.0,12,'conversionTransform error')
+        self.assertTrue(('degC','degF') in Unit.transformCache,'conversionTransform cache error')
+        self.assertEqual(self.unit.conversionTransform('km','m'),(1000.0,0.0),'conversionTransform error')
+        self.assertRaises(UnitError,self.unit.conversionTransform,'degC','s')
+    def test_temperature_arithmetic(self):
+        difference=Unit(30,'degC')-Unit(50,'degF')
+        self.assertAlmostEqual(difference,20.0,12,'temperature arithmetic error')
+        self.assertEqual(difference.units,'delta_degC','temperature arithmetic error')
+        total=Unit(20,'degC')+Unit(9,'delta_degF')
+        self.assertAlmostEqual(total,25.0,12,'temperature arithmetic error')
+        self.assertEqual(total.units,'degC','temperature arithmetic error')
+        self.assertEqual(Unit(20,'degC')-Unit(5,'K'),15.0,'temperature arithmetic error')
+        total=Unit(5,'K')+Unit(20,'degC')
+        self.assertEqual((float(total),total.units),(25.0,'degC'),'temperature arithmetic error')
+        self.assertEqual((Unit(20,'degC')+Unit(1)).units,'degC','temperature arithmetic error')
+        self.assertRaises(UnitError,Unit(20,'degC').__add__,Unit(20,'degC'))
+        self.assertRaises(UnitError,Unit(5,'K').__sub__,Unit(20,'degC'))
+        self.assertRaises(UnitError,Unit(20,'degC').__add__,Unit(1,'m'))
+class __UnitCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__setattr__('cache',UnitCache(2))
+    def tearDown(self):
+        self.__delattr__('cache')
+    def test_get(self):
+        self.assertEqual(self.cache.get('m'),None,'get error')
+        self.assertEqual(self.cache.get('m',1),1,'get error')
+        self.cache.set('m',2)
+        self.assertEqual(self.cache.get('m'),2,'get error')
+        self.assertEqual((self.cache.hits,self.cache.misses),(1,2),'get counter error')
+    def test_set(self):
+        self.cache.set('m',1)
+        self.cache.set('s',2)
+        self.cache.get('m')
+        self.cache.set('kg',3)
+        self.assertTrue('m' in self.cache,'set eviction error')
+        self.assertFalse('s' in self.cache,'set eviction error')
+        self.assertEqual(len(self.cache),2,'set eviction error')
+    def test_maxSize(self):
+        self.cache.set('m',1)
+        self.cache.set('s',2)
+        self.cache.maxSize=1
+        self.assertEqual(len(self.cache),1,'maxSize error')
+        self.assertTrue('s' in self.cache,'maxSize error')
+        self.cache.maxSize=None
+        for i in range(10):
+            self.cache.set(i,i)
+        self.assertEqual(len(self.cache),11,'maxSize error')
+    def test_clear(self):
+        self.cache.set('m',1)
+        self.cache.get('m')
+        self.cache.get('s')
+        self.cache.clear()
+        self.assertEqual(self.cache.info(),{'hits':0,'misses':0,'size':0,'maxSize':2},'clear error')
+
+class __UnitRegistryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__setattr__('registry',UnitRegistry(Unit._dimensions,dict(Unit._units),dict(Unit._compoundUnits),dict(Unit._prefixes)))
+    def tearDown(self):
+        self.__delattr__('registry')
+    def test_lookup(self):
+        self.assertEqual(self.registry.lookup('m'),((1,0,0,0,0),1.0),'lookup error')
+        self.assertEqual(self.registry.lookup('min'),((0,0,1,0,0),60.0),'lookup error')
+        self.assertEqual(self.registry.lookup('kN'),((1,1,-2,0,0),1000.0),'lookup error')
+        self.assertRaises(UnitError,self.registry.lookup,'dam')
+        self.assertRaises(UnitError,self.registry.lookup,'xyz')
+        self.assertRaises(UnitError,self.registry.lookup,'kkm')
+    def test_split(self):
+        self.assertEqual(self.registry.split('km'),('k','m'),'split error')
+        self.assertEqual(self.registry.split('min'),('','min'),'split error')
+        self.assertEqual(self.registry.split('K'),('','K'),'split error')
+        self.assertRaises(UnitError,self.registry.split,'xyz')
+    def test_defineUnit(self):
+        self.registry.defineUnit('yd',0.9144,'Length')
+        self.assertEqual(self.registry.lookup('kyd'),((1,0,0,0,0),914.4),'defineUnit error')
+        self.registry.defineUnit('ms',2.0,'Time')
+        self.assertEqual(self.registry.lookup('ms'),((0,0,1,0,0),2.0),'defineUnit error')
+        self.assertRaises(UnitError,self.registry.defineUnit,'xyz',1,'Luminosity')
+        self.assertRaises(UnitError,self.registry.defineUnit,'2m',1,'Length')
+    def test_defineUnit_offset(self):
+        self.registry.defineUnit('degRe',1.25,'Temperature',273.15)
+        self.assertEqual(self.registry.offsets['degRe'],273.15,'defineUnit error')
+        self.assertEqual(self.registry.lookup('delta_degRe'),((0,0,0,0,1),1.25),'defineUnit error')
+        self.assertRaises(UnitError,self.registry.lookup,'kdegRe')
+        self.assertEqual(self.registry.baseUnit('Temperature'),'K','defineUnit error')
+    def test_defineCompoundUnit(self):
+        self.registry.defineCompoundUnit('W',1,'J/s')
+        self.assertEqual(self.registry.lookup('kW'),((2,1,-3,0,0),1000.0),'defineCompoundUnit error')
+        self.registry.defineCompoundUnit('J',1000,'kg*m**2/s**2')
+        self.assertEqual(self.registry.lookup('W'),((2,1,-3,0,0),1000.0),'defineCompoundUnit error')
+        self.assertRaises(UnitError,self.registry.defineCompoundUnit,'X',1,'xyz/s')
+    def test_definePrefix(self):
+        changes=[]
+        self.registry.listeners.append(lambda:changes.append(1))
+        self.registry.definePrefix('Ki',1024)
+        self.assertEqual(self.registry.lookup('KiC'),((0,0,0,1,0),1024.0),'definePrefix error')
+        self.assertEqual(self.registry.lookup('KiN'),((1,1,-2,0,0),1024.0),'definePrefix error')
+        self.assertEqual(changes,[1],'definePrefix error')
+        self.assertRaises(UnitError,self.registry.definePrefix,'K1',1)
+    def test_definePrefix_letters(self):
+        #Prefixes of more than one letter, e.g. 'da' and 'mu', are not defined by default
+        self.registry.definePrefix('da',10)
+        self.registry.definePrefix('mu',0.000001)
+        self.assertEqual(self.registry.lookup('dam'),((1,0,0,0,0),10.0),'definePrefix error')
+        self.assertAlmostEqual(self.registry.lookup('mus')[1],0.000001,15,'definePrefix error')
+        self.assertEqual(self.registry.split('dam'),('da','m'),'definePrefix error')
+        self.assertEqual(self.registry.split('mus'),('mu','s'),'definePrefix error')
+        self.assertEqual(self.registry.lookup('min'),((0,0,1,0,0),60.0),'definePrefix error')
+    def test_kelvin(self):
+        #'K' is both the kilo prefix and kelvin, and exact unit names take precedence over prefixed ones
+        self.assertEqual(self.registry.lookup('K'),((0,0,0,0,1),1.0),'kelvin error')
+        self.assertEqual(self.registry.lookup('Km'),((1,0,0,0,0),1000.0),'kelvin error')
+        self.assertEqual(Unit(1,'K').dimensions,Unit(1,'degC').dimensions,'kelvin error')
+        self.assertAlmostEqual(Unit(300,'K').convert('degC'),26.85,9,'kelvin error')
+    def test_rebuild(self):
+        self.registry.compoundUnits['W']={'SIVAL':1.0,'UNITS':'J/s'}
+        self.registry.compoundUnits['Wh']={'SIVAL':3600.0,'UNITS':'W*s'}
+        self.registry.rebuild()
+        self.assertEqual(self.registry.lookup('kWh'),((2,1,-2,0,0),3600000.0),'rebuild error')
+        self.registry.compoundUnits['W']={'SIVAL':1.0,'UNITS':'W/s'}
+        self.assertRaises(UnitError,self.registry.rebuild)
+class __ThreadTestCase(unittest.TestCase):
+    def setUp(self):
+        self.__setattr__('registry',Unit.registry)
+        useRegistry(_copyRegistry(self.registry))
+    def tearDown(self):
+        useRegistry(self.registry)
+        self.__delattr__('registry')
+    def _run(self,target,count=8):
+        errors=[]
+        def run():
+            try:
+                target()
+            except Exception as e:
+                errors.append(e)
+        threads=[threading.Thread(target=run) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads,errors
+    def test_cache(self):
+        cache=UnitCache(16)
+        def target():
+            for i in range(5000):
+                key=i%40
+                value=cache.get(key)
+                if value is not None and value!=key*2:
+                    raise AssertionError('cache returned '+repr(value)+' for '+repr(key))
+                cache.set(key,key*2)
+        threads,errors=self._run(target)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors,[],'cache thread error')
+        self.assertTrue(len(cache)<=16,'cache thread error')
+    def test_registry(self):
+        names=['stress'+str(i) for i in range(50)]
+        done=[]
+        def target():
+            while not done:
+                self.assertAlmostEqual(Unit(1,'km').convertValue('ft'),1000/0.3048,9,'registry thread error')
+                self.assertAlmostEqual(float(Unit(2,'m/s')+Unit(3.6,'km/hr')),3.0,12,'registry thread error')
+                self.assertEqual(Unit(1).canonicalUnits('s*m*kg/s**3'),'kg*m/s**2','registry thread error')
+                for index,name in enumerate(names):
+                    if 'k'+name not in Unit.registry:
+                        break
+                    self.assertEqual(Unit(1,'k'+name).convertValue('m'),1000.0*(index+1),'registry thread error')
+        threads,errors=self._run(target)
+        try:
+            for index,name in enumerate(names):
+                defineUnit(name,index+1,'Length')
+            definePrefix('stressPrefix',2)
+        finally:
+            done.append(True)
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors,[],'registry thread error: '+repr(errors[:1]))
+    def test_registry_redefine(self):
+        #Readers converting a unit while it is redefined see the old or the new scaling, never a stale one afterwards
+        done=[]
+        def target():
+            while not done:
+                value=Unit(1,'kstressUnit').convertValue('m')
+                if value not in (1000.0,2000.0,3000.0):
+                    raise AssertionError('stressUnit converted to '+repr(value))
+                self.assertTrue(Unit(1,'stressUnit/s').parseUnits('stressUnit/s')[1] in (1.0,2.0,3.0),'registry thread error')
+                format(Unit(1,'stressUnit'),'>1.1f m')
+        defineUnit('stressUnit',1,'Length')
+        threads,errors=self._run(target)
+        try:
+            for i in range(200):
+                defineUnit('stressUnit',2+i%2,'Length')
+        finally:
+            done.append(True)
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors,[],'registry thread error: '+repr(errors[:1]))
+        self.assertEqual(Unit(1,'kstressUnit').convertValue('m'),3000.0,'registry thread error')
+        self.assertEqual(Unit(1).conversionTransform('stressUnit/s','m/s'),(3.0,0.0),'registry thread error')
+        self.assertEqual(format(Unit(1,'stressUnit'),'>1.1f m'),'3.0 m','registry thread error')
+        #A reader which compiled the units before a redefinition and writes them to the caches after it
+        snapshot=Unit.registry.snapshot
+        stale=Unit(1).compileUnits('kstressUnit',snapshot)
+        defineUnit('stressUnit',4,'Length')
+        Unit.parseCache.set('kstressUnit',stale,snapshot.generation)
+        Unit.conversionCache.set(('kstressUnit','m'),3000.0,snapshot.generation)
+        self.assertEqual(Unit(1,'kstressUnit').convertValue('m'),4000.0,'registry thread error')
+        self.assertEqual(Unit(1,'kstressUnit').dimensions,(1,0,0,0,0),'registry thread error')
+def __debugTestSuite():
+    suite=unittest.TestSuite()
+    unitSuite = unittest.TestLoader().loadTestsFromTestCase(__UnitTestCase)
+    suite.addTests(unitSuite._tests)
+    cacheSuite = unittest.TestLoader().loadTestsFromTestCase(__UnitCacheTestCase)
+    suite.addTests(cacheSuite._tests)
+    registrySuite = unittest.TestLoader().loadTestsFromTestCase(__UnitRegistryTestCase)
+    suite.addTests(registrySuite._tests)
+    threadSuite = unittest.TestLoader().loadTestsFromTestCase(__ThreadTestCase)
+    suite.addTests(threadSuite._tests)
+    return suite
+def __testSuite():
+    unitSuite = unittest.TestLoader().loadTestsFromTestCase(__UnitTestCase)
+    cacheSuite = unittest.TestLoader().loadTestsFromTestCase(__UnitCacheTestCase)
+    registrySuite = unittest.TestLoader().loadTestsFromTestCase(__UnitRegistryTestCase)
+    threadSuite = unittest.TestLoader().loadTestsFromTestCase(__ThreadTestCase)
+    return unittest.TestSuite([unitSuite,cacheSuite,registrySuite,threadSuite])
+def runTests():
+    suite=__testSuite()
+    unittest.TextTestRunner(verbosity=4).run(suite)
+def debugTests():
+    suite=__debugTestSuite()
+    import ipdb,sys
+    for test in suite:
+        
+        try:
+            test.debug()
+        except Exception as e:
+            if type(e)==AssertionError:                
+                ipdb.post_mortem(sys.exc_info()[2])
+                
+            else:
+                try:
+                    from IPython.core.ultratb import VerboseTB
+                    vtb=VerboseTB(call_pdb=1)
+                    vtb(*sys.exc_info())
+                except:
+                    import traceback
+                    print('\n')
+                    traceback.print_exc()
+                ipdb.post_mortem(sys.exc_info()[2])
+if  __name__=='__main__':
+    runTests()
@@ -1,30 +1,613 @@
-import unittest
+import sys
+import threading
+from array import array
+from collections import deque
+from itertools import count,repeat
+from operator import add,neg,sub
 from re import compile
 class UnitError(Exception):
     __doc__="""Exception raised for unit errors."""
+class DimensionError(UnitError):
+    __doc__="""UnitError raised when the dimensions of units do not match, e.g. when adding a length to a time."""
+class UnitCache(object):
+    __doc__="""Bounded cache with hit and miss counters, evicting entries that have not been used recently.
+
+    Reads take no lock, so many threads can share a cache without contention. Each hit only sets a flag on its entry, and
+    eviction uses the CLOCK (second chance) approximation of least recently used: entries are kept in insertion order and
+    an entry used since it was last passed over is kept once more. Writes and evictions take a lock. The counters are
+    statistics only and may miss increments when threads race. Setting maxSize to None removes the bound.
+
+    An entry may be stamped with the generation of the registry it was computed from, and a get passing a generation
+    only returns entries with the same stamp. An entry written by a thread that was still using an earlier registry
+    after the cache was cleared is then a miss rather than a stale hit."""
+    def __init__(self,maxSize=128):
+        self._data={}
+        self._queue=deque()
+        self._lock=threading.Lock()
+        self._maxSize=maxSize
+        self.hits=0
+        self.misses=0
+    def __len__(self):
+        return len(self._data)
+    def __contains__(self,key):
+        return key in self._data
+    def getMaxSize(self):
+        return self._maxSize
+    def setMaxSize(self,maxSize):
+        with self._lock:
+            self._maxSize=maxSize
+            self._evict()
+    maxSize=property(getMaxSize,setMaxSize)
+    def get(self,key,default=None,generation=None):
+        """get(key,default=None,generation=None)
+        Return the cached value for key, marking it as recently used, or default if it is not cached or, when generation
+        is given, if it was stamped with another generation.
+        """
+        try:
+            entry=self._data[key]
+        except KeyError:
+            self.misses+=1
+            return default
+        if generation is not None and entry[2]!=generation:
+            self.misses+=1
+            return default
+        entry[1]=True
+        self.hits+=1
+        return entry[0]
+    def set(self,key,value,generation=None):
+        """set(key,value,generation=None)
+        Store value for key stamped with generation, evicting entries that have not been used recently if the cache is
+        full.
+        """
+        with self._lock:
+            if key not in self._data:
+                self._queue.append(key)
+            self._data[key]=[value,False,generation]
+            self._evict()
+    def clear(self):
+        """clear()
+        Remove all entries and reset the hit and miss counters.
+        """
+        with self._lock:
+            self._data={}
+            self._queue=deque()
+            self.hits=0
+            self.misses=0
+    def info(self):
+        """info()
+        Return a dictionary of the cache statistics.
+        """
+        return {'hits':self.hits,'misses':self.misses,'size':len(self._data),'maxSize':self._maxSize}
+    def _evict(self):
+        if self._maxSize is not None:
+            while len(self._data)>self._maxSize:
+                key=self._queue.popleft()
+                entry=self._data[key]
+                if entry[1]:
+                    entry[1]=False
+                    self._queue.append(key)
+                else:
+                    del self._data[key]
+def multiplyDimensions(dimensions1,dimensions2):
+    """multiplyDimensions(dimensions1,dimensions2)
+    Return the dimension vector of the product of two units.
+    """
+    return tuple(map(add,dimensions1,dimensions2))
+def divideDimensions(dimensions1,dimensions2):
+    """divideDimensions(dimensions1,dimensions2)
+    Return the dimension vector of the quotient of two units.
+    """
+    return tuple(map(sub,dimensions1,dimensions2))
+def invertDimensions(dimensions):
+    """invertDimensions(dimensions)
+    Return the dimension vector of the reciprocal of a unit.
+    """
+    return tuple(map(neg,dimensions))
+_unitToken=compile(r'([A-Za-z_][A-Za-z_0-9]*)|(\d+\.?\d*(?:[eE][-+]?\d+)?|\.\d+)|(\*\*|\^)|([*/()+-])|(\S)')
+_simpleFactor=compile(r'([A-Za-z_]\w*)(?:\^(-?\d+))?$')
+_simpleExpression=compile(r'[A-Za-z_]\w*(?:(?:\*\*|\^)-?\d+)?(?:[*/][A-Za-z_]\w*(?:(?:\*\*|\^)-?\d+)?)*$')
+_simpleTerm=compile(r'(/?)([A-Za-z_]\w*)(?:(?:\*\*|\^)(-?\d+))?')
+_unitName=compile(r'[A-Za-z_][A-Za-z_0-9]*$')
+_formatSpec=compile(r'\.?([<>=\^]?)([\d\.]*)([FfgGeEn]?)([ _]?)(.*)')
+def _parseNumber(units,tokens,i):
+    """_parseNumber(units,tokens,i)
+    Parse a signed number from the tokens starting at index i, returning the number and the index after it.
+    """
+    sign=1
+    while i<len(tokens) and tokens[i][3] in ('+','-'):
+        if tokens[i][3]=='-':
+            sign=-sign
+        i+=1
+    if i==len(tokens) or not tokens[i][1]:
+        raise UnitError('Cannot parse units '+units+': expected a number')
+    number=tokens[i][1]
+    if '.' in number or 'e' in number or 'E' in number:
+        return sign*float(number),i+1
+    return sign*int(number),i+1
+def _parseExponent(units,tokens,i):
+    """_parseExponent(units,tokens,i)
+    Parse the exponent following a power operator, e.g. 2, -1, 0.5 or (1/2), returning it and the index after it.
+    """
+    if i<len(tokens) and tokens[i][3]=='(':
+        power,i=_parseNumber(units,tokens,i+1)
+        if i<len(tokens) and tokens[i][3]=='/':
+            denominator,i=_parseNumber(units,tokens,i+1)
+            power=power/float(denominator)
+        if i==len(tokens) or tokens[i][3]!=')':
+            raise UnitError('Cannot parse units '+units+': expected )')
+        i+=1
+    else:
+        power,i=_parseNumber(units,tokens,i)
+    if power==int(power):
+        return int(power),i
+    return power,i
+def parseExpression(units):
+    """parseExpression(units)
+    Parse a unit expression in a single pass into a tuple of (name,power) terms, e.g. 'kg*m/s**2' gives
+    (('kg',1),('m',1),('s',-2)), combining repeated names in order of first appearance and dropping names whose powers
+    cancel.
+
+    Division follows the convention of splitting on '/' first, so every '/' switches between numerator and denominator:
+    'kg/m*s' is kg per (m*s) and 'kg/m/s' is kg*s/m. Parentheses group sub-expressions, powers may be negative or
+    fractional ('m**-1', 's^(1/2)', 'm**0.5') and whitespace or a parenthesis between factors is an implicit
+    multiplication ('kg m/s**2', 'kg(m/s)'). A literal 1 is dimensionless, e.g. '1/s'.
+    """
+    if units.isalpha():
+        return ((units,1),)
+    if _simpleExpression.match(units):
+        #Fast path for names joined by * and / with integer powers, one regex match per term
+        names=[]
+        powers=[]
+        sign=1
+        for divide,name,power in _simpleTerm.findall(units):
+            if divide:
+                sign=-sign
+            names.append(name)
+            if power:
+                powers.append(sign*int(power))
+            else:
+                powers.append(sign)
+        if len(set(names))==len(names) and 0 not in powers:
+            return tuple(zip(names,powers))
+    else:
+        names,powers=_parseTerms(units)
+    result={}
+    order=[]
+    for name,power in zip(names,powers):
+        if name in result:
+            result[name]+=power
+        else:
+            result[name]=power
+            order.append(name)
+    return tuple((name,result[name]) for name in order if result[name])
+def _parseTerms(units):
+    """_parseTerms(units)
+    General single pass parser over the tokens of a unit expression, returning parallel lists of names and powers.
+    """
+    tokens=_unitToken.findall(units)
+    names=[]
+    powers=[]
+    groups=[]
+    sign=1
+    #Index of the first term of the last complete factor, or None while a factor is expected
+    last=None
+    powered=False
+    i=0
+    while i<len(tokens):
+        name,number,power,operator,error=tokens[i]
+        i+=1
+        if name:
+            last=len(names)
+            powered=False
+            names.append(name)
+            powers.append(sign)
+        elif operator=='*' or operator=='/':
+            if last is None:
+                raise UnitError('Cannot parse units '+units+': expected a unit before '+operator)
+            if operator=='/':
+                sign=-sign
+            last=None
+        elif power:
+            if last is None or powered:
+                raise UnitError('Cannot parse units '+units+': expected a unit before '+power)
+            exponent,i=_parseExponent(units,tokens,i)
+            for j in range(last,len(powers)):
+                powers[j]*=exponent
+            powered=True
+        elif operator=='(':
+            groups.append((sign,len(names)))
+            last=None
+        elif operator==')':
+            if last is None or not groups:
+                raise UnitError('Cannot parse units '+units+': unexpected )')
+            sign,last=groups.pop()
+            powered=False
+        elif number and float(number)==1:
+            last=len(names)
+            powered=False
+        else:
+            raise UnitError('Cannot parse units '+units+': unexpected '+repr(name or number or operator or error))
+    if last is None or groups:
+        raise UnitError('Cannot parse units '+units+': unexpected end')
+    return names,powers
+def formatPower(name,power):
+    """formatPower(name,power)
+    Format a single term, e.g. 'm', 'm**2' or 'm**-1'.
+    """
+    if power==1:
+        return name
+    return name+'**'+str(power)
+def formatExpression(terms):
+    """formatExpression(terms)
+    Format (name,power) terms as a unit expression with at most one '/', e.g. 'kg*m/s**2'.
+    Terms with only negative powers are written as 'm**-1*s**-1'.
+    """
+    numerator=[formatPower(name,power) for name,power in terms if power>0]
+    denominator=[formatPower(name,-power) for name,power in terms if power<0]
+    if not numerator:
+        return '*'.join(formatPower(name,power) for name,power in terms)
+    if denominator:
+        return '*'.join(numerator)+'/'+'*'.join(denominator)
+    return '*'.join(numerator)
+def invertExpression(terms):
+    """invertExpression(terms)
+    Return the terms of the reciprocal unit.
+    """
+    return tuple((name,-power) for name,power in terms)
+def multiplyExpression(terms1,terms2):
+    """multiplyExpression(terms1,terms2)
+    Return the terms of the product of two units, combining repeated names and dropping names whose powers cancel.
+    """
+    result={}
+    order=[]
+    for name,power in terms1+terms2:
+        if name in result:
+            result[name]+=power
+        else:
+            result[name]=power
+            order.append(name)
+    return tuple((name,result[name]) for name in order if result[name])
+def _termKey(term):
+    return term[0].lower(),term[0]
+class UnitDescriptor(object):
+    __doc__="""Shared description of a unit string: the string, its dimension vector, its scaling to SI units and, for an
+    absolute temperature in an affine unit such as 'degC', the SI value of its zero.
+
+    Descriptors are interned through Unit.parseCache so Unit instances with the same units share one descriptor."""
+    __slots__=('units','dimensions','scaling','offset','_terms')
+    def __init__(self,units,dimensions,scaling,terms=None,offset=0.0):
+        self.units=units
+        self.dimensions=dimensions
+        self.scaling=scaling
+        self.offset=offset
+        self._terms=terms
+    @property
+    def terms(self):
+        """Tuple of (name,power) terms of the units, parsed on first use."""
+        if self._terms is None:
+            self._terms=()
+            if self.units:
+                self._terms=parseExpression(self.units)
+        return self._terms
+    def __repr__(self):
+        return 'UnitDescriptor('+repr(self.units)+','+repr(self.dimensions)+','+repr(self.scaling)+')'
+_generations=count(1)
+class RegistrySnapshot(object):
+    __doc__="""State of a UnitRegistry at one point in time: the units, compoundUnits and prefixes dictionaries, the table of
+    every unit name, with and without each prefix, mapped to its dimension vector and scaling, and the lookups derived
+    from them. A snapshot is filled in before it is published and never modified afterwards.
+
+    generation is unique to each snapshot and stamps the cache entries computed from it. factors memoizes the factors of
+    unit strings, e.g. 's**2', resolved by Unit.compileUnits against this snapshot."""
+    __slots__=('units','compoundUnits','prefixes','table','parts','offsets','baseUnits','compoundNames','generation',
+               'factors')
+    def __init__(self,units,compoundUnits,prefixes,table=None,parts=None):
+        self.units=units
+        self.compoundUnits=compoundUnits
+        self.prefixes=prefixes
+        self.table=table if table is not None else {}
+        self.parts=parts if parts is not None else {}
+        self.offsets={}
+        self.baseUnits={}
+        self.compoundNames=()
+        self.generation=next(_generations)
+        self.factors={}
+class UnitRegistry(object):
+    __doc__="""Compiled table of every unit name, with and without each prefix, mapped to its dimension vector and scaling.
+
+    The registry is built from units, compoundUnits and prefixes dictionaries, which are its units, compoundUnits and
+    prefixes until a unit or prefix is defined at runtime. Defining a unit or prefix only adds the new table entries.
+    Exact unit names take precedence over prefixed names, e.g. 'min' is minutes rather than milli-'in'.
+    Each callable in listeners is called with no arguments after the registry changes.
+
+    Units with an 'OFFSET' are affine, e.g. 'degC' where a value v is v*SIVAL+OFFSET in SI units. offsets maps each
+    affine unit name to its OFFSET. Affine units are not prefixed, and each has a 'delta_' unit with the same scaling and
+    no offset for differences, e.g. 'delta_degC'.
+
+    The registry is safe to share between threads. All of its state is held in one RegistrySnapshot, and readers take no
+    lock: a snapshot is never modified once published. Writers hold a lock while they build a new snapshot from copies of
+    the dictionaries and then publish it with a single assignment, so a reader sees either the previous units, table and
+    offsets or the new ones, never a mix. Readers which cache results stamp them with the generation of the snapshot."""
+    def __init__(self,dimensions,units=None,compoundUnits=None,prefixes=None):
+        self.dimensions=tuple(dimensions)
+        self.listeners=[]
+        self._lock=threading.RLock()
+        self.snapshot=RegistrySnapshot(units if units is not None else {},compoundUnits if compoundUnits is not None else {},
+                                       prefixes if prefixes is not None else {})
+        self.rebuild()
+    @property
+    def units(self):
+        """Dictionary of base units, e.g. {'m':{'SIVAL':1.0,'TYPE':'Length'}}."""
+        return self.snapshot.units
+    @property
+    def compoundUnits(self):
+        """Dictionary of compound units, e.g. {'N':{'SIVAL':1.0,'UNITS':'kg*m/s**2'}}."""
+        return self.snapshot.compoundUnits
+    @property
+    def prefixes(self):
+        """Dictionary of prefixes and their factors, e.g. {'k':1000.0}."""
+        return self.snapshot.prefixes
+    @property
+    def offsets(self):
+        """Dictionary of the affine unit names and their offsets, e.g. {'degC':273.15}."""
+        return self.snapshot.offsets
+    @property
+    def generation(self):
+        """Generation of the published snapshot, which changes every time the registry changes."""
+        return self.snapshot.generation
+    def __len__(self):
+        return len(self.snapshot.table)
+    def __contains__(self,name):
+        return name in self.snapshot.table
+    def lookup(self,name):
+        """lookup(name)
+        Return the dimension vector and scaling factor to SI units of a single, optionally prefixed, unit name.
+        """
+        try:
+            return self.snapshot.table[name]
+        except KeyError:
+            raise UnitError('Unit '+name+' not found')
+    def split(self,name):
+        """split(name)
+        Return the (prefix,unit) names of a single, optionally prefixed, unit name, with a prefix of '' if it has none.
+        """
+        try:
+            return self.snapshot.parts[name]
+        except KeyError:
+            raise UnitError('Unit '+name+' not found')
+    def baseUnit(self,dimension):
+        """baseUnit(dimension)
+        Return the name of the unprefixed unit of a dimension with an SI value of 1, e.g. 'kg' for 'Mass', or None.
+        """
+        return self.snapshot.baseUnits.get(dimension)
+    def compoundName(self,dimensions,scaling):
+        """compoundName(dimensions,scaling)
+        Return the name of the unprefixed compound unit with the given dimension vector and scaling, e.g. 'N', or None.
+        """
+        snapshot=self.snapshot
+        table=snapshot.table
+        for name in snapshot.compoundNames:
+            unitDimensions,unitScaling=table[name]
+            if unitDimensions==dimensions and abs(unitScaling-scaling)<=1e-12*abs(scaling):
+                return name
+        return None
+    def rebuild(self):
+        """rebuild()
+        Recompute the whole table from the units, compoundUnits and prefixes dictionaries.
+        """
+        with self._lock:
+            snapshot=self.snapshot
+            self._publish(self._build(snapshot.units,snapshot.compoundUnits,snapshot.prefixes))
+    def defineUnit(self,name,siValue,type,offset=0.0):
+        """defineUnit(name,siValue,type,offset=0.0)
+        Define a base unit of one of the dimensions, where siValue is the value of one unit in SI units. A unit with a
+        non-zero offset is affine, where offset is the SI value of zero in the unit, e.g. defineUnit('degC',1,
+        'Temperature',273.15).
+        """
+        self._checkName(name)
+        vector=self._baseVector(type)
+        unit={'SIVAL':float(siValue),'TYPE':type}
+        if offset:
+            unit['OFFSET']=float(offset)
+        with self._lock:
+            current=self.snapshot
+            redefined=name in current.units or name in current.compoundUnits
+            units=dict(current.units)
+            units[name]=unit
+            compoundUnits=dict(current.compoundUnits)
+            compoundUnits.pop(name,None)
+            if redefined:
+                snapshot=self._build(units,compoundUnits,current.prefixes)
+            else:
+                snapshot=RegistrySnapshot(units,compoundUnits,current.prefixes,dict(current.table),dict(current.parts))
+                self._add(snapshot,name,vector,float(siValue))
+            self._publish(snapshot)
+            self._changed()
+    def defineCompoundUnit(self,name,siValue,units):
+        """defineCompoundUnit(name,siValue,units)
+        Define a unit equal to siValue times a unit string of already defined units, e.g. defineCompoundUnit('W',1,'J/s').
+        """
+        self._checkName(name)
+        with self._lock:
+            current=self.snapshot
+            dimensions,scaling=self._resolveExpression(current,units)
+            redefined=name in current.units or name in current.compoundUnits
+            newUnits=dict(current.units)
+            newUnits.pop(name,None)
+            compoundUnits=dict(current.compoundUnits)
+            compoundUnits[name]={'SIVAL':float(siValue),'UNITS':units}
+            if redefined:
+                snapshot=self._build(newUnits,compoundUnits,current.prefixes)
+            else:
+                snapshot=RegistrySnapshot(newUnits,compoundUnits,current.prefixes,dict(current.table),dict(current.parts))
+                self._add(snapshot,name,dimensions,scaling*float(siValue))
+            self._publish(snapshot)
+            self._changed()
+    def definePrefix(self,prefix,factor):
+        """definePrefix(prefix,factor)
+        Define a prefix of one or more letters, e.g. definePrefix('da',10), which can be used with every unit.
+        """
+        if not prefix.isalpha():
+            raise UnitError('Prefix '+prefix+' must be letters only')
+        with self._lock:
+            current=self.snapshot
+            redefined=prefix in current.prefixes
+            prefixes=dict(current.prefixes)
+            prefixes[prefix]=float(factor)
+            if redefined:
+                snapshot=self._build(current.units,current.compoundUnits,prefixes)
+            else:
+                snapshot=RegistrySnapshot(current.units,current.compoundUnits,prefixes,dict(current.table),
+                                          dict(current.parts))
+                for name in list(current.units)+list(current.compoundUnits):
+                    dimensions,scaling=snapshot.table[name]
+                    self._addPrefixed(snapshot,prefix,name,dimensions,scaling)
+            self._publish(snapshot)
+            self._changed()
+    def _build(self,units,compoundUnits,prefixes):
+        """_build(units,compoundUnits,prefixes)
+        Return a new snapshot with the whole table computed from the dictionaries.
+        """
+        snapshot=RegistrySnapshot(units,compoundUnits,prefixes)
+        for name,unit in units.items():
+            self._add(snapshot,name,self._baseVector(unit['TYPE']),unit['SIVAL'])
+        resolving=set()
+        for name in compoundUnits:
+            self._addCompound(snapshot,name,resolving)
+        return snapshot
+    def _publish(self,snapshot):
+        #Readers see either the previous snapshot or the new one, never one that is part way through being built
+        baseUnits={}
+        offsets={}
+        for name in sorted(snapshot.units):
+            unit=snapshot.units[name]
+            if unit.get('OFFSET'):
+                offsets[name]=unit['OFFSET']
+            elif unit['SIVAL']==1 and unit['TYPE'] not in baseUnits:
+                baseUnits[unit['TYPE']]=name
+        snapshot.baseUnits=baseUnits
+        snapshot.offsets=offsets
+        snapshot.compoundNames=tuple(sorted(snapshot.compoundUnits))
+        self.snapshot=snapshot
+    def _changed(self):
+        for listener in self.listeners:
+            listener()
+    def _checkName(self,name):
+        if not _unitName.match(name):
+            raise UnitError('Unit name '+name+' must be a letter or _ followed by letters, digits or _')
+    def _baseVector(self,type):
+        if type not in self.dimensions:
+            raise UnitError('Dimension '+type+' not found')
+        return tuple(int(dimension==type) for dimension in self.dimensions)
+    def _resolveExpression(self,snapshot,units,resolving=None):
+        table=snapshot.table
+        dimensions=[0]*len(self.dimensions)
+        scaling=1.0
+        for name,power in parseExpression(units):
+            if name not in table and resolving is not None and name in snapshot.compoundUnits:
+                self._addCompound(snapshot,name,resolving)
+            if name not in table:
+                raise UnitError('Unit '+name+' not found')
+            unitDimensions,unitScaling=table[name]
+            for index,dimension in enumerate(unitDimensions):
+                dimensions[index]+=power*dimension
+            scaling*=unitScaling**power
+        return tuple(dimensions),scaling
+    def _addCompound(self,snapshot,name,resolving):
+        #Compound units may be defined in terms of other compound units, so resolve those first
+        if name in snapshot.table and snapshot.parts[name][0]=='':
+            return
+        if name in resolving:
+            raise UnitError('Compound unit '+name+' is defined in terms of itself')
+        resolving.add(name)
+        unit=snapshot.compoundUnits[name]
+        dimensions,scaling=self._resolveExpression(snapshot,unit['UNITS'],resolving)
+        self._add(snapshot,name,dimensions,scaling*unit['SIVAL'])
+    def _add(self,snapshot,name,dimensions,scaling):
+        snapshot.table[name]=(dimensions,scaling)
+        snapshot.parts[name]=('',name)
+        if self._isAffine(snapshot,name):
+            snapshot.table['delta_'+name]=(dimensions,scaling)
+            snapshot.parts['delta_'+name]=('','delta_'+name)
+            return
+        for prefix in snapshot.prefixes:
+            self._addPrefixed(snapshot,prefix,name,dimensions,scaling)
+    def _isAffine(self,snapshot,name):
+        return bool(snapshot.units.get(name,{}).get('OFFSET'))
+    def _addPrefixed(self,snapshot,prefix,name,dimensions,scaling):
+        prefixed=prefix+name
+        if prefixed in snapshot.units or prefixed in snapshot.compoundUnits or self._isAffine(snapshot,name):
+            return
+        snapshot.table[prefixed]=(dimensions,scaling*snapshot.prefixes[prefix])
+        snapshot.parts[prefixed]=(prefix,name)
 class Unit(float):
+    __slots__=('_descriptor',)
     _prefixes={'G':1000000000.0,'M':1000000.0,'K':1000.0,'k':1000.0,'d':0.1,'c':0.01,'m':0.001,'n':0.000000001}
     _units={'m':{'SIVAL':1.0,'TYPE':'Length'},'ft':{'SIVAL':0.3048,'TYPE':'Length'},'s':{'SIVAL':1.0,'TYPE':'Time'},'min':{'SIVAL':60.0,'TYPE':'Time'},'kg':{'SIVAL':1.0,'TYPE':'Mass'},
-           'g':{'SIVAL':0.001,'TYPE':'Mass'},'lb':{'SIVAL':2.2046226,'TYPE':'Mass'},'C':{'SIVAL':1.0,'TYPE':'Charge'},'hr':{'SIVAL':3600.0, 'TYPE':'Time'},'miles':{'SIVAL':1609.344,'TYPE':'Length'}}
+           'g':{'SIVAL':0.001,'TYPE':'Mass'},'lb':{'SIVAL':2.2046226,'TYPE':'Mass'},'C':{'SIVAL':1.0,'TYPE':'Charge'},'hr':{'SIVAL':3600.0, 'TYPE':'Time'},'miles':{'SIVAL':1609.344,'TYPE':'Length'},
+           'K':{'SIVAL':1.0,'TYPE':'Temperature'},'R':{'SIVAL':5/9.0,'TYPE':'Temperature'},'degC':{'SIVAL':1.0,'TYPE':'Temperature','OFFSET':273.15},
+           'degF':{'SIVAL':5/9.0,'TYPE':'Temperature','OFFSET':273.15-32*5/9.0}}
     _compoundUnits={'Ohm':{'SIVAL':1.0,'UNITS':'kg*m**2/s*C**2'},'A':{'SIVAL':1.0,'UNITS':'C/s'},'J':{'SIVAL':1.0,'UNITS':'kg*m**2/s**2'},'N':{'SIVAL':1.0,'UNITS':'kg*m/s**2'},'V':{'SIVAL':1.0,'UNITS':'kg*m**2/C*s**2'}}
+    _dimensions=('Length','Mass','Time','Charge','Temperature')
     _separators={'MULTIPLY':'\*\*|\^|\*','DIVIDE':'\/'}
+    registry=UnitRegistry(_dimensions,_units,_compoundUnits,_prefixes)
+    parseCache=UnitCache(256)
+    conversionCache=UnitCache(1024)
+    transformCache=UnitCache(1024)
+    formatCache=UnitCache(256)
+    canonicalCache=UnitCache(1024)
+    canonicalNames=False
+    _internedUnits={}
+    _noUnits=UnitDescriptor(False,False,1,())
     def __new__(cls,value,units=False):
         self=float.__new__(cls,value)
         if units:
             self.setUnits(units)
         else:
-            self.__setattr__('units',False)
-            self.__setattr__('order',False)
+            self._descriptor=self._noUnits
         return self
+    def __reduce__(self):
+        return (self.__class__,(float(self),self.units))
+    @property
+    def units(self):
+        """Unit string, or False without units."""
+        return self._descriptor.units
+    @property
+    def dimensions(self):
+        """Tuple of powers of the base dimensions in _dimensions, or False without units."""
+        return self._descriptor.dimensions
+    @property
+    def order(self):
+        """Dictionary view of the dimension vector, e.g. {'Mass':1,'Length':2,'Time':-2}, or False without units."""
+        if self.dimensions is False:
+            return False
+        return self.dimensionOrder(self.dimensions)
     def __float__(self):
         return super(Unit,self).__float__()
     def __format__(self,formatSpec):
-        import re
-        r=re.compile("\.?([<>=\^]?)([\d\.]*)([FfgGeEn]?)([ _]?)(.*)")
-        m=r.match(formatSpec)
-        formatSpec=m.group(1)+m.group(2)+m.group(3)
-        if formatSpec=='.':
-            formatSpec=''
+        #Look up the plan for this format spec and units so repeated formats skip the regex and the conversion lookup
+        key=(self.units,formatSpec)
+        generation=self.registry.snapshot.generation
+        plan=self.formatCache.get(key,None,generation)
+        if plan is None:
+            plan=self.formatPlan(self.units,formatSpec)
+            self.formatCache.set(key,plan,generation)
+        factor,offset,numberSpec,suffix=plan
+        value=float(self)*factor
+        if offset:
+            #Adding a zero offset would turn -0.0 into 0.0
+            value+=offset
+        return float.__format__(value,numberSpec)+suffix
+    def formatPlan(self,units,formatSpec):
+        """formatPlan(units,formatSpec)
+        Parse a format spec of the form '[align][width][.precision][type][ ][units][a|A]' for a value in units into the
+        tuple (factor,offset,numberSpec,suffix) used by __format__, where the value is multiplied by factor and offset
+        is added, then it is formatted with numberSpec and followed by suffix. Plans are memoized in the class level formatCache keyed on (units,formatSpec).
+        """
+        m=_formatSpec.match(formatSpec)
+        numberSpec=m.group(1)+m.group(2)+m.group(3)
+        if numberSpec=='.':
+            numberSpec=''
         showUnits=True
         if len(m.group(5)):
             showUnits=m.group(5)[-1]!='A'
@@ -36,256 +619,246 @@ class Unit(float):
         newUnits=newUnits.strip()
         if newUnits!='':
             if not showUnits:
-                formatSpec+='A'
+                numberSpec+='A'
             else:
-                formatSpec+=space+'a'
-            return self.convert(newUnits).__format__(formatSpec)
-        if self.units and showUnits:
-            return super(Unit,self).__format__(formatSpec)+space+self.units
-        return super(Unit,self).__format__(formatSpec)
+                numberSpec+=space+'a'
+            if units:
+                factor,offset,numberSpec,suffix=self.formatPlan(newUnits,numberSpec)
+                scale,shift=self.conversionTransform(units,newUnits)
+                return factor*scale,factor*shift+offset,numberSpec,suffix
+            return self.formatPlan(units,numberSpec)
+        if units and showUnits:
+            return 1.0,0.0,numberSpec,space+units
+        return 1.0,0.0,numberSpec,''
     def setUnits(self,units):
-        multiply=compile(self._separators['MULTIPLY'])
-        divide=compile(self._separators['DIVIDE'])
-        actUnit=dict(zip(['Numerator','Denominator'],[multiply.split('*'.join(divide.split(units)[::2])),multiply.split('*'.join(divide.split(units)[1::2]))]))
-        #Determine values for the order and scaling of the units
-        order,scaling=self.combine(self.unitParse(actUnit['Numerator']),self.unitParse(actUnit['Denominator']))
-        self.__setattr__('units',units)
-        self.__setattr__('order',order)
+        #Look up the shared descriptor holding the order and scaling of the units
+        self._descriptor=self.getDescriptor(units)
     def invert(self):
         invertedUnits=False
         if self.units:
-            multiply=compile(self._separators['MULTIPLY'])
-            divide=compile(self._separators['DIVIDE'])
-            actUnit=dict(zip(['Numerator','Denominator'],[multiply.split('*'.join(divide.split(self.units)[::2])),multiply.split('*'.join(divide.split(self.units)[1::2]))]))
-            import ipdb
-            if len(divide.split(self.units)[1::2]):
-                invertedUnits='/'.join(['*'.join(divide.split(self.units)[1::2]),'*'.join(divide.split(self.units)[::2])])
-            else:
-                invertedUnits='**-1*'.join(multiply.split('*'.join(divide.split(self.units)[::2])))+'**-1'
+            invertedUnits=formatExpression(invertExpression(self._descriptor.terms))
         return self.__new__(self.__class__,1.0/float(self),invertedUnits)
+    def _new(self,value,descriptor):
+        """_new(value,descriptor)
+        Return a new instance holding value that shares an existing descriptor, skipping the parse cache lookup.
+        """
+        result=float.__new__(self.__class__,value)
+        result._descriptor=descriptor
+        return result
+    def _otherValue(self,other):
+        """_otherValue(other)
+        Return other as a float in the units of this value, raising a UnitError if the dimensions do not match.
+        Identical and unitless operands are returned as they are, skipping the dimension check and conversion.
+        """
+        descriptor=self._descriptor
+        otherDescriptor=other._descriptor
+        if otherDescriptor is descriptor or not otherDescriptor.dimensions or otherDescriptor.units==descriptor.units:
+            return other
+        #check dimensions and then convert to unit
+        if otherDescriptor.dimensions==descriptor.dimensions:
+            return other.convertValue(descriptor.units)
+        raise DimensionError('Dimensionality of units does not match')
+    def _affineSum(self,other,subtract):
+        """_affineSum(other,subtract)
+        Add or subtract two values where at least one is an absolute temperature in an affine unit such as 'degC'.
+        The difference of two absolute temperatures is a difference in the 'delta_' unit of the first, e.g. 'delta_degC'.
+        An absolute temperature plus or minus a difference in any other unit of temperature, e.g. 'K' or 'delta_degF', is
+        an absolute temperature in its own units. Adding two absolute temperatures raises a UnitError.
+        """
+        descriptor=self._descriptor
+        otherDescriptor=other._descriptor
+        if descriptor.offset and otherDescriptor.offset:
+            if not subtract:
+                raise UnitError('Cannot add absolute temperatures in '+descriptor.units+' and '+otherDescriptor.units)
+            return self.__new__(self.__class__,float(self)-other.convertValue(descriptor.units),'delta_'+descriptor.units)
+        if descriptor.offset:
+            value=float(other)
+            if otherDescriptor.dimensions:
+                #The difference is scaled without the offset
+                value*=self.conversionFactor(otherDescriptor.units,descriptor.units)
+            if subtract:
+                return self._new(float(self)-value,descriptor)
+            return self._new(float(self)+value,descriptor)
+        if subtract:
+            raise UnitError('Cannot subtract an absolute temperature in '+otherDescriptor.units+' from a difference')
+        return other._affineSum(self,False)
     def __eq__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not other.order or self.compare(other.order,self.order):
-                return super(Unit,self).__eq__(other.convert(self.units))
-            return False
+            try:
+                return float.__eq__(self,self._otherValue(other))
+            except UnitError:
+                return False
         else:
             return super(Unit,self).__eq__(other)
     def __ne__(self,other):
         return not self==other
     def __add__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not self.order:
-                return self.__new__(self.__class__,float(self)+float(other),other.units)
-            if not other.order  or self.compare(other.order,self.order):
-                return self.__new__(self.__class__,super(Unit,self).__add__(other.convert(self.units)),self.units)
-            raise UnitError('Dimensionality of units does not match')
+            descriptor=self._descriptor
+            if descriptor.offset or other._descriptor.offset:
+                return self._affineSum(other,False)
+            if not descriptor.dimensions:
+                return self._new(float.__add__(self,other),other._descriptor)
+            return self._new(float.__add__(self,self._otherValue(other)),descriptor)
         else:
-            return self.__new__(self.__class__,super(Unit,self).__add__(other),self.units)
+            value=super(Unit,self).__add__(other)
+            if value is NotImplemented:
+                return value
+            return self._new(value,self._descriptor)
     def __repr__(self):
         if self.units:
             return super(Unit,self).__repr__()+' '+self.units
         return super(Unit,self).__repr__()
     def __sub__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not self.order:
-                return self.__new__(self.__class__,float(self)-float(other),other.units)
-            if not other.order or self.compare(other.order,self.order):
-                return self.__new__(self.__class__,super(Unit,self).__sub__(other.convert(self.units)),self.units)
-            raise UnitError('Dimensionality of units does not match')
+            descriptor=self._descriptor
+            if descriptor.offset or other._descriptor.offset:
+                return self._affineSum(other,True)
+            if not descriptor.dimensions:
+                return self._new(float.__sub__(self,other),other._descriptor)
+            return self._new(float.__sub__(self,self._otherValue(other)),descriptor)
         else:
-            return Unit(super(Unit,self).__sub__(other),self.units)
+            value=super(Unit,self).__sub__(other)
+            if value is NotImplemented:
+                return value
+            return self._new(value,self._descriptor)
     def __mul__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not self.order:
+            if not self.dimensions:
                 return other*float(self)
-            if not other.order or self.compare(other.order,self.order) and self.order:
-                return self.__new__(self.__class__,super(Unit,self).__mul__(other.convert(self.units)),self.units)
-            elif other.order:
-                newValue=float(self)*float(other)
-                units=self.units.split('/')[0]+'*'+other.units.split('/')[0]
-                if len(self.units.split('/'))>1 and len(other.units.split('/'))>1:
-                    units+='/'+self.units.split('/')[1]+'*'+other.units.split('/')[1]
-                elif len(self.units.split('/'))>1:
-                    units+='/'+self.units.split('/')[1]
-                elif len(other.units.split('/'))>1:
-                    units+='/'+other.units.split('/')[1]
-                return self.__new__(self.__class__,newValue,units)
-            raise UnitError('Dimensionality of units does not match')
+            if other.dimensions and other.dimensions!=self.dimensions:
+                units,factor=self.productUnits(self.units,other.units)
+                return self.__new__(self.__class__,float(self)*float(other)*factor,units)
+            return self._new(float.__mul__(self,self._otherValue(other)),self._descriptor)
         else:
-            return Unit(super(Unit,self).__mul__(other),self.units)
+            value=super(Unit,self).__mul__(other)
+            if value is NotImplemented:
+                return value
+            return self._new(value,self._descriptor)
     def __div__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not self.order:
+            if not self.dimensions:
                 return self.__new__(self.__class__,self*other.invert())
-            if not other.order or self.compare(other.order,self.order):
-                return self.__new__(self.__class__,super(Unit,self).__div__(other.convert(self.units)),self.units)
-            elif other.order:
-                newValue=float(self)*float(other)
-                units=self.units.split('/')[0]
-                if len(other.units.split('/'))>1:
-                    units+='*'+other.units.split('/')[1]
-                units+='/'+other.units.split('/')[0]
-                if len(self.units.split('/'))>1:
-                    units+='*'+self.units.split('/')[1]
-                return self.__new__(self.__class__,newValue,units)
-            raise UnitError('Dimensionality of units does not match')
+            if other.dimensions and other.dimensions!=self.dimensions:
+                units,factor=self.productUnits(self.units,other.units,True)
+                return self.__new__(self.__class__,float(self)/float(other)*factor,units)
+            return self._new(float.__div__(self,self._otherValue(other)),self._descriptor)
         else:
-            return Unit(super(Unit,self).__div__(other),self.units)
+            value=super(Unit,self).__div__(other)
+            if value is NotImplemented:
+                return value
+            return self._new(value,self._descriptor)
     def __truediv__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not self.order:
+            if not self.dimensions:
                 return self.__new__(self.__class__,super(Unit,self).__truediv__(other),other.invert().units)
-            if not other.order or self.compare(other.order,self.order):
-                return self.__new__(self.__class__,super(Unit,self).__truediv__(other.convert(self.units)),self.units)
-            elif other.order:
-                newValue=float(self)*float(other)
-                units=self.units.split('/')[0]
-                if len(other.units.split('/'))>1:
-                    units+='*'+other.units.split('/')[1]
-                units+='/'+other.units.split('/')[0]
-                if len(self.units.split('/'))>1:
-                    units+='*'+self.units.split('/')[1]
-                return self.__new__(self.__class__,newValue,units)
-            raise UnitError('Dimensionality of units does not match')
+            if other.dimensions and other.dimensions!=self.dimensions:
+                units,factor=self.productUnits(self.units,other.units,True)
+                return self.__new__(self.__class__,float(self)/float(other)*factor,units)
+            return self._new(float.__truediv__(self,self._otherValue(other)),self._descriptor)
         else:
-            return self.__new__(self.__class__,super(Unit,self).__truediv__(other),self.units)
+            value=super(Unit,self).__truediv__(other)
+            if value is NotImplemented:
+                return value
+            return self._new(value,self._descriptor)
     def __mod__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not other.order or self.compare(other.order,self.order):
-                return super(Unit,self).__mod__(other.convert(self.units))
-            raise UnitError('Dimensionality of units does not match')
+            return float.__mod__(self,self._otherValue(other))
         else:
             return super(Unit,self).__mod__(other)
     def __pow__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not other.order:
-                return super(Unit,self).__pow__(other.convert(self.units))
+            if not other.dimensions:
+                return float.__pow__(self,float(other))
             raise UnitError('Cannot raise to the power of a value with units')
         else:
-            return self.__new__(self.__class__,super(Unit,self).__pow__(other),self.units)
+            value=super(Unit,self).__pow__(other)
+            if value is NotImplemented:
+                return value
+            return self._new(value,self._descriptor)
     def __divmod__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not other.order or self.compare(other.order,self.order):
-                return super(Unit,self).__divmod__(other.convert(self.units))
-            raise UnitError('Dimensionality of units does not match')
+            return float.__divmod__(self,self._otherValue(other))
         else:
-            return super(Unit,self).__divmod__(other)   
+            return super(Unit,self).__divmod__(other)
     def __radd__(self,other):
-        return self.__new__(self.__class__,super(Unit,self).__radd__(other),self.units)
+        return self._new(float.__radd__(self,other),self._descriptor)
     def __rsub__(self,other):
-        return self.__new__(self.__class__,super(Unit,self).__rsub__(other),self.units)
+        return self._new(float.__rsub__(self,other),self._descriptor)
     def __rmul__(self,other):
-       return self.__new__(self.__class__,super(Unit,self).__rmul__(other),self.units)
+        return self._new(float.__rmul__(self,other),self._descriptor)
     def __rdiv__(self,other):
         return self.__new__(self.__class__,super(Unit,self).__rdiv__(other),self.invert().units)
     def __rtruediv__(self,other):
         return self.__new__(self.__class__,super(Unit,self).__rtruediv__(other),self.invert().units)
     def __rmod__(self,other):
-        if not self.order:
+        if not self.dimensions:
             return super(Unit,self).__rmod__(other)
         else:
-            raise UnitError('Dimensionality of units does not match')
+            raise DimensionError('Dimensionality of units does not match')
     def __rpow__(self,other):
-        if not self.order:
+        if not self.dimensions:
             return super(Unit,self).__rpow__(other)
         raise UnitError('Cannot raise to the power of a value with units')
     def __rdivmod__(self,other):
-        if not self.order:
+        if not self.dimensions:
             return super(Unit,self).__rdivmod__(other)
-        raise UnitError('Dimensionality of units does not match')    
+        raise DimensionError('Dimensionality of units does not match')    
     def __ge__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not other.order or self.compare(other.order,self.order):
-                return super(Unit,self).__ge__(other.convert(self.units))
-            raise UnitError('Dimensionality of units does not match')
+            return float.__ge__(self,self._otherValue(other))
         else:
             return super(Unit,self).__ge__(other)
     def __gt__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not other.order or self.compare(other.order,self.order):
-                return super(Unit,self).__gt__(other.convert(self.units))
-            raise UnitError('Dimensionality of units does not match')
+            return float.__gt__(self,self._otherValue(other))
         else:
             return super(Unit,self).__gt__(other)
     def __le__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not other.order or self.compare(other.order,self.order):
-                return super(Unit,self).__le__(other.convert(self.units))
-            raise UnitError('Dimensionality of units does not match')
+            return float.__le__(self,self._otherValue(other))
         else:
             return super(Unit,self).__le__(other)
     def __lt__(self,other):
         if type(other)==type(self):
-            #check order and then convert to unit
-            if not other.order or self.compare(other.order,self.order):
-                return super(Unit,self).__lt__(other.convert(self.units))
-            raise UnitError('Dimensionality of units does not match')
+            return float.__lt__(self,self._otherValue(other))
         else:
             return super(Unit,self).__lt__(other)
     def __abs__(self):
-        return Unit(super(Unit,self).__abs__(),self.units)
+        return self._new(float.__abs__(self),self._descriptor)
     def getUnit(self,unit):
         """getUnit(unit)
         Sub routine to extract unit parameters from UNITS dictionary and return the appropriate values.
         Also determines prefixes.
         """
-        unit=unit.strip()
-        if unit in self._units.keys():
-            return self._units[unit],1
-        elif unit[1:] in self._units.keys() and unit[0] in self._prefixes.keys():
-            return self._units[unit[1:]],self._prefixes[unit[0]]
-        else:
+        prefix,name=self.registry.split(unit.strip())
+        if name not in self._units:
             raise UnitError('Unit '+unit+' not found')
+        return self._units[name],self._prefixes.get(prefix,1)
+    def resolveUnit(self,unit):
+        """resolveUnit(unit)
+        Return the dimension vector and scaling factor to SI units of a single, optionally prefixed, base or compound unit.
+        """
+        return self.registry.lookup(unit)
     def getCompoundUnit(self,order,scaling,unit):
         """getCompoundUnit(order,scaling,unit)
         Get compound unit parameters
         """
-        multiply=compile(self._separators['MULTIPLY'])
-        divide=compile(self._separators['DIVIDE'])
-        if unit[1:] in self._compoundUnits and unit[0] in self._prefixes.keys():
-            scaling*=self._prefixes[unit[0]]
-            unit=unit[1:]
-        if unit not in self._compoundUnits:
+        prefix,name=self.registry.split(unit)
+        if name not in self._compoundUnits:
             raise UnitError('Unit '+unit+' not found')
-        scaling*=self._compoundUnits[unit]['SIVAL']
-        units=dict(zip(['Numerator','Denominator'],[multiply.split('*'.join(divide.split(self._compoundUnits[unit]['UNITS'])[::2])),multiply.split('*'.join(divide.split(self._compoundUnits[unit]['UNITS'])[1::2]))]))
-        newOrderNum,newScaling=self.unitParse(units['Numerator'])
+        dimensions,newScaling=self.registry.lookup(unit)
         scaling*=newScaling
-        newOrderDen,newScaling=self.unitParse(units['Denominator'])
-        scaling/=newScaling
-        for type in list(set(newOrderNum.keys()+newOrderDen.keys())):
-            if not order.__contains__(type):
-                order[type]=0
-            try:
-                order[type]+=newOrderNum[type]
-            except KeyError:
-                pass
-            try:
-                order[type]-=newOrderDen[type]
-            except KeyError:
-                pass
+        for type,power in self.dimensionOrder(dimensions).items():
+            order[type]=order.get(type,0)+power
         return order,scaling
     def isCompound(self,unit):
         """isCompound(unit)
         Returns True if the unit is a compound unit (not a base SI unit)
         """
-        if unit in self._compoundUnits:
-            return True
-        elif unit[1:] in self._compoundUnits and unit[0] in self._prefixes.keys():
-            return True
-        else:
+        try:
+            return self.registry.split(unit)[1] in self._compoundUnits
+        except UnitError:
             return False
     def unitParse(self,unitList):
         """unitParse(unitList)
@@ -321,6 +894,144 @@ class Unit(float):
                 order[UnitParams[0]['TYPE']]=1
             scaling*=UnitParams[0]['SIVAL']*UnitParams[1]
         return order,scaling
+    def getDescriptor(self,units):
+        """getDescriptor(units)
+        Return the interned UnitDescriptor for a unit string, compiling it on a parseCache miss.
+        Descriptors are cached with the generation of the registry snapshot they are compiled from, so a descriptor
+        compiled from an earlier snapshot is compiled again rather than returned.
+        """
+        snapshot=self.registry.snapshot
+        descriptor=self.parseCache.get(units,None,snapshot.generation)
+        if descriptor is None:
+            descriptor=self.compileUnits(units,snapshot)
+            self.parseCache.set(units,descriptor,snapshot.generation)
+        return descriptor
+    def compileUnits(self,units,snapshot=None):
+        """compileUnits(units,snapshot=None)
+        Parse a unit string into a new UnitDescriptor holding its dimension vector and scaling factor to the SI unit
+        combination, without using the parseCache, against a RegistrySnapshot, by default that of the registry.
+        Units made of names joined by * and / with integer powers take a fast path in which each factor, e.g. 's**2', is
+        resolved once and memoized in the factors of the snapshot. Anything else goes through parseExpression.
+        """
+        if snapshot is None:
+            snapshot=self.registry.snapshot
+        dimensions=[0]*len(self._dimensions)
+        scaling=1.0
+        sign=-1
+        resolvedFactors=snapshot.factors
+        table=snapshot.table
+        for segment in units.replace('**','^').split('/'):
+            sign=-sign
+            for factor in segment.split('*'):
+                resolved=resolvedFactors.get(factor)
+                if resolved is None:
+                    match=_simpleFactor.match(factor)
+                    if match is None:
+                        return self._compileExpression(units,snapshot)
+                    power=int(match.group(2) or 1)
+                    if match.group(1) not in table:
+                        raise UnitError('Unit '+match.group(1)+' not found')
+                    unitDimensions,unitScaling=table[match.group(1)]
+                    #Store the non-zero (index,power) pairs of the dimension vector and the scaling of the factor
+                    resolved=(tuple((index,power*dimension) for index,dimension in enumerate(unitDimensions) if dimension),unitScaling**power)
+                    resolvedFactors[factor]=resolved
+                for index,dimension in resolved[0]:
+                    dimensions[index]+=sign*dimension
+                if sign>0:
+                    scaling*=resolved[1]
+                else:
+                    scaling/=resolved[1]
+        return UnitDescriptor(units,tuple(dimensions),scaling,None,snapshot.offsets.get(units,0.0))
+    def _compileExpression(self,units,snapshot):
+        """_compileExpression(units,snapshot)
+        Compile a unit string of any form accepted by parseExpression into a new UnitDescriptor.
+        """
+        terms=parseExpression(units)
+        dimensions=[0]*len(self._dimensions)
+        scaling=1.0
+        for name,power in terms:
+            if name not in snapshot.table:
+                raise UnitError('Unit '+name+' not found')
+            unitDimensions,unitScaling=snapshot.table[name]
+            for index,dimension in enumerate(unitDimensions):
+                dimensions[index]+=power*dimension
+            scaling*=unitScaling**power
+        return UnitDescriptor(units,tuple(dimensions),scaling,terms,snapshot.offsets.get(units,0.0))
+    def canonicalUnits(self,units,named=False):
+        """canonicalUnits(units,named=False)
+        Return the canonical, interned form of a unit string, so units with equal dimensions and scaling share one string.
+        Units with an SI scaling are written in the base units of each dimension, e.g. 'm*s*m*s' gives 'm**2*s**2' and
+        'N' gives 'kg*m/s**2'. Other units keep their names, with repeated names combined and sorted, e.g. 'km*hr/km**2'
+        gives 'hr/km'. If named is True, units matching a compound unit are mapped to its name, e.g. 'kg*m/s**2' gives 'N'.
+        Results are memoized in the class level canonicalCache.
+        """
+        if not units:
+            return units
+        key=(units,named)
+        generation=self.registry.snapshot.generation
+        canonical=self.canonicalCache.get(key,None,generation)
+        if canonical is None:
+            descriptor=self.getDescriptor(units)
+            canonical=self._canonicalize(descriptor.terms,descriptor.dimensions,descriptor.scaling,named)
+            self.canonicalCache.set(key,canonical,generation)
+        return canonical
+    def _canonicalize(self,terms,dimensions,scaling,named):
+        text=None
+        if named:
+            text=self.registry.compoundName(dimensions,scaling)
+        if text is None:
+            if abs(scaling-1.0)<=1e-12:
+                baseTerms=[(self.registry.baseUnit(type),power) for type,power in zip(self._dimensions,dimensions) if power]
+                if None not in [name for name,power in baseTerms]:
+                    terms=baseTerms
+            text=formatExpression(sorted(terms,key=_termKey))
+        if not text:
+            return False
+        return self._internedUnits.setdefault(text,text)
+    def productUnits(self,units1,units2,divide=False):
+        """productUnits(units1,units2,divide=False)
+        Return the canonical units of the product, or quotient if divide is True, of two unit strings and the factor the
+        product of the values must be multiplied by to be in those units. Results are memoized in the canonicalCache, and
+        mapped to compound unit names if the class level canonicalNames is True.
+        """
+        key=(units1,units2,divide,self.canonicalNames)
+        generation=self.registry.snapshot.generation
+        result=self.canonicalCache.get(key,None,generation)
+        if result is None:
+            descriptor1=self.getDescriptor(units1)
+            descriptor2=self.getDescriptor(units2)
+            terms,dimensions,scaling=descriptor2.terms,descriptor2.dimensions,descriptor2.scaling
+            if divide:
+                terms,dimensions,scaling=invertExpression(terms),invertDimensions(dimensions),1.0/scaling
+            dimensions=multiplyDimensions(descriptor1.dimensions,dimensions)
+            scaling*=descriptor1.scaling
+            units=self._canonicalize(multiplyExpression(descriptor1.terms,terms),dimensions,scaling,self.canonicalNames)
+            factor=1.0
+            if units:
+                factor=scaling/self.getDescriptor(units).scaling
+            result=(units,factor)
+            self.canonicalCache.set(key,result,generation)
+        return result
+    def parseUnits(self,units):
+        """parseUnits(units)
+        Return the dimension vector and scaling factor to the SI unit combination for a unit string.
+        Results are memoized in the class level parseCache.
+        """
+        descriptor=self.getDescriptor(units)
+        return descriptor.dimensions,descriptor.scaling
+    def dimensionVector(self,order):
+        """dimensionVector(order)
+        Convert a dimensional order dictionary into a tuple of powers of the base dimensions in _dimensions.
+        """
+        for type in order.keys():
+            if type not in self._dimensions:
+                raise UnitError('Dimension '+type+' not found')
+        return tuple(order.get(type,0) for type in self._dimensions)
+    def dimensionOrder(self,dimensions):
+        """dimensionOrder(dimensions)
+        Convert a dimension vector into a dimensional order dictionary of the non-zero powers.
+        """
+        return dict((type,power) for type,power in zip(self._dimensions,dimensions) if power)
     def combine(self,numerator,denominator):
         """combine(numeratorOrder,numeratorScaling,denominatorOrder,denominatorScaling)
         Combine numerator and denominator order and scaling into an overall order and scaling.
@@ -330,7 +1041,7 @@ class Unit(float):
         denominatorOrder=denominator[0]
         denominatorScaling=denominator[1]
         resultOrder={}
-        for type in list(set(numeratorOrder.keys()+denominatorOrder.keys())):
+        for type in list(set(numeratorOrder)|set(denominatorOrder)):
             order=0
             try:
                 order+=numeratorOrder[type]
@@ -348,7 +1059,7 @@ class Unit(float):
         compare the dimensions of 2 sets of units and check that the result of dividing one by the other is dimensionless
         """
         if order1 and order2:
-            for type in list(set(order1.keys()+order2.keys())):
+            for type in list(set(order1)|set(order2)):
                 order=0
                 try:
                     order+=order1[type]
@@ -373,380 +1084,192 @@ class Unit(float):
         kg*m^2
         kg/m^3
         kg/m*m*m
-        Splits for division first and then multiplication and power - no bracket parsing and assumes unit in the form:
+        (kg*m)/(s**2)
+        m**0.5, m^(1/2), kg m/s**2
+        Splits for division first and then multiplication and power, with brackets grouping - assumes unit in the form:
         kg/m/s is kg per (m per s) ie kgs/m).
         """
-
-        multiply=compile(self._separators['MULTIPLY'])
-        divide=compile(self._separators['DIVIDE'])
-        
-        #Unit parsing into numerator and denominator
-        actUnit=dict(zip(['Numerator','Denominator'],[multiply.split('*'.join(divide.split(self.units)[::2])),multiply.split('*'.join(divide.split(self.units)[1::2]))]))
-        desUnit=dict(zip(['Numerator','Denominator'],[multiply.split('*'.join(divide.split(desiredUnit)[::2])),multiply.split('*'.join(divide.split(desiredUnit)[1::2]))]))
-        #Determine values for the order and scaling of the units
-        actUnitOrder,actUnitScaling=self.combine(self.unitParse(actUnit['Numerator']),self.unitParse(actUnit['Denominator']))
-        desUnitOrder,desUnitScaling=self.combine(self.unitParse(desUnit['Numerator']),self.unitParse(desUnit['Denominator']))
-        #If the orders match then return the scaling between them else raise an Error.
-        #N.B. scaling is the number required to convert one of the unit type into the appropriate SI unit combination:
-        #
-        #   i.e. 100 ft/s= 30.48 m/s (SF=0.3048) && 1 km/s = 1000 m/s (SF=1000) so 1 ft/s is 0.03048 km/s
-        # Therefore convert to meters and then to km so multiply by 0.3048 and divide by 1000
-        if self.compare(actUnitOrder,desUnitOrder):
-            return float(actUnitScaling)/float(desUnitScaling)
-        else:
-            raise UnitError('Order of units: '+self.units+'  and  '+desiredUnit+' does not match')
+        return self.conversionFactor(self.units,desiredUnit)
+    def conversionFactor(self,fromUnits,toUnits):
+        """conversionFactor(fromUnits,toUnits)
+        Return the scale factor from fromUnits to toUnits, raising a UnitError if the dimensional orders do not match.
+        Factors and mismatch errors are memoized in the class level conversionCache keyed on (fromUnits,toUnits).
+        """
+        generation=self.registry.snapshot.generation
+        factor=self.conversionCache.get((fromUnits,toUnits),None,generation)
+        if factor is None:
+            #Determine values for the order and scaling of the units
+            fromDimensions,fromScaling=self.parseUnits(fromUnits)
+            toDimensions,toScaling=self.parseUnits(toUnits)
+            #If the orders match then store the scaling between them else store the Error.
+            #N.B. scaling is the number required to convert one of the unit type into the appropriate SI unit combination:
+            #
+            #   i.e. 100 ft/s= 30.48 m/s (SF=0.3048) && 1 km/s = 1000 m/s (SF=1000) so 1 ft/s is 0.03048 km/s
+            # Therefore convert to meters and then to km so multiply by 0.3048 and divide by 1000
+            if fromDimensions==toDimensions:
+                factor=float(fromScaling)/float(toScaling)
+            else:
+                factor=DimensionError('Order of units: '+fromUnits+'  and  '+toUnits+' does not match')
+            self.conversionCache.set((fromUnits,toUnits),factor,generation)
+        if type(factor)==DimensionError:
+            raise DimensionError(*factor.args)
+        return factor
+    def conversionTransform(self,fromUnits,toUnits):
+        """conversionTransform(fromUnits,toUnits)
+        Return the (factor,offset) pair converting a value from fromUnits to toUnits as value*factor+offset, where a units
+        string that is a single affine unit such as 'degC' is an absolute temperature. The offset is 0.0 unless one of
+        the units is affine. Transforms are memoized in the class level transformCache keyed on (fromUnits,toUnits).
+        """
+        generation=self.registry.snapshot.generation
+        transform=self.transformCache.get((fromUnits,toUnits),None,generation)
+        if transform is None:
+            factor=self.conversionFactor(fromUnits,toUnits)
+            toDescriptor=self.getDescriptor(toUnits)
+            transform=(factor,(self.getDescriptor(fromUnits).offset-toDescriptor.offset)/toDescriptor.scaling)
+            self.transformCache.set((fromUnits,toUnits),transform,generation)
+        return transform
+    def convertValue(self,unit):
+        """convertValue(unit)
+        Return the float value converted to unit without creating a new Unit.
+        Absolute temperatures in affine units, e.g. 'degC' to 'degF', are converted with conversionTransform.
+        """
+        if unit and self.units:
+            if self._descriptor.offset or unit in self.registry.offsets:
+                factor,offset=self.conversionTransform(self.units,unit)
+                return float(self)*factor+offset
+            return float(self)*self.conversionFactor(self.units,unit)
+        return float(self)
     def convert(self,unit):
         if unit and self.units:
-            return self.__new__(self.__class__,float(self*self.unitCompare(unit)),unit)
+            return self.__new__(self.__class__,self.convertValue(unit),unit)
         return self
-class __UnitTestCase(unittest.TestCase):
-    def setUp(self):
-        self.__setattr__('unit',Unit(1))
-    def tearDown(self):
-        self.__delattr__('unit')
-    def test_setunits(self):
-        self.unit.setUnits('kg/m**3')
-        self.assertEqual(self.unit.units,'kg/m**3')
-    def test_getUnit(self):
-        self.assertEqual(self.unit.getUnit('m'),({'SIVAL':1.0,'TYPE':'Length'},1.0),'getUnit error: '+str(self.unit.getUnit('m')))
-        self.assertEqual(self.unit.getUnit('km'),({'SIVAL':1.0,'TYPE':'Length'},1000.0),'getUnit error: '+str(self.unit.getUnit('km')))
-        self.assertEqual(self.unit.getUnit('g'),({'SIVAL':0.001,'TYPE':'Mass'},1.0),'getUnit error: '+str(self.unit.getUnit('g')))
-        self.assertEqual(self.unit.getUnit('kg'),({'SIVAL':1.0,'TYPE':'Mass'},1.0),'getUnit error: '+str(self.unit.getUnit('kg')))
-        self.assertEqual(self.unit.getUnit('s'),({'SIVAL':1.0,'TYPE':'Time'},1.0),'getUnit error: '+str(self.unit.getUnit('s')))
-        self.assertEqual(self.unit.getUnit('min'),({'SIVAL':60.0,'TYPE':'Time'},1.0),'getUnit error: '+str(self.unit.getUnit('min')))
-        self.assertEqual(self.unit.getUnit('hr'),({'SIVAL':3600.0,'TYPE':'Time'},1.0),'getUnit error: '+str(self.unit.getUnit('hr')))
-        self.assertEqual(self.unit.getUnit('miles'),({'SIVAL':1609.344,'TYPE':'Length'},1.0),'getUnit error: '+str(self.unit.getUnit('miles')))
-        self.assertEqual(self.unit.getUnit('lb'),({'SIVAL':2.2046226,'TYPE':'Mass'},1.0),'getUnit error: '+str(self.unit.getUnit('lb')))
-        self.assertEqual(self.unit.getUnit('Gs'),({'SIVAL':1.0,'TYPE':'Time'},1000000000.0),'getUnit error: '+str(self.unit.getUnit('Gs')))
-        self.assertEqual(self.unit.getUnit('ft'),({'SIVAL':0.3048,'TYPE':'Length'},1.0),'getUnit error: '+str(self.unit.getUnit('ft')))
-        self.assertEqual(self.unit.getUnit('MC'),({'SIVAL':1.0,'TYPE':'Charge'},1000000.0),'getUnit error: '+str(self.unit.getUnit('MC')))
-    def test_isCompound(self):
-        self.assertTrue(self.unit.isCompound('J'),'isCompound error: '+str(self.unit.isCompound('J')))
-        self.assertFalse(self.unit.isCompound('m'),'isCompound error: '+str(self.unit.isCompound('m')))
-        self.assertTrue(self.unit.isCompound('N'),'isCompound error: '+str(self.unit.isCompound('N')))
-        self.assertTrue(self.unit.isCompound('A'),'isCompound error: '+str(self.unit.isCompound('A')))
-        self.assertTrue(self.unit.isCompound('A'),'isCompound error: '+str(self.unit.isCompound('A')))
-        self.assertTrue(self.unit.isCompound('V'),'isCompound error: '+str(self.unit.isCompound('V')))
-        self.assertTrue(self.unit.isCompound('Ohm'),'isCompound error: '+str(self.unit.isCompound('Ohm')))
-        self.assertFalse(self.unit.isCompound('C'),'isCompound error: '+str(self.unit.isCompound('C')))
-        self.assertFalse(self.unit.isCompound('g'),'isCompound error: '+str(self.unit.isCompound('g')))
-        self.assertFalse(self.unit.isCompound('ft'),'isCompound error: '+str(self.unit.isCompound('ft')))
-        self.assertFalse(self.unit.isCompound('lb'),'isCompound error: '+str(self.unit.isCompound('lb')))
-        self.assertFalse(self.unit.isCompound('s'),'isCompound error: '+str(self.unit.isCompound('s')))
-        self.assertFalse(self.unit.isCompound('min'),'isCompound error: '+str(self.unit.isCompound('min')))
-        self.assertFalse(self.unit.isCompound('hr'),'isCompound error: '+str(self.unit.isCompound('hr')))
-        self.assertFalse(self.unit.isCompound('miles'),'isCompound error: '+str(self.unit.isCompound('miles')))
-    def test_getCompoundUnit(self):
-        self.assertEqual(self.unit.getCompoundUnit({},1,'J'),({'Mass':1,'Length':2,'Time':-2},1),'getCompoundUnit error: '+str(self.unit.getCompoundUnit({},1,'J')))
-        self.assertEqual(self.unit.getCompoundUnit({},1,'A'),({'Charge':1,'Time':-1},1),'getCompoundUnit error: '+str(self.unit.getCompoundUnit({},1,'A')))
-        self.assertEqual(self.unit.getCompoundUnit({},1,'V'),({'Length': 2, 'Mass': 1, 'Charge': -1, 'Time': -2},1),'getCompoundUnit error: '+str(self.unit.getCompoundUnit({},1,'V')))
-        self.assertEqual(self.unit.getCompoundUnit({},1,'Ohm'),({'Length': 2, 'Mass': 1, 'Charge': -2, 'Time': -1},1),'getCompoundUnit error: '+str(self.unit.getCompoundUnit({},1,'Ohm')))
-        self.assertEqual(self.unit.getCompoundUnit({},1,'N'),({'Mass':1,'Length':1,'Time':-2},1),'getCompoundUnit error: '+str(self.unit.getCompoundUnit({},1,'N')))
-        self.assertEqual(self.unit.getCompoundUnit({},1,'kN'),({'Mass':1,'Length':1,'Time':-2},1000.0),'getCompoundUnit error: '+str(self.unit.getCompoundUnit({},1,'kN')))
-    def test_unitParse(self):
-        self.assertEqual(self.unit.unitParse(['kJ','km']),({'Mass':1,'Length':3,'Time':-2},1000000),'unitParse error: '+str(self.unit.unitParse(['kJ','km'])))
-        self.assertEqual(self.unit.unitParse(['kg','m']),({'Mass':1,'Length':1},1),'unitParse error: '+str(self.unit.unitParse(['kg','m'])))
-        self.assertEqual(self.unit.unitParse(['Gs','ft']),({'Length':1,'Time':1},304800000.0),'unitParse error: '+str(self.unit.unitParse(['Gs','ft'])))
-    def test_combine(self):
-        self.assertEqual(self.unit.combine([{'Mass':1,'Length':4,'Time':-2},1000],[{'Mass':1,'Length':2},1000]),({'Mass':0,'Length':2,'Time':-2},1),'unitParse error: '+str(self.unit.combine([{'Mass':1,'Length':4,'Time':-2},1000],[{'Mass':1,'Length':2},1000])))
-        self.assertEqual(self.unit.combine([{'Mass':3,'Length':4,'Time':-2},1000],[{'Mass':1,'Length':2},1000]),({'Mass':2,'Length':2,'Time':-2},1),'unitParse error: '+str(self.unit.combine([{'Mass':3,'Length':4,'Time':-2},1000],[{'Mass':1,'Length':2},1000])))
-    def test_compare(self):
-        self.assertFalse(self.unit.compare({'Mass':12,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2}),'compare error: '+str(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2})))
-        self.assertFalse(self.unit.compare({'Mass':12,'Length':4,'Time':-2},{'Mass':1,'Time':-2}),'compare error: '+str(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2})))
-        self.assertFalse(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':14,'Time':-2}),'compare error: '+str(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2})))
-        self.assertFalse(self.unit.compare({'Mass':1,'Length':4,'Time':2},{'Mass':1,'Length':4,'Time':-2}),'compare error: '+str(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2})))
-        self.assertTrue(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2}),'compare error: '+str(self.unit.compare({'Mass':1,'Length':4,'Time':-2},{'Mass':1,'Length':4,'Time':-2})))
-    def test_unitCompare(self):
-        self.unit.setUnits('m')
-        self.assertAlmostEqual(self.unit.unitCompare('ft'),3.28083989501,7,'unitCompare error: '+str(self.unit.unitCompare('ft')))
-        self.unit.setUnits('miles')
-        self.assertEqual(self.unit.unitCompare('m'),1609.344,'unitCompare error: '+str(self.unit.unitCompare('m')))
-        self.unit.setUnits('m')
-        self.assertEqual(self.unit.unitCompare('km'),0.001,'unitCompare error: '+str(self.unit.unitCompare('km')))
-    def test_convert(self):
-        self.unit=Unit(123)
-        self.unit.setUnits('miles')
-        self.assertEqual(self.unit.convert('m'),1609.344*123,'unitCompare error: '+str(self.unit.convert('m')))
-    def test___repr__(self):
-        self.assertEqual(repr(self.unit),'1.0','repr test error')
-        self.unit.setUnits('m')
-        self.assertEqual(repr(self.unit),'1.0 m','repr test error '+repr(self.unit))
-    def test___eq__(self):
-        self.assertTrue(self.unit==1,'Equality test error')
-        self.assertFalse(self.unit==2,'Equality test error')
-        self.unit.setUnits('m')
-        self.assertTrue(self.unit==Unit(1,'m'),'Equality test error')
-        self.assertFalse(self.unit==Unit(1,'km'),'Equality test error')
-        self.assertFalse(self.unit==Unit(1,'s'),'Equality test error')
-        self.assertTrue(self.unit==Unit(0.001,'km'),'Equality test error')
-    def test___ne_(self):
-        self.assertFalse(self.unit!=1,'Equality test error')
-        self.assertTrue(self.unit!=2,'Equality test error')
-        self.unit.setUnits('m')
-        self.assertFalse(self.unit!=Unit(1,'m'),'Equality test error')
-        self.assertTrue(self.unit!=Unit(1,'km'),'Equality test error')
-        self.assertTrue(self.unit!=Unit(1,'s'),'Equality test error')
-        self.assertFalse(self.unit!=Unit(0.001,'km'),'Equality test error')
-    def test___add__(self):
-        self.assertEqual(self.unit+1,2,'Add test error')
-        self.assertEqual(self.unit+Unit(2,'m'),Unit(3,'m'),'Add test error')
-        self.unit.setUnits('m')
-        try:
-            self.unit+Unit(1,'s')
-            self.assertTrue(False,'Add test error')
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'Add test error')
-        self.assertAlmostEqual(self.unit+Unit(1,'km'),1001,12,'Add test error '+str(self.unit+Unit(1,'km')))
-        self.assertAlmostEqual(self.unit+Unit(1,'km'),Unit(1.001,'km'),12,'Add test error'+ str(self.unit+Unit(1,'km')))
-    def test___sub__(self):
-        self.assertEqual(self.unit-2,-1,'Sub test error')
-        self.assertEqual(self.unit-Unit(2,'m'),Unit(-1,'m'),'Sub test error')
-        self.unit.setUnits('m')
-        try:
-            self.unit-Unit(1,'s')
-            self.assertTrue(False,'Sub test error')
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'Sub test error')
-        self.assertAlmostEqual(self.unit-Unit(+1,'km'),-999,12,'Sub test error '+str(self.unit-Unit(1,'km')))
-        self.assertAlmostEqual(self.unit-Unit(1,'km'),Unit(-0.999,'km'),12,'Sub test error'+ str(self.unit-Unit(1,'km')))
-    def test___mul__(self):
-        self.assertEqual(self.unit*2,2,'Mul test error')
-        self.assertEqual(self.unit*Unit(2,'m'),Unit(2,'m'),'Mul test error')
-        self.unit.setUnits('m')
-        self.assertEqual(self.unit*Unit(1,'s'),1,'Mul test error')
-        self.assertEqual(self.unit*Unit(1,'s'),Unit(1,'m*s'),'Mul test error')
-        self.assertAlmostEqual(self.unit*Unit(+1,'km'),1000,12,'Mul test error')
-        self.assertAlmostEqual(self.unit*Unit(1,'km'),Unit(1,'km'),12,'Mul test error')
-    def test___div__(self):
-        self.unit+=3
-        self.assertEqual(self.unit/2,2,'Div test error'+str(self.unit/2))
-        self.assertEqual(self.unit/Unit(2,'m'),Unit(2),'Div test error')
-        self.unit.setUnits('m')
-        self.assertEqual(self.unit/Unit(1,'s'),4,'Div test error')
-        self.assertEqual(self.unit/Unit(1,'s'),Unit(4,'m/s'),'Div test error')
-        self.assertAlmostEqual(self.unit/Unit(+4,'km'),0.001,12,'Div test error')
-        self.assertAlmostEqual(self.unit/Unit(4,'km'),Unit(0.000001,'km'),12,'Div test error')
-    def test___truediv__(self):
-        self.unit+=3
-        self.assertEqual(self.unit.__truediv__(2),2,'truediv test error'+str(self.unit.__truediv__(2)))
-        self.assertEqual(self.unit.__truediv__(Unit(2,'m')),Unit(2),'truediv test error')
-        self.unit.setUnits('m')
-        self.assertEqual(self.unit.__truediv__(Unit(1,'s')),4,'truediv test error')
-    def test___mod__(self):
-        self.unit+=4
-        self.assertEqual(self.unit%2,1,'Mod test error')
-        try:
-            self.unit%Unit(2,'m')
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'Mod test error')
-        self.unit.setUnits('m')
-        self.assertEqual(self.unit%(Unit(2,'m')),1,'Mod test error')
-        try:
-            self.unit%Unit(2,'s')
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'Mod test error')
-    def test___pow__(self):
-        self.unit+=3
-        self.assertEqual(self.unit**2,16,'Pow test error')
-        try:
-            self.unit**Unit(2,'m')
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'Pow test error')
-        self.unit.setUnits('m')
-        self.assertEqual(self.unit**(Unit(2)),16,'Pow test error')
-        try:
-            self.unit%Unit(2,'s')
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'Pow test error')
-    def test___divmod__(self):
-        self.unit+=4
-        self.assertEqual(divmod(self.unit,2),(2,1),'divmod test error')
-        try:
-            divmod(self.unit,Unit(2,'m'))
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'divmod test error')
-        self.unit.setUnits('m')
-        self.assertEqual(divmod(self.unit,Unit(2,'m')),(2,1),'divmod test error')
+def clearCaches():
+    """clearCaches()
+    Empty the parse, conversion, transform, format and canonical unit caches, e.g. after the registry changes.
+    Entries are stamped with the generation of the registry, so clearing only frees the entries of earlier generations.
+    """
+    Unit.parseCache.clear()
+    Unit.conversionCache.clear()
+    Unit.transformCache.clear()
+    Unit.formatCache.clear()
+    Unit.canonicalCache.clear()
+def _syncRegistry():
+    #Defining units publishes new dictionaries rather than changing them in place, so the class level ones follow them
+    registry=Unit.registry
+    Unit._dimensions=registry.dimensions
+    Unit._units=registry.units
+    Unit._compoundUnits=registry.compoundUnits
+    Unit._prefixes=registry.prefixes
+Unit.registry.listeners.extend([_syncRegistry,clearCaches])
+def useRegistry(registry):
+    """useRegistry(registry)
+    Replace the registry of every Unit with another UnitRegistry, e.g. one loaded from a unit database, and clear the
+    caches. The class level _dimensions, _units, _compoundUnits and _prefixes become those of the registry, and follow
+    it as units and prefixes are defined.
+    """
+    for listener in (_syncRegistry,clearCaches):
+        if listener not in registry.listeners:
+            registry.listeners.append(listener)
+    Unit.registry=registry
+    _syncRegistry()
+    clearCaches()
+def _isAbsolute(units):
+    #Absolute temperatures are in an affine unit such as 'degC', whose differences are in its 'delta_' unit
+    return bool(units) and units in Unit.registry.offsets
+def _differenceUnits(units):
+    #Spreads of absolute temperatures are temperature differences
+    if _isAbsolute(units):
+        return 'delta_'+units
+    return units
+def defineUnit(name,siValue,type,offset=0.0):
+    """defineUnit(name,siValue,type,offset=0.0)
+    Define a new base unit of one of Unit._dimensions at runtime, e.g. defineUnit('yd',0.9144,'Length'), or an affine
+    unit with the SI value of its zero as offset, e.g. defineUnit('degRe',1.25,'Temperature',273.15).
+    """
+    Unit.registry.defineUnit(name,siValue,type,offset)
+def defineCompoundUnit(name,siValue,units):
+    """defineCompoundUnit(name,siValue,units)
+    Define a new unit in terms of existing units at runtime, e.g. defineCompoundUnit('W',1,'J/s').
+    """
+    Unit.registry.defineCompoundUnit(name,siValue,units)
+def definePrefix(prefix,factor):
+    """definePrefix(prefix,factor)
+    Define a new prefix for every unit at runtime, e.g. definePrefix('Ki',1024).
+    """
+    Unit.registry.definePrefix(prefix,factor)
+def prewarm(unitPairs):
+    """prewarm(unitPairs)
+    Populate the conversion cache from an iterable of (fromUnits,toUnits) pairs, e.g. at startup.
+    Pairs with mismatched dimensions are cached as errors rather than raised.
+    """
+    unit=Unit(1)
+    for fromUnits,toUnits in unitPairs:
         try:
-            divmod(self.unit,Unit(2,'s'))
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'divmod test error')
-    def test___radd__(self):
-        self.assertEqual(1+self.unit,2,'radd test error')
-        self.assertEqual(2+self.unit,Unit(3),'radd test error')
-        self.unit.setUnits('m')
-        self.assertEqual(2+self.unit,Unit(3,'m'),'radd test error')
-    def test___rsub__(self):
-        self.assertEqual(3-self.unit,2,'rsub test error')
-        self.assertEqual(4-self.unit,Unit(3),'rsub test error')
-        self.unit.setUnits('m')
-        self.assertEqual(4-self.unit,Unit(3,'m'),'rsub test error')
-    def test___rmul__(self):
-        self.assertEqual(3*self.unit,3,'rmul test error')
-        self.assertEqual(4*self.unit,Unit(4),'rmul test error')
-        self.unit.setUnits('m')
-        self.assertEqual(4*self.unit,Unit(4,'m'),'rmul test error')
-    def test___rdiv__(self):
-        self.assertEqual(3/self.unit,3,'rdiv test error')
-        self.assertEqual(4/self.unit,Unit(4),'rdiv test error')
-        self.unit.setUnits('m')
-        self.assertEqual(4/self.unit,Unit(4,'m**-1'),'rdiv test error')
-        self.unit+=3
-        self.assertEqual(4/self.unit,Unit(1,'m**-1'),'rdiv test error')
-    def test___rtruediv__(self):
-        self.assertEqual(self.unit.__rtruediv__(3),3,'rtruediv test error')
-        self.assertEqual(self.unit.__rtruediv__(4),Unit(4),'rtruediv test error')
-        self.unit.setUnits('m')
-        self.assertEqual(self.unit.__rtruediv__(4),Unit(4,'m**-1'),'rtruediv test error')
-        self.unit+=3
-        self.assertEqual(self.unit.__rtruediv__(4),Unit(1,'m**-1'),'rtruediv test error')
-    def test___rmod__(self):
-        self.unit+=4
-        self.assertEqual(9%self.unit,4,'rmod test error')
-        self.unit.setUnits('m')
-        try:
-            9%self.unit
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'rmod test error')
-    def test___rpow__(self):
-        self.unit+=1
-        self.assertEqual(4**self.unit,16,'rpow test error')
-        self.unit.setUnits('m')
-        try:
-            4**self.unit
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'rpow test error')
-    def test___rdivmod__(self):
-        self.unit+=4
-        self.assertEqual(divmod(9,self.unit),(1,4),'rdivmod test error')
-        self.unit.setUnits('m')
-        try:
-            divmod(9,self.unit)
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'rdivmod test error')
-    def test___ge__(self):
-        self.assertTrue(4>=self.unit,'ge error')
-        self.assertFalse(self.unit>=2,'ge error')
-        self.unit+=2
-        self.assertTrue(self.unit>=3,'ge error')
-        self.assertTrue(3>=self.unit,'ge error')
-        self.unit.setUnits('m')
-        self.assertTrue(self.unit>=3,'ge error')
-        self.assertTrue(3>=self.unit,'ge error')
-        self.assertTrue(self.unit>=Unit(3,'m'),'ge error')
-        try:
-            self.assertTrue(self.unit>=Unit(3,'s'),'ge error')
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'ge test error')
-    def test___gt__(self):
-        self.assertTrue(4>self.unit,'gt error')
-        self.assertFalse(self.unit>1,'gt error')
-        self.unit+=2
-        self.assertTrue(self.unit>2,'gt error')
-        self.assertTrue(4>self.unit,'gt error')
-        self.unit.setUnits('m')
-        self.assertTrue(self.unit>2,'gt error')
-        self.assertTrue(4>self.unit,'gt error')
-        self.assertTrue(self.unit>Unit(2,'m'),'gt error')
-        try:
-            self.assertTrue(self.unit>Unit(2,'s'),'gt error')
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'gt test error')
-    def test___le__(self):
-        self.assertTrue(1<=self.unit,'le error')
-        self.assertFalse(self.unit<=0,'le error')
-        self.unit+=2
-        self.assertTrue(self.unit<=3,'le error')
-        self.assertTrue(3<=self.unit,'le error')
-        self.unit.setUnits('m')
-        self.assertTrue(self.unit<=3,'le error')
-        self.assertTrue(2<self.unit,'le error')
-        self.assertTrue(self.unit<=Unit(4,'m'),'le error')
-        try:
-            self.assertTrue(self.unit<=Unit(4,'s'),'le error')
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'le test error')
-    def test___lt__(self):
-        self.assertTrue(0<self.unit,'lt error')
-        self.assertFalse(self.unit<0,'lt error')
-        self.unit+=2
-        self.assertTrue(self.unit<4,'lt error')
-        self.assertTrue(2<self.unit,'lt error')
-        self.unit.setUnits('m')
-        self.assertTrue(self.unit<4,'lt error')
-        self.assertTrue(2<self.unit,'lt error')
-        self.assertTrue(self.unit<Unit(4,'m'),'lt error')
-        try:
-            self.assertTrue(self.unit<Unit(4,'s'),'lt error')
-            self.assertTrue(False)
-        except Exception,e:
-            self.assertEqual(type(e),UnitError,'lt test error')
-    def test___float__(self):
-        self.assertEqual(float(self.unit),1.0,'float error')
-        self.assertNotEqual(float(self.unit),2.0,'float error')
-    def test___abs__(self):
-        self.assertEqual(abs(self.unit),1.0,'abs error')
-        self.assertEqual(abs(-self.unit),1.0,'abs error')
-    def test_invert(self):
-        self.assertEqual(self.unit.invert(),Unit(1),'invert error')
-        self.unit+=1
-        self.assertEqual(self.unit.invert(),Unit(0.5),'invert error')
-        self.unit.setUnits('m')
-        self.assertEqual(self.unit.invert(),Unit(0.5,'m**-1'),'invert error')
-        self.unit.setUnits('m/s')
-        self.assertEqual(self.unit.invert(),Unit(0.5,'s/m'),'invert error')
-    def test___format__(self):
-        self.assertEqual('{:>4.2f}'.format(self.unit),'1.00','format error')
-        self.unit.setUnits('m')
-        self.assertEqual('{:>4.2f}'.format(self.unit),'1.00m','format error')
-        self.unit.setUnits('m/s')
-        self.assertEqual('{:>4.2f}'.format(self.unit),'1.00m/s','format error')
-        self.assertEqual('{:>5.3f km/sa}'.format(self.unit),'0.001 km/s','format error')
-        self.assertEqual('{:>5.3f km/sA}'.format(self.unit),'0.001','format error')
-
-def __debugTestSuite():
-    suite=unittest.TestSuite()
-    unitSuite = unittest.TestLoader().loadTestsFromTestCase(__UnitTestCase)
-    suite.addTests(unitSuite._tests)
-    return suite
-def __testSuite():
-    unitSuite = unittest.TestLoader().loadTestsFromTestCase(__UnitTestCase)
-    return unittest.TestSuite([unitSuite])
+            unit.conversionFactor(fromUnits,toUnits)
+        except UnitError:
+            pass
+def _bytesToArray(values):
+    if isinstance(values,memoryview):
+        values=values.tobytes()
+    result=array('d')
+    if hasattr(result,'frombytes'):
+        result.frombytes(bytes(values))
+    else:
+        result.fromstring(bytes(values))
+    return result
+def _arrayToBytes(values):
+    if hasattr(values,'tobytes'):
+        return values.tobytes()
+    return values.tostring()
+def convertMany(values,fromUnits,toUnits):
+    """convertMany(values,fromUnits,toUnits)
+    Convert a batch of raw float values from fromUnits to toUnits without creating a Unit per value.
+    The conversion is resolved once and applied in a single map over the values (or one vectorized multiply for numpy
+    arrays), with the offset of an absolute temperature in an affine unit such as 'degC' added in the same pass. The result has the same container kind as values: list, tuple, array.array, numpy.ndarray, or for
+    bytes, bytearray and memoryview objects holding packed native float64 values, the same buffer type. Any other
+    iterable returns a list.
+    """
+    factor,offset=Unit(1).conversionTransform(fromUnits,toUnits)
+    convert=factor.__mul__
+    if offset:
+        convert=lambda value:value*factor+offset
+    numpy=sys.modules.get('numpy')
+    if numpy is not None and isinstance(values,numpy.ndarray):
+        result=numpy.multiply(values,factor)
+        if offset:
+            result+=offset
+        return result
+    if isinstance(values,array):
+        typecode=values.typecode
+        if typecode not in 'fd':
+            typecode='d'
+        return array(typecode,map(convert,values))
+    if isinstance(values,(bytes,bytearray,memoryview)):
+        converted=_bytesToArray(values)
+        converted=_arrayToBytes(array('d',map(convert,converted)))
+        if isinstance(values,memoryview):
+            result=memoryview(bytearray(converted))
+            if hasattr(result,'cast') and values.format=='d':
+                return result.cast('d')
+            return result
+        return type(values)(converted)
+    if isinstance(values,tuple):
+        return tuple(map(convert,values))
+    return list(map(convert,values))
+_setDescriptor=Unit._descriptor.__set__
+def unitsFromDescriptors(values,descriptors):
+    """unitsFromDescriptors(values,descriptors)
+    Return a list of Unit instances of a sequence of float values and an iterable of the UnitDescriptor of each, e.g.
+    from getDescriptor, building the instances and setting their descriptors with map so the loops stay in C.
+    """
+    result=list(map(float.__new__,repeat(Unit,len(values)),values))
+    list(map(_setDescriptor,result,descriptors))
+    return result
 def runTests():
-    suite=__testSuite()
-    unittest.TextTestRunner(verbosity=4).run(suite)
+    from .tests.testUnits import runTests
+    runTests()
 def debugTests():
-    suite=__debugTestSuite()
-    import ipdb,sys
-    for test in suite:
-        
-        try:
-            test.debug()
-        except Exception,e:
-            if type(e)==AssertionError:                
-                ipdb.post_mortem(sys.exc_info()[2])
-                
-            else:
-                try:
-                    from IPython.core.ultratb import VerboseTB
-                    vtb=VerboseTB(call_pdb=1)
-                    vtb(*sys.exc_info())
-                except:
-                    import traceback
-                    print'\n'
-                    traceback.print_exc()
-                ipdb.post_mortem(sys.exc_info()[2])
+    from .tests.testUnits import debugTests
+    debugTests()
 if  __name__=='__main__':
-    runTests()
\ No newline at end of file
+    runTests()